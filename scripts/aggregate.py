@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Single-pass aggregation over article records
+Group-bys, value counters and heap-based top-k, maintained incrementally as records change
+"""
+
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class Aggregator:
+    """Aggregates records in one pass and keeps the results current as records are replaced
+
+    group_by fields map each value to its records (in first-seen order), count_by
+    fields only keep counts, and multi fields hold lists whose items are each
+    counted (e.g. topics). Records are identified by the key field, or by arrival
+    order when key is None.
+    """
+
+    def __init__(self, group_by: Sequence[str] = (), count_by: Sequence[str] = (),
+                 multi: Sequence[str] = (), key: Optional[str] = 'id'):
+        self.group_by = tuple(group_by)
+        self.count_by = tuple(count_by)
+        self.multi = tuple(multi)
+        self.key = key
+        self.total = 0
+        self.groups: Dict[str, Dict[object, Dict[object, Dict]]] = {field: {} for field in self.group_by}
+        self.counts: Dict[str, Counter] = {field: Counter() for field in self.group_by + self.count_by + self.multi}
+        # Tracked field values per record, so a replacement can be undone exactly
+        self.snapshots: Dict[object, Tuple] = {}
+        self.sequence = 0
+
+    def consume(self, records: Iterable[Dict]) -> 'Aggregator':
+        for record in records:
+            self.add(record)
+        return self
+
+    def record_key(self, record: Dict):
+        if self.key is None:
+            self.sequence += 1
+            return self.sequence
+        return record[self.key]
+
+    def snapshot(self, record: Dict) -> Tuple:
+        return (tuple(record.get(field) for field in self.group_by + self.count_by)
+                + tuple(tuple(record.get(field) or ()) for field in self.multi))
+
+    def add(self, record: Dict):
+        """Add a record, or replace the one with the same key"""
+        key = self.record_key(record)
+        previous = self.snapshots.get(key)
+        current = self.snapshot(record)
+        if previous is not None:
+            self.discard(key, previous, keep=current)
+        else:
+            self.total += 1
+        self.snapshots[key] = current
+
+        single = self.group_by + self.count_by
+        for index, field in enumerate(single):
+            value = current[index]
+            if field in self.group_by:
+                members = self.groups[field].setdefault(value, {})
+                # A record that stays in its group keeps its position there
+                members[key] = record
+            if previous is None or previous[index] != value:
+                self.counts[field][value] += 1
+        for offset, field in enumerate(self.multi):
+            old_items = previous[len(single) + offset] if previous is not None else ()
+            if old_items != current[len(single) + offset]:
+                self.counts[field].update(current[len(single) + offset])
+
+    def remove(self, record: Dict):
+        key = record[self.key] if self.key is not None else None
+        previous = self.snapshots.pop(key, None)
+        if previous is None:
+            return
+        self.discard(key, previous)
+        self.total -= 1
+
+    def discard(self, key, previous: Tuple, keep: Optional[Tuple] = None):
+        """Undo a record's contributions, except those that are unchanged in keep"""
+        single = self.group_by + self.count_by
+        for index, field in enumerate(single):
+            value = previous[index]
+            if keep is not None and keep[index] == value:
+                continue
+            if field in self.group_by:
+                members = self.groups[field].get(value, {})
+                members.pop(key, None)
+                if not members:
+                    self.groups[field].pop(value, None)
+            self.decrement(self.counts[field], [value])
+        for offset, field in enumerate(self.multi):
+            items = previous[len(single) + offset]
+            if keep is not None and keep[len(single) + offset] == items:
+                continue
+            self.decrement(self.counts[field], items)
+
+    @staticmethod
+    def decrement(counter: Counter, values: Iterable):
+        for value in values:
+            counter[value] -= 1
+            if counter[value] <= 0:
+                del counter[value]
+
+    def count(self, field: str, value) -> int:
+        return self.counts[field].get(value, 0)
+
+    def top(self, field: str, k: int) -> List[Tuple[object, int]]:
+        """The k most frequent values (ties in first-seen order), without sorting every value"""
+        return heapq.nlargest(k, self.counts[field].items(), key=lambda item: item[1])
+
+    def group(self, field: str) -> Dict[object, List[Dict]]:
+        """Records per value of a group_by field, in first-seen order"""
+        return {value: list(members.values()) for value, members in self.groups[field].items()}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming extractor against the original regex extraction
+Synthetic pages only, so results are reproducible offline
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+
+from extractor import StreamingExtractor, extract_text
+
+
+def legacy_extract_text_content(html: str, url: str) -> str:
+    """The regex-chain extractor previously used by EquityPerpsResearchScraper"""
+    # Remove script and style elements
+    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL)
+    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL)
+    
+    # Extract title
+    title_match = re.search(r'<title[^>]*>(.*?)</title>', html, re.IGNORECASE)
+    title = title_match.group(1) if title_match else ""
+    
+    # Extract meta description
+    desc_match = re.search(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', html, re.IGNORECASE)
+    description = desc_match.group(1) if desc_match else ""
+    
+    # Extract article body (common patterns)
+    body = ""
+    for pattern in [
+        r'<article[^>]*>(.*?)</article>',
+        r'<main[^>]*>(.*?)</main>',
+        r'<div[^>]*class=["\'][^"\']*content[^"\']*["\'][^>]*>(.*?)</div>',
+    ]:
+        match = re.search(pattern, html, re.DOTALL | re.IGNORECASE)
+        if match:
+            body = match.group(1)
+            break
+    
+    # Clean HTML tags
+    text = re.sub(r'<[^>]+>', ' ', body if body else html)
+    text = re.sub(r'\s+', ' ', text)
+    
+    return f"Title: {title}\n\nDescription: {description}\n\nContent Extract:\n{text[:5000]}"
+
+
+def make_page(size: int, with_article: bool = True) -> str:
+    """Build a synthetic news page of roughly `size` characters"""
+    head = ("<html><head><title>Hyperliquid stock perps</title>"
+            "<meta name=\"description\" content=\"Equity perpetuals on-chain\">"
+            "<style>body { font-family: sans-serif; }</style></head><body>")
+    script = "<script>var feed = [" + ",".join(str(i) for i in range(200)) + "];</script>"
+    paragraph = ("<p>Funding rates keep the perp price close to the index. "
+                 "<a href=\"/x\">Aster</a> lists 50x leverage on US equities.</p>\n")
+    parts = [head, "<div class=\"nav\">Home | Markets</div>"]
+    if with_article:
+        parts.append("<article>")
+    size_so_far = sum(len(p) for p in parts)
+    while size_so_far < size:
+        part = script if len(parts) % 10 == 0 else paragraph
+        parts.append(part)
+        size_so_far += len(part)
+    if with_article:
+        parts.append("</article>")
+    parts.append("<footer>(c) 2025</footer></body></html>")
+    return "".join(parts)
+
+
+def timed(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def streamed(data: bytes, chunk_size: int = 64 * 1024) -> str:
+    """Feed an encoded page in network-sized chunks"""
+    extractor = StreamingExtractor()
+    for offset in range(0, len(data), chunk_size):
+        extractor.feed(data[offset:offset + chunk_size])
+    extractor.close()
+    return extractor.render()
+
+
+def run(sizes, repeat: int):
+    print(f"{'page':>18} {'legacy ms':>10} {'stream ms':>10} {'chunked ms':>11} {'legacy peak':>12} {'chunked peak':>13}")
+    cases = [(f"{size // 1024}KB", make_page(size)) for size in sizes]
+    cases.append((f"{sizes[-1] // 1024}KB no-article", make_page(sizes[-1], with_article=False)))
+    # Unterminated <script> tags: each one sends the DOTALL scan to the end of the page
+    cases.append(("unclosed scripts", "<html><body>" + "<script>x<p>text</p>" * 2000 + "</body></html>"))
+    for name, html in cases:
+        data = html.encode('utf-8')
+        legacy = timed(lambda: legacy_extract_text_content(html, ""), repeat)
+        stream = timed(lambda: extract_text(html), repeat)
+        chunked = timed(lambda: streamed(data), repeat)
+        legacy_peak = peak_memory(lambda: legacy_extract_text_content(html, ""))
+        chunked_peak = peak_memory(lambda: streamed(data))
+        print(f"{name:>18} {legacy * 1000:>10.1f} {stream * 1000:>10.1f} {chunked * 1000:>11.1f} "
+              f"{legacy_peak // 1024:>10}KB {chunked_peak // 1024:>11}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML extractors")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16 * 1024, 1024 * 1024, 4 * 1024 * 1024],
+                        help="page sizes in bytes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
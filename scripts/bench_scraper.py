@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Reproducible scraper benchmarks against a local HTTP stand-in
+End-to-end crawls over synthetic sites plus micro-benchmarks, saved as JSON baselines
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+from bench_extract import make_page, timed
+from organize import ResearchOrganizer
+from scraper import EquityPerpsResearchScraper
+
+# Two host names for one server, so per-domain rate limiting and statistics see two sites
+HOSTS = ('127.0.0.1', 'localhost')
+
+# Article mix per block of ten: (route, description)
+MIX = [
+    ('page/16384', 'small page'),
+    ('page/16384', 'small page'),
+    ('page/65536', 'medium page'),
+    ('page/65536', 'medium page'),
+    ('page/262144', 'large page'),
+    ('page/1048576', 'very large page'),
+    ('slow/200', 'slow response'),
+    ('redirect', 'redirect'),
+    ('status/{error}', 'error'),
+    ('paper/40', 'PDF'),
+]
+
+WORDS = ("perpetual funding rate oracle leverage Hyperliquid Aster PancakeSwap equity index "
+         "liquidation margin basis premium settlement order book market maker volume").split()
+
+
+def pdf_literal(text: str) -> bytes:
+    return b'(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)').encode('latin-1') + b')'
+
+
+@lru_cache(maxsize=None)
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """A text PDF with Flate-compressed content streams and a classic xref table"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for page in range(pages):
+        lines = [' '.join(WORDS[(page * 7 + line * 3 + word) % len(WORDS)] for word in range(12))
+                 for line in range(lines_per_page)]
+        content = b"BT /F1 10 Tf 12 TL 72 760 Td " + b" T* ".join(pdf_literal(line) + b" Tj" for line in lines) + b" ET"
+        stream = zlib.compress(content)
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_number = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number)
+        kids.append(len(objects))
+    objects[1] = (b"<< /Type /Pages /Count %d /Kids [" % pages
+                  + b" ".join(b"%d 0 R" % kid for kid in kids) + b"] >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+@lru_cache(maxsize=None)
+def page_body(size: int, key: str) -> bytes:
+    return make_page(size).replace("Hyperliquid stock perps", f"Benchmark article {key}", 1).encode('utf-8')
+
+
+class BenchHandler(BaseHTTPRequestHandler):
+    """Synthetic site: /page/<bytes>/<key>, /slow/<ms>/<key>, /redirect/<key>,
+    /status/<code>/<key> and /paper/<pages>/<key>.pdf, with ETags and 304s"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        route = parts[0]
+        if route == 'redirect':
+            self.send_response(301)
+            self.send_header('Location', f"/page/16384/{parts[1]}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif route == 'status':
+            self.send_response(int(parts[1]))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif route == 'paper':
+            self.send_body(make_pdf(int(parts[1])), 'application/pdf')
+        elif route == 'slow':
+            time.sleep(int(parts[1]) / 1000)
+            self.send_body(page_body(16384, parts[2]), 'text/html; charset=utf-8')
+        else:
+            self.send_body(page_body(int(parts[1]), parts[2]), 'text/html; charset=utf-8')
+
+    def send_body(self, body: bytes, content_type: str):
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BenchHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def synthetic_articles(port: int, count: int) -> List[Dict]:
+    articles = []
+    for i in range(count):
+        route, _ = MIX[i % len(MIX)]
+        route = route.format(error=404 if i % 20 < 10 else 500)
+        suffix = '.pdf' if route.startswith('paper') else ''
+        articles.append({
+            "id": f"bench-{i:05d}",
+            "title": f"Benchmark article {i}",
+            "url": f"http://{HOSTS[i % len(HOSTS)]}:{port}/{route}/bench-{i:05d}{suffix}",
+            "category": ("defi-dex", "cefi", "academic", "analysis")[i % 4],
+            "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "platform": ("Hyperliquid", "Aster", "PancakeSwap", "Bitget")[i % 4],
+            "key_topics": [WORDS[i % len(WORDS)], WORDS[(i * 3) % len(WORDS)]],
+        })
+    return articles
+
+
+class BenchScraper(EquityPerpsResearchScraper):
+    """Scraper over a fixed synthetic article list"""
+
+    def __init__(self, articles: List[Dict], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bench_articles = articles
+
+    def load_articles_metadata(self) -> List[Dict]:
+        return [dict(article) for article in self.bench_articles]
+
+
+def crawl(base_dir: Path, articles: List[Dict], workers: int, cache_ttl: float) -> Dict:
+    """One full scrape_all; errors are given up on at once so no run waits on backoff"""
+    scraper = BenchScraper(articles, str(base_dir), max_workers=workers, domain_rate=1000, domain_burst=100,
+                           cache_ttl=cache_ttl, max_attempts=1)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.scrape_all(concurrent=workers > 1, report_path=base_dir / "run_report.json")
+    seconds = time.perf_counter() - start
+    report = scraper.metrics.report()
+    scraper.frontier.close()
+    return {
+        'seconds': round(seconds, 6),
+        'articles_per_second': round(len(articles) / seconds, 3),
+        'bytes_network': report['counters'].get('bytes.network', 0),
+        'cache_hit_rate': report['cache'].get('hit_rate'),
+        'statuses': {key.split('.', 1)[1]: value for key, value in report['counters'].items()
+                     if key.startswith('status.')},
+        'stages': {stage: {key: summary[key] for key in ('count', 'mean', 'p50', 'p90', 'max')}
+                   for stage, summary in report['stages'].items()},
+    }
+
+
+def bench_crawls(work_dir: Path, count: int, workers: int) -> Dict[str, Dict]:
+    results = {}
+    with local_server() as port:
+        articles = synthetic_articles(port, count)
+        base_dir = work_dir / "crawl"
+        # Cold: empty cache and index; then every page revalidated with a conditional GET (304s)
+        results['crawl_cold'] = crawl(base_dir, articles, workers, cache_ttl=3600)
+        results['crawl_revalidate'] = crawl(base_dir, articles, workers, cache_ttl=0)
+        # Unchanged corpus within the cache TTL: no requests at all
+        results['crawl_fresh'] = crawl(base_dir, articles, workers, cache_ttl=3600)
+        if workers > 1:
+            sequential_dir = work_dir / "crawl_sequential"
+            results['crawl_cold_sequential'] = crawl(sequential_dir, articles, 1, cache_ttl=3600)
+    return results
+
+
+def bench_extract(work_dir: Path, repeat: int) -> Dict[str, Dict]:
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = EquityPerpsResearchScraper(str(work_dir / "extract"))
+    for size in (16 * 1024, 256 * 1024, 1024 * 1024):
+        html = make_page(size)
+        seconds = timed(lambda: scraper.extract_text_content(html, "http://localhost/"), repeat)
+        results[f'extract_{size // 1024}KB'] = {'seconds': round(seconds, 6),
+                                                'mb_per_second': round(len(html) / seconds / 1e6, 3)}
+    scraper.frontier.close()
+    return results
+
+
+def bench_save(work_dir: Path, count: int) -> Dict[str, Dict]:
+    """save_article over pre-spooled bodies (raw move, text file, dedup check)"""
+    base_dir = work_dir / "save"
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = EquityPerpsResearchScraper(str(base_dir))
+    articles = synthetic_articles(0, count)
+    downloads = []
+    for article in articles:
+        body = page_body(16384, article['id'])
+        path = scraper.raw_dir / f"{article['id']}.part"
+        path.write_bytes(body)
+        downloads.append({'path': path, 'digest': hashlib.sha256(body).hexdigest(),
+                          'text': scraper.extract_text_content(body.decode('utf-8'), article['url']),
+                          'content_type': 'text/html', 'encoding': 'utf-8', 'size': len(body)})
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for article, download in zip(articles, downloads):
+            scraper.save_article(article, download)
+    seconds = time.perf_counter() - start
+    scraper.frontier.close()
+    return {'save_article': {'seconds': round(seconds, 6), 'per_article': round(seconds / count, 6),
+                             'articles': count}}
+
+
+def bench_organize(work_dir: Path, count: int) -> Dict[str, Dict]:
+    """ResearchOrganizer.run over a metadata file scaled up from the real one"""
+    base_dir = work_dir / "organize"
+    (base_dir / "data").mkdir(parents=True)
+    source = Path(__file__).resolve().parent.parent / "data" / "articles_metadata.json"
+    with open(source, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    originals = metadata['articles']
+    metadata['articles'] = [dict(originals[i % len(originals)], id=f"{originals[i % len(originals)]['id']}-{i}")
+                            for i in range(count)]
+    with open(base_dir / "data" / "articles_metadata.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+
+    results = {}
+    for name in ('organize_cold', 'organize_warm'):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ResearchOrganizer(str(base_dir)).run()
+        results[name] = {'seconds': round(time.perf_counter() - start, 6), 'articles': count}
+    return results
+
+
+def environment() -> Dict:
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results: Dict, baseline: Dict):
+    """Print each benchmark's time next to the baseline's"""
+    print(f"{'benchmark':<24}{'seconds':>11}{'baseline':>11}{'change':>9}")
+    for name, result in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name) if baseline else None
+        line = f"{name:<24}{result['seconds']:>11.4f}"
+        if previous and previous.get('seconds'):
+            change = (result['seconds'] - previous['seconds']) / previous['seconds'] * 100
+            line += f"{previous['seconds']:>11.4f}{change:>+8.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local HTTP server")
+    parser.add_argument("--articles", type=int, default=60, help="synthetic articles per crawl")
+    parser.add_argument("--workers", type=int, default=8, help="fetch workers for the concurrent crawls")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions for micro-benchmarks (best is kept)")
+    parser.add_argument("--organize-articles", type=int, default=5000)
+    parser.add_argument("--only", nargs="+", choices=["crawl", "extract", "save", "organize"],
+                        help="run only these groups")
+    parser.add_argument("--output-dir", default="../data/benchmarks")
+    parser.add_argument("--baseline", default="baseline", help="baseline name to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    groups = args.only or ["crawl", "extract", "save", "organize"]
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_scraper_"))
+    benchmarks = {}
+    try:
+        if "crawl" in groups:
+            benchmarks.update(bench_crawls(work_dir, args.articles, args.workers))
+        if "extract" in groups:
+            benchmarks.update(bench_extract(work_dir, args.repeat))
+        if "save" in groups:
+            benchmarks.update(bench_save(work_dir, args.articles * 4))
+        if "organize" in groups:
+            benchmarks.update(bench_organize(work_dir, args.organize_articles))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {'environment': environment(), 'benchmarks': benchmarks}
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    baseline_path = output_dir / f"{args.baseline}.json"
+    baseline = None
+    if baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    compare(results, baseline)
+
+    targets = [output_dir / "latest.json"] + ([baseline_path] if args.save_baseline else [])
+    for path in targets:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {path}")
+    if baseline is None and not args.save_baseline:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
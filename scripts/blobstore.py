@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Content-addressed raw document store
+Bodies are keyed by their SHA-256 and stored compressed, either as sharded loose files or
+appended to pack files with a fixed-width offset index for random access
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+# Codec name -> (id stored in the pack index, loose file suffix)
+CODECS = {'gzip': (0, '.gz'), 'zstd': (1, '.zst')}
+CODEC_NAMES = {codec_id: name for name, (codec_id, _) in CODECS.items()}
+
+# Pack index record: digest, pack number, offset, stored length, raw size, codec id
+INDEX_RECORD = struct.Struct('<32sIQQQB')
+
+# Start a new pack file once the current one reaches this size
+MAX_PACK_BYTES = 1024 * 1024 * 1024
+
+COPY_CHUNK = 1024 * 1024
+
+
+class BlobError(Exception):
+    pass
+
+
+def file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def compressing_writer(fileobj: BinaryIO, codec: str, level: int):
+    """Writer that compresses into fileobj and leaves it open when closed"""
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).stream_writer(fileobj, closefd=False)
+    return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=level, mtime=0)
+
+
+def decompressing_reader(fileobj: BinaryIO, codec: str) -> BinaryIO:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise BlobError("blob is zstd-compressed but the zstandard module is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=True)
+    return gzip.GzipFile(fileobj=fileobj, mode='rb')
+
+
+class BlobStore:
+    """Compressed bodies addressed by SHA-256, so identical bodies are stored once
+
+    Loose blobs live at objects/ab/cd/<digest>.gz (two shard levels keep directories
+    small). In packed mode new blobs are appended to packs/pack-NNNNN.dat instead and
+    located through packs/index.bin, one fixed-width record per blob.
+    """
+
+    def __init__(self, root: Path, codec: Optional[str] = None, packed: bool = False,
+                 level: Optional[int] = None, max_pack_bytes: int = MAX_PACK_BYTES):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.packs_dir = self.root / "packs"
+        self.index_path = self.packs_dir / "index.bin"
+        self.codec = codec or 'gzip'
+        if self.codec not in CODECS:
+            raise BlobError(f"unknown codec {self.codec}")
+        if self.codec == 'zstd' and zstandard is None:
+            raise BlobError("zstd requested but the zstandard module is not installed")
+        self.level = level if level is not None else (3 if self.codec == 'zstd' else 6)
+        self.packed = packed
+        self.max_pack_bytes = max_pack_bytes
+        self.lock = threading.Lock()
+        self.pack_index: Dict[bytes, Tuple[int, int, int, int, int]] = self.load_pack_index()
+        self.pack_files: Dict[int, BinaryIO] = {}
+
+    def close(self):
+        with self.lock:
+            for f in self.pack_files.values():
+                f.close()
+            self.pack_files = {}
+
+    def loose_path(self, digest: str, codec: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:4] / (digest + CODECS[codec][1])
+
+    def find_loose(self, digest: str) -> Optional[Tuple[Path, str]]:
+        for codec in (self.codec,) + tuple(name for name in CODECS if name != self.codec):
+            path = self.loose_path(digest, codec)
+            if path.exists():
+                return path, codec
+        return None
+
+    def put_loose(self, source: BinaryIO, digest: str):
+        path = self.loose_path(digest, self.codec)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            with compressing_writer(f, self.codec, self.level) as writer:
+                shutil.copyfileobj(source, writer, COPY_CHUNK)
+        os.replace(tmp_path, path)
+
+    def load_pack_index(self) -> Dict[bytes, Tuple[int, int, int, int, int]]:
+        """Read every index record; a torn record at the end (interrupted append) is ignored"""
+        if not self.index_path.exists():
+            return {}
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        return {record[0]: record[1:] for record in INDEX_RECORD.iter_unpack(data[:usable])}
+
+    def pack_path(self, number: int) -> Path:
+        return self.packs_dir / f"pack-{number:05d}.dat"
+
+    def current_pack(self) -> int:
+        """Number of the pack to append to (lock held)"""
+        numbers = sorted(int(path.stem[5:]) for path in self.packs_dir.glob("pack-*.dat"))
+        if not numbers:
+            return 0
+        last = numbers[-1]
+        return last + 1 if self.pack_path(last).stat().st_size >= self.max_pack_bytes else last
+
+    def put_packed(self, source: BinaryIO, digest: str, size: int):
+        """Append a compressed blob to the current pack, then record it in the index (lock held)"""
+        self.packs_dir.mkdir(parents=True, exist_ok=True)
+        number = self.current_pack()
+        with open(self.pack_path(number), 'ab') as f:
+            offset = f.tell()
+            with compressing_writer(f, self.codec, self.level) as writer:
+                shutil.copyfileobj(source, writer, COPY_CHUNK)
+            f.flush()
+            length = f.tell() - offset
+        record = (number, offset, length, size, CODECS[self.codec][0])
+        with open(self.index_path, 'ab') as f:
+            f.write(INDEX_RECORD.pack(bytes.fromhex(digest), *record))
+        self.pack_index[bytes.fromhex(digest)] = record
+
+    def read_packed(self, record: Tuple[int, int, int, int, int]) -> bytes:
+        number, offset, length, _, _ = record
+        with self.lock:
+            f = self.pack_files.get(number)
+            if f is None:
+                f = self.pack_files[number] = open(self.pack_path(number), 'rb')
+        # pread does not move a shared file position, so concurrent readers are safe
+        return os.pread(f.fileno(), length, offset)
+
+    def exists(self, digest: Optional[str]) -> bool:
+        if not digest:
+            return False
+        return bytes.fromhex(digest) in self.pack_index or self.find_loose(digest) is not None
+
+    def put_file(self, path: Path, digest: Optional[str] = None, move: bool = True) -> str:
+        """Store a file's bytes under their digest; with move=True the source file is removed
+
+        A body that is already stored costs one lookup and no write.
+        """
+        path = Path(path)
+        digest = digest or file_digest(path)
+        with self.lock:
+            if not (bytes.fromhex(digest) in self.pack_index or self.find_loose(digest)):
+                with open(path, 'rb') as source:
+                    if self.packed:
+                        self.put_packed(source, digest, path.stat().st_size)
+                    else:
+                        self.put_loose(source, digest)
+        if move:
+            path.unlink(missing_ok=True)
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            if not (bytes.fromhex(digest) in self.pack_index or self.find_loose(digest)):
+                if self.packed:
+                    self.put_packed(io.BytesIO(data), digest, len(data))
+                else:
+                    self.put_loose(io.BytesIO(data), digest)
+        return digest
+
+    def open(self, digest: str) -> BinaryIO:
+        """Decompressing reader over a blob"""
+        record = self.pack_index.get(bytes.fromhex(digest))
+        if record:
+            return decompressing_reader(io.BytesIO(self.read_packed(record)), CODEC_NAMES[record[4]])
+        found = self.find_loose(digest)
+        if not found:
+            raise BlobError(f"no blob {digest}")
+        path, codec = found
+        return decompressing_reader(open(path, 'rb'), codec)
+
+    def read(self, digest: str) -> bytes:
+        with self.open(digest) as f:
+            return f.read()
+
+    def loose_digests(self) -> Iterator[Tuple[str, Path, str]]:
+        suffixes = {suffix: codec for codec, (_, suffix) in CODECS.items()}
+        if not self.objects_dir.exists():
+            return
+        for shard in os.scandir(self.objects_dir):
+            for subshard in os.scandir(shard.path):
+                for entry in os.scandir(subshard.path):
+                    digest, _, suffix = entry.name.partition('.')
+                    if '.' + suffix in suffixes:
+                        yield digest, Path(entry.path), suffixes['.' + suffix]
+
+    def digests(self) -> Set[str]:
+        return {digest.hex() for digest in self.pack_index} | {digest for digest, _, _ in self.loose_digests()}
+
+    def stats(self) -> Dict:
+        loose = list(self.loose_digests())
+        packs = list(self.packs_dir.glob("pack-*.dat")) if self.packs_dir.exists() else []
+        return {
+            'loose_blobs': len(loose),
+            'loose_bytes': sum(path.stat().st_size for _, path, _ in loose),
+            'packed_blobs': len(self.pack_index),
+            'packed_bytes': sum(path.stat().st_size for path in packs),
+            'packed_raw_bytes': sum(record[3] for record in self.pack_index.values()),
+            'packs': len(packs),
+        }
+
+    def pack(self) -> int:
+        """Move every loose blob into packs (stored bytes are copied, not recompressed)"""
+        moved = 0
+        with self.lock:
+            self.packs_dir.mkdir(parents=True, exist_ok=True)
+            for digest, path, codec in list(self.loose_digests()):
+                key = bytes.fromhex(digest)
+                if key not in self.pack_index:
+                    number = self.current_pack()
+                    data = path.read_bytes()
+                    with open(self.pack_path(number), 'ab') as f:
+                        offset = f.tell()
+                        f.write(data)
+                    # Raw size comes from the gzip trailer (mod 2^32); zstd frames are measured
+                    size = (struct.unpack('<I', data[-4:])[0] if codec == 'gzip'
+                            else len(decompressing_reader(io.BytesIO(data), codec).read()))
+                    record = (number, offset, len(data), size, CODECS[codec][0])
+                    with open(self.index_path, 'ab') as f:
+                        f.write(INDEX_RECORD.pack(key, *record))
+                    self.pack_index[key] = record
+                path.unlink()
+                moved += 1
+        return moved
+
+    def gc(self, live: Set[str]) -> Dict[str, int]:
+        """Drop blobs not in live: loose files are deleted, packs are rewritten without them"""
+        removed = {'loose': 0, 'packed': 0}
+        for digest, path, _ in list(self.loose_digests()):
+            if digest not in live:
+                path.unlink()
+                removed['loose'] += 1
+        live_keys = {bytes.fromhex(digest) for digest in live}
+        dead = [key for key in self.pack_index if key not in live_keys]
+        if not dead:
+            return removed
+        self.close()
+        with self.lock:
+            old_index = self.pack_index
+            old_packs = sorted(self.packs_dir.glob("pack-*.dat"))
+            # Rewrite surviving blobs into fresh packs numbered after the old ones
+            first = int(old_packs[-1].stem[5:]) + 1 if old_packs else 0
+            number, written = first, 0
+            tmp_index = self.index_path.with_name(self.index_path.name + '.tmp')
+            new_index = {}
+            out = open(self.pack_path(number), 'ab')
+            try:
+                with open(tmp_index, 'wb') as index_file:
+                    for key, record in old_index.items():
+                        if key not in live_keys:
+                            continue
+                        with open(self.pack_path(record[0]), 'rb') as f:
+                            data = os.pread(f.fileno(), record[2], record[1])
+                        if written and written + len(data) > self.max_pack_bytes:
+                            out.close()
+                            number, written = number + 1, 0
+                            out = open(self.pack_path(number), 'ab')
+                        out.write(data)
+                        new_record = (number, written, len(data), record[3], record[4])
+                        written += len(data)
+                        index_file.write(INDEX_RECORD.pack(key, *new_record))
+                        new_index[key] = new_record
+            finally:
+                out.close()
+            os.replace(tmp_index, self.index_path)
+            for path in old_packs:
+                path.unlink()
+            self.pack_index = new_index
+        removed['packed'] = len(dead)
+        return removed
+
+
+def referenced_digests(data_dir: Path) -> Set[str]:
+    """Blob digests referenced by data/index.json"""
+    index_path = Path(data_dir) / "index.json"
+    if not index_path.exists():
+        return set()
+    with open(index_path, 'r', encoding='utf-8') as f:
+        return {entry['raw_blob'] for entry in json.load(f) if entry.get('raw_blob')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and maintain the raw document store")
+    parser.add_argument("--base-dir", default="..")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="blob counts and sizes")
+    cat = subparsers.add_parser("cat", help="write a blob's original bytes to stdout")
+    cat.add_argument("digest")
+    subparsers.add_parser("pack", help="move loose blobs into pack files")
+    subparsers.add_parser("gc", help="remove blobs no longer referenced by data/index.json")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    store = BlobStore(base_dir / "articles" / "raw" / "store")
+    if args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    elif args.command == "cat":
+        with store.open(args.digest) as f:
+            shutil.copyfileobj(f, sys.stdout.buffer)
+    elif args.command == "pack":
+        print(f"Packed {store.pack()} blobs")
+    elif args.command == "gc":
+        removed = store.gc(referenced_digests(base_dir / "data"))
+        print(f"Removed {removed['loose']} loose and {removed['packed']} packed blobs")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Incremental report builds
+Each report target records a fingerprint of its inputs; unchanged targets are skipped and
+rendered output is only written when its bytes differ from the file on disk
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace a file's content; untouched (mtime included) when the bytes already match"""
+    path = Path(path)
+    data = content.encode('utf-8')
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def input_value(value):
+    """JSON-friendly form of an input; files are represented by their stat signature"""
+    if isinstance(value, Path):
+        try:
+            stat = value.stat()
+            return ['file', str(value), stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            return ['file', str(value), None]
+    if isinstance(value, dict):
+        return {str(key): input_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [input_value(item) for item in value]
+        return sorted(items, key=json.dumps) if isinstance(value, (set, frozenset)) else items
+    return value
+
+
+class BuildGraph:
+    def __init__(self, state_path: Path):
+        self.state_path = Path(state_path)
+        self.state: Dict[str, str] = self.load_state()
+        self.code_versions: Dict[str, str] = {}
+        self.dirty = False
+
+    def load_state(self) -> Dict[str, str]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Persist target fingerprints atomically (only when a build changed them)"""
+        if not self.dirty:
+            return
+        write_if_changed(self.state_path, json.dumps(self.state, indent=2, sort_keys=True))
+        self.dirty = False
+
+    def code_version(self, render: Callable) -> str:
+        """Hash of the module defining the renderer, so code changes rebuild its reports"""
+        source = inspect.getsourcefile(render) or ''
+        if source not in self.code_versions:
+            try:
+                with open(source, 'rb') as f:
+                    self.code_versions[source] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                self.code_versions[source] = ''
+        return self.code_versions[source]
+
+    def fingerprint(self, inputs: Dict, render: Callable) -> str:
+        payload = [render.__qualname__, self.code_version(render), input_value(inputs)]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def build(self, target: Path, inputs: Dict, render: Callable[[], str]) -> Optional[bool]:
+        """Bring one target up to date
+
+        Returns None when the inputs are unchanged (nothing rendered), otherwise
+        whether rendering produced new bytes on disk.
+        """
+        target = Path(target)
+        key = os.path.relpath(target.resolve(), self.state_path.parent.resolve())
+        fingerprint = self.fingerprint(inputs, render)
+        if self.state.get(key) == fingerprint and target.exists():
+            return None
+        written = write_if_changed(target, render())
+        self.state[key] = fingerprint
+        self.dirty = True
+        return written
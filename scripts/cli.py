@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Research command line
+One entry point for scrape, organize, search and stats; `serve` keeps them warm behind a Unix socket
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Socket of the `serve` daemon, under the data directory of the base dir it serves
+SOCKET_NAME = "cli.sock"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Equity perps research tools")
+    parser.add_argument("--base-dir", default="..")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="run in this process even when `cli.py serve` is running")
+    sub = parser.add_subparsers(dest="command", required=True)
+    # Scrape options belong to scraper.py, which is only imported when scraping
+    sub.add_parser("scrape", add_help=False, help="fetch articles (options as in scraper.py)")
+    sub.add_parser("organize", help="rebuild the reports in docs/ whose inputs changed")
+    search_parser = sub.add_parser("search", help='e.g. \'"funding rate" platform:Hyperliquid after:2025-06\'')
+    search_parser.add_argument("query")
+    search_parser.add_argument("-k", "--limit", type=int, default=10)
+    search_parser.add_argument("--json", action="store_true", help="print results as JSON")
+    sub.add_parser("stats", help="article counts, index size, facts and the latest run report")
+    sub.add_parser("serve", help="keep the store, indexes and HTTP pool warm for later commands")
+    sub.add_parser("stop", help="stop the running `serve` daemon")
+    return parser
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse a command line; whatever follows `scrape` is left for scraper.py's own parser"""
+    parser = build_parser()
+    args, args.options = parser.parse_known_args(argv)
+    if args.options and args.command != 'scrape':
+        parser.error(f"unrecognized arguments: {' '.join(args.options)}")
+    return args
+
+
+def socket_path(base_dir: Path) -> Path:
+    return Path(base_dir).resolve() / "data" / SOCKET_NAME
+
+
+class Workspace:
+    """State that outlives one command: a daemon keeps it, a one-off run builds it once"""
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir).resolve()
+        self.data_dir = self.base_dir / "data"
+        self.index = None
+        # HTTP sessions by pool size, so a later scrape reuses live connections
+        self.sessions = {}
+
+    def warm(self):
+        """Import every command's modules and open the store and index ahead of the first request"""
+        import organize  # noqa: F401
+        import scraper  # noqa: F401
+        from metadata_store import load_store
+        if (self.data_dir / "articles_metadata.json").exists():
+            load_store(self.data_dir)
+        self.search_index()
+
+    def search_index(self):
+        from search_index import SearchIndex
+        if self.index is None:
+            self.index = SearchIndex(self.data_dir / "search")
+        else:
+            self.index.refresh()
+        return self.index
+
+    def scrape(self, argv: List[str]) -> int:
+        import scraper
+        parser = argparse.ArgumentParser(prog="cli.py scrape", description="Fetch equity perps research articles")
+        scraper.add_arguments(parser)
+        options = parser.parse_args(argv)
+        try:
+            crawler = scraper.run(options, base_dir=str(self.base_dir), session=self.sessions.get(options.workers))
+        except ModuleNotFoundError as e:
+            if e.name != 'requests':
+                raise
+            print("scrape needs the requests package: pip install requests", file=sys.stderr)
+            return 1
+        if crawler.http_session is not None:
+            self.sessions[options.workers] = crawler.http_session
+        return 0
+
+    def organize(self) -> int:
+        from organize import ResearchOrganizer
+        ResearchOrganizer(str(self.base_dir)).run()
+        return 0
+
+    def search(self, query: str, limit: int, as_json: bool) -> int:
+        from search_index import print_results
+        start = time.perf_counter()
+        results = self.search_index().search(query, limit=limit)
+        print_results(results, (time.perf_counter() - start) * 1000, as_json=as_json)
+        return 0
+
+    def stats(self) -> int:
+        from metadata_store import load_store, print_stats
+        from metrics import latest_report, print_report
+        if (self.data_dir / "articles_metadata.json").exists():
+            print_stats(load_store(self.data_dir))
+        index = self.search_index()
+        print(f"Search index: {index.doc_count} documents in {len(index.segments)} segments")
+        if (self.data_dir / "facts.db").exists():
+            from facts import load_facts
+            print(f"Facts: {load_facts(self.data_dir).count()}")
+        report = latest_report(self.data_dir / "runs")
+        if report:
+            print_report(report)
+        return 0
+
+    def run(self, args: argparse.Namespace) -> int:
+        if args.command == 'scrape':
+            return self.scrape(args.options)
+        if args.command == 'organize':
+            return self.organize()
+        if args.command == 'search':
+            return self.search(args.query, args.limit, args.json)
+        if args.command == 'stats':
+            return self.stats()
+        print("No daemon running", file=sys.stderr)
+        return 1
+
+
+class SocketWriter:
+    """File-like stream that forwards each write to the client as a JSON line"""
+
+    def __init__(self, conn: socket.socket, key: str):
+        self.conn = conn
+        self.key = key
+        self.connected = True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.send({self.key: text})
+        return len(text)
+
+    def send(self, message: dict):
+        if not self.connected:
+            return
+        try:
+            self.conn.sendall(json.dumps(message).encode('utf-8') + b"\n")
+        except OSError:
+            # Client went away (e.g. Ctrl-C): finish the command, drop its output
+            self.connected = False
+
+    def flush(self):
+        pass
+
+
+def handle(conn: socket.socket, workspace: Workspace) -> bool:
+    """Run one client request; returns False once the client asked the daemon to stop"""
+    # Imported here, not at the top, to keep client start-up lean
+    import traceback
+    from contextlib import redirect_stderr, redirect_stdout
+    with conn.makefile('r', encoding='utf-8') as reader:
+        line = reader.readline()
+    if not line:
+        return True  # connection probe
+    request = json.loads(line)
+    stdout, stderr = SocketWriter(conn, 'out'), SocketWriter(conn, 'err')
+    cwd = os.getcwd()
+    code = 1
+    keep_serving = True
+    try:
+        # Requests run one at a time, so each can take the client's working directory
+        os.chdir(request.get('cwd', cwd))
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                args = parse_args(request.get('argv', []))
+                if args.command == 'stop':
+                    print("Daemon stopped")
+                    keep_serving = False
+                    code = 0
+                elif args.command == 'serve':
+                    print("Daemon already running", file=sys.stderr)
+                else:
+                    code = workspace.run(args)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+    finally:
+        os.chdir(cwd)
+    stdout.send({'exit': code})
+    return keep_serving
+
+
+def serve(base_dir: Path) -> int:
+    path = socket_path(base_dir)
+    if daemon_running(path):
+        print(f"Daemon already running on {path}", file=sys.stderr)
+        return 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()  # left behind by a daemon that was killed
+    workspace = Workspace(base_dir)
+    start = time.perf_counter()
+    workspace.warm()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(str(path))
+        os.chmod(path, 0o600)
+        server.listen()
+        print(f"Serving {workspace.base_dir} on {path} (warmed up in {time.perf_counter() - start:.2f}s)")
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                if not handle(conn, workspace):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
+    return 0
+
+
+def daemon_running(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+def call_daemon(base_dir: Path, argv: List[str]) -> Optional[int]:
+    """Run a command in the daemon, echoing its output; None when no daemon is listening"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with client:
+        try:
+            client.connect(str(socket_path(base_dir)))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        client.sendall(json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode('utf-8') + b"\n")
+        with client.makefile('r', encoding='utf-8') as reader:
+            for line in reader:
+                message = json.loads(line)
+                if 'exit' in message:
+                    return message['exit']
+                stream = sys.stdout if 'out' in message else sys.stderr
+                stream.write(message.get('out', message.get('err')))
+                stream.flush()
+    print("Daemon closed the connection", file=sys.stderr)
+    return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    base_dir = Path(args.base_dir)
+    if args.command == 'serve':
+        return serve(base_dir)
+    if not args.no_daemon:
+        code = call_daemon(base_dir, argv)
+        if code is not None:
+            return code
+    return Workspace(base_dir).run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Packed corpus of extracted article texts
+Texts are concatenated into a few segment files with a fixed-width offset table; the reader
+memory-maps them and hands out zero-copy memoryview slices for bulk analytics
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from search_index import collect_sources, load_document, load_metadata_by_url
+
+# Offset table record per document: segment number, byte offset, byte length
+OFFSET_RECORD = struct.Struct('<IQQ')
+
+# Start a new segment file once the current one reaches this size
+SEGMENT_BYTES = 256 * 1024 * 1024
+
+WORD_RE = re.compile(rb"[A-Za-z0-9]+(?:[.][0-9]+)?")
+
+
+def corpus_fingerprint(sources: List[Dict]) -> str:
+    return hashlib.sha256(json.dumps([[source['key'], source['fingerprint']] for source in sources]).encode()).hexdigest()
+
+
+def pack_corpus(base_dir: Path, corpus_dir: Optional[Path] = None, segment_bytes: int = SEGMENT_BYTES) -> Dict:
+    """Pack every indexable article's text (same set as the search index)
+
+    Skipped when the set of documents and their fingerprints is unchanged;
+    otherwise the corpus is rewritten sequentially into a fresh directory and
+    swapped in, so open readers keep their old mapping.
+    """
+    base_dir = Path(base_dir)
+    corpus_dir = Path(corpus_dir or base_dir / "data" / "corpus")
+    sources = [source for source in collect_sources(base_dir) if source['path'].exists()]
+    fingerprint = corpus_fingerprint(sources)
+    manifest_path = corpus_dir / "docs.json"
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get('fingerprint') == fingerprint:
+                return {'packed': False, 'documents': len(sources)}
+
+    tmp_dir = corpus_dir.with_name(corpus_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    docs = []
+    segment, written = 0, 0
+    out = open(tmp_dir / f"text-{segment:05d}.dat", 'wb')
+    try:
+        with open(tmp_dir / "offsets.bin", 'wb') as offsets:
+            metadata = load_metadata_by_url(base_dir)
+            for source in sources:
+                doc = load_document(source, base_dir, metadata)
+                data = doc.pop('text').encode('utf-8')
+                if written and written + len(data) > segment_bytes:
+                    out.close()
+                    segment, written = segment + 1, 0
+                    out = open(tmp_dir / f"text-{segment:05d}.dat", 'wb')
+                out.write(data)
+                offsets.write(OFFSET_RECORD.pack(segment, written, len(data)))
+                written += len(data)
+                docs.append(doc)
+    finally:
+        out.close()
+    with open(tmp_dir / "docs.json", 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': fingerprint, 'segments': segment + 1, 'docs': docs}, f)
+
+    if corpus_dir.exists():
+        shutil.rmtree(corpus_dir)
+    os.replace(tmp_dir, corpus_dir)
+    return {'packed': True, 'documents': len(docs), 'segments': segment + 1}
+
+
+class CorpusReader:
+    """Read-only, memory-mapped view of a packed corpus
+
+    text() returns a memoryview into the mapping (no copy, no file open per
+    article); decode it only when a str is really needed. Bytes regexes run on
+    the views directly.
+    """
+
+    def __init__(self, corpus_dir: Path):
+        self.corpus_dir = Path(corpus_dir)
+        with open(self.corpus_dir / "docs.json", 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.docs: List[Dict] = manifest['docs']
+        self.positions = {doc['key']: index for index, doc in enumerate(self.docs)}
+        self.files = []
+        self.segments = [self.map(f"text-{number:05d}.dat") for number in range(manifest['segments'])]
+        self.offsets = self.map("offsets.bin")
+
+    def map(self, name: str):
+        path = self.corpus_dir / name
+        if path.stat().st_size == 0:
+            return memoryview(b'')
+        f = open(path, 'rb')
+        self.files.append(f)
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        for view in self.segments + [self.offsets]:
+            view.release()
+        for f in self.files:
+            f.close()
+        self.files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def text(self, index: int) -> memoryview:
+        segment, offset, length = OFFSET_RECORD.unpack_from(self.offsets, index * OFFSET_RECORD.size)
+        return self.segments[segment][offset:offset + length]
+
+    def get(self, key: str) -> Optional[memoryview]:
+        index = self.positions.get(key)
+        return self.text(index) if index is not None else None
+
+    def __iter__(self) -> Iterator[Tuple[Dict, memoryview]]:
+        """Every document with its text, in segment order (sequential reads)"""
+        for index, doc in enumerate(self.docs):
+            yield doc, self.text(index)
+
+    def grep(self, pattern: bytes, flags: int = 0) -> Iterator[Tuple[Dict, re.Match]]:
+        regex = re.compile(pattern, flags)
+        for doc, text in self:
+            for match in regex.finditer(text):
+                yield doc, match
+
+    def topic_counts(self) -> Counter:
+        """Documents whose text mentions each metadata topic (one alternation scan per document)"""
+        topics = sorted({topic for doc in self.docs for topic in doc.get('topics') or []}, key=len, reverse=True)
+        if not topics:
+            return Counter()
+        regex = re.compile(b"|".join(re.escape(topic.encode('utf-8')) for topic in topics), re.IGNORECASE)
+        by_lower = {topic.lower(): topic for topic in topics}
+        counts = Counter()
+        for _, text in self:
+            found = {match.group().decode('utf-8').lower() for match in regex.finditer(text)}
+            counts.update(by_lower[topic] for topic in found if topic in by_lower)
+        return counts
+
+    def ngrams(self, n: int = 2, top: int = 20, min_length: int = 3) -> List[Tuple[str, int]]:
+        """Most frequent word n-grams across the corpus (short words skipped)"""
+        counts = Counter()
+        for _, text in self:
+            words = [word.lower() for word in WORD_RE.findall(text) if len(word) >= min_length]
+            counts.update(zip(*(words[i:] for i in range(n))))
+        return [(b' '.join(gram).decode('utf-8'), count) for gram, count in counts.most_common(top)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack and analyze the extracted-text corpus")
+    parser.add_argument("--base-dir", default="..")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("pack", help="pack article texts into segment files (skipped when unchanged)")
+    sub.add_parser("stats", help="document and segment counts")
+    grep_parser = sub.add_parser("grep", help="regex scan over every article")
+    grep_parser.add_argument("pattern")
+    grep_parser.add_argument("-i", "--ignore-case", action="store_true")
+    ngram_parser = sub.add_parser("ngrams", help="most frequent word n-grams")
+    ngram_parser.add_argument("-n", type=int, default=2)
+    ngram_parser.add_argument("-k", "--top", type=int, default=20)
+    sub.add_parser("topics", help="documents mentioning each metadata topic")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    corpus_dir = base_dir / "data" / "corpus"
+    start = time.perf_counter()
+    if args.command == "pack":
+        stats = pack_corpus(base_dir, corpus_dir)
+        state = "Packed" if stats['packed'] else "Corpus up to date:"
+        print(f"{state} {stats['documents']} documents in {time.perf_counter() - start:.2f}s")
+        return
+    if not (corpus_dir / "docs.json").exists():
+        pack_corpus(base_dir, corpus_dir)
+
+    with CorpusReader(corpus_dir) as reader:
+        if args.command == "stats":
+            size = sum(len(segment) for segment in reader.segments)
+            print(f"{len(reader)} documents, {len(reader.segments)} segments, {size / 1024:.0f}KB of text")
+        elif args.command == "grep":
+            flags = re.IGNORECASE if args.ignore_case else 0
+            for doc, match in reader.grep(args.pattern.encode('utf-8'), flags):
+                print(f"{doc['path']}: {match.group().decode('utf-8', 'replace')}")
+        elif args.command == "ngrams":
+            for gram, count in reader.ngrams(args.n, args.top):
+                print(f"{count:>6}  {gram}")
+        elif args.command == "topics":
+            for topic, count in reader.topic_counts().most_common():
+                print(f"{count:>4}  {topic}")
+    print(f"({time.perf_counter() - start:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for syndicated coverage
+MinHash signatures over word shingles, bucketed with locality-sensitive hashing
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import zlib
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Mersenne prime for the universal hash family
+PRIME = (1 << 61) - 1
+MAX_HASH = 0xFFFFFFFF
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """Hashed word n-grams of the text"""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode())} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+class DuplicateDetector:
+    def __init__(self, store_dir: Path, num_perm: int = 128, bands: int = 16, threshold: float = 0.7,
+                 shingle_size: int = 5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.store_dir = Path(store_dir)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        # Fixed seed: signatures must stay comparable across runs
+        rng = random.Random(1)
+        self.perms = [(rng.randrange(1, PRIME), rng.randrange(0, PRIME)) for _ in range(num_perm)]
+
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.canonical: Dict[str, Optional[str]] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+        self.dirty = False
+        self.load()
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            return tuple([MAX_HASH] * self.num_perm)
+        return tuple(min((a * x + b) % PRIME for x in hashes) & MAX_HASH for a, b in self.perms)
+
+    def band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets"""
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+    def find(self, key: str, signature: Tuple[int, ...]) -> Optional[Tuple[str, float]]:
+        """Best matching earlier document among LSH candidates, if similar enough"""
+        candidates = set()
+        for band_key in self.band_keys(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+        candidates.discard(key)
+
+        best = None
+        for candidate in candidates:
+            score = self.similarity(signature, self.signatures[candidate])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (candidate, score)
+        if best:
+            # Always link to the root of a duplicate cluster
+            root = self.canonical.get(best[0]) or best[0]
+            return root, best[1]
+        return None
+
+    def add(self, key: str, signature: Tuple[int, ...], canonical: Optional[str] = None):
+        self.remove(key)
+        self.signatures[key] = signature
+        self.canonical[key] = canonical
+        for band_key in self.band_keys(signature):
+            self.buckets[band_key].append(key)
+        self.dirty = True
+
+    def remove(self, key: str):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        self.canonical.pop(key, None)
+        for band_key in self.band_keys(signature):
+            bucket = self.buckets.get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self.buckets[band_key]
+        self.dirty = True
+
+    def check(self, key: str, text: str) -> Optional[Tuple[str, float]]:
+        """Record a document and return (canonical key, similarity) if it duplicates one seen before"""
+        signature = self.signature(text)
+        match = self.find(key, signature)
+        self.add(key, signature, match[0] if match else None)
+        return match
+
+    def load(self):
+        """Load persisted signatures and rebuild the LSH buckets"""
+        keys_path = self.store_dir / "keys.json"
+        sig_path = self.store_dir / "signatures.bin"
+        if not keys_path.exists() or not sig_path.exists():
+            return
+        with open(keys_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('num_perm') != self.num_perm or stored.get('shingle_size') != self.shingle_size:
+            # Incompatible parameters: start over rather than compare apples to oranges
+            return
+        values = array('I')
+        with open(sig_path, 'rb') as f:
+            values.frombytes(f.read())
+        for index, (key, canonical) in enumerate(stored['keys']):
+            signature = tuple(values[index * self.num_perm:(index + 1) * self.num_perm])
+            self.signatures[key] = signature
+            self.canonical[key] = canonical
+            for band_key in self.band_keys(signature):
+                self.buckets[band_key].append(key)
+
+    def save(self):
+        """Persist signatures as fixed-width records plus a key list"""
+        if not self.dirty:
+            return
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        values = array('I')
+        keys = []
+        for key, signature in self.signatures.items():
+            values.extend(signature)
+            keys.append([key, self.canonical.get(key)])
+        sig_tmp = self.store_dir / "signatures.bin.tmp"
+        keys_tmp = self.store_dir / "keys.json.tmp"
+        with open(sig_tmp, 'wb') as f:
+            values.tofile(f)
+        with open(keys_tmp, 'w', encoding='utf-8') as f:
+            json.dump({'num_perm': self.num_perm, 'shingle_size': self.shingle_size, 'keys': keys}, f)
+        os.replace(sig_tmp, self.store_dir / "signatures.bin")
+        os.replace(keys_tmp, self.store_dir / "keys.json")
+        self.dirty = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report near-duplicate articles in the corpus")
+    parser.add_argument("--base-dir", default="..")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    detector = DuplicateDetector(base_dir / "data" / "dedup", threshold=args.threshold)
+    index_path = base_dir / "data" / "index.json"
+    paths = []
+    if index_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            paths = [(e['id'], base_dir / e['local_path']) for e in json.load(f)
+                     if e.get('status') == 'success' and e.get('local_path')]
+    paths += [(p.stem, p) for p in sorted((base_dir / "articles").glob("*/*.md")) if p.parent.name != 'raw']
+
+    for key, path in paths:
+        if key in detector.signatures or not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            match = detector.check(key, f.read())
+        if match:
+            print(f"{key} duplicates {match[0]} (similarity {match[1]:.2f})")
+    detector.save()
+
+    clusters = {key for key, canonical in detector.canonical.items() if canonical}
+    print(f"{len(detector.signatures)} documents, {len(clusters)} near-duplicates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+URL discovery from sitemaps and RSS/Atom feeds
+Streams (optionally gzipped) sitemaps, sitemap indexes and feeds, normalizes candidate URLs and
+queues unseen relevant ones for the scraper, using a persistent Bloom filter as the seen-set
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import xml.etree.ElementTree as ET
+from collections import deque
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+CHUNK_SIZE = 64 * 1024
+
+# Query parameters that only track the click or campaign (besides utm_*); dropped so the same
+# article normalizes once. Generic names such as ref or source select content on some sites.
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref_src',
+                   'cmpid', 'igshid', '_ga', 'yclid'}
+
+# Percent escapes in a path; those of unreserved characters are decoded, the rest upper-cased
+ESCAPE_RE = re.compile(r"%([0-9A-Fa-f]{2})")
+LONE_PERCENT_RE = re.compile(r"%(?![0-9A-Fa-f]{2})")
+UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+DEFAULT_KEYWORDS = ['aster', 'hyperliquid', 'pancakeswap', 'bitget', 'ostium', 'stock perps',
+                    'stock perpetual', 'equity perp', 'equity perpetual', 'tokenized stock',
+                    'rwa perp', 'perpetual futures', 'perp dex']
+
+# Platform names looked for in a discovered title/URL, in priority order
+PLATFORMS = ['Hyperliquid', 'Aster', 'PancakeSwap', 'Bitget', 'Ostium']
+
+BLOOM_HEADER = struct.Struct('<4sQIQ')    # magic, bit count, hash count, items added
+BLOOM_MAGIC = b'BLM1'
+
+
+def normalize_segment(segment: str) -> str:
+    """One path segment in canonical escape form; escaped reserved characters (%2F) stay escaped"""
+    def unescape(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED else '%' + match.group(1).upper()
+
+    segment = quote(LONE_PERCENT_RE.sub('%25', segment), safe="!$&'()*+,;=:@-._~%")
+    return ESCAPE_RE.sub(unescape, segment)
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical URL: lowercase host without www., no default port, fragment or tracking
+    parameters, sorted query, resolved dot segments, no trailing slash"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    port = parts.port
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+
+    # Dot segments are resolved on the raw path, so an escaped slash never splits a segment
+    segments = []
+    for segment in parts.path.split('/'):
+        if segment == '..':
+            if segments:
+                segments.pop()
+        elif segment not in ('', '.'):
+            segments.append(normalize_segment(segment))
+    path = '/' + '/'.join(segments)
+
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS)
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+def seen_key(url: str) -> str:
+    """Seen-set key of a normalized URL; http and https count as the same page"""
+    return url.split('://', 1)[1]
+
+
+class BloomFilter:
+    """Fixed-size persistent Bloom filter (memory-mapped bit array)
+
+    Sized for `capacity` items at `error_rate` false positives; memory is
+    -ln(p)/ln(2)^2 bits per item whatever the URL length (about 14 bits at 0.1%).
+    A false positive only means a new URL is skipped; nothing is ever re-queued.
+    """
+
+    def __init__(self, path: Path, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.path = Path(path)
+        if not self.path.exists():
+            bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes, 0))
+                f.truncate(BLOOM_HEADER.size + (bits + 7) // 8)
+        self.file = open(self.path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, self.bits, self.hashes, self.count = BLOOM_HEADER.unpack_from(self.map, 0)
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"{self.path} is not a Bloom filter")
+        self.capacity = int(self.bits * math.log(2) ** 2 / -math.log(error_rate))
+
+    def positions(self, item: str) -> Iterator[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first, second = struct.unpack('<QQ', digest)
+        for i in range(self.hashes):
+            yield (first + i * second) % self.bits
+
+    def __contains__(self, item: str) -> bool:
+        offset = BLOOM_HEADER.size
+        return all(self.map[offset + bit // 8] & (1 << (bit % 8)) for bit in self.positions(item))
+
+    def add(self, item: str) -> bool:
+        """Set the item's bits; returns False if they were all set already"""
+        offset = BLOOM_HEADER.size
+        added = False
+        for bit in self.positions(item):
+            byte = offset + bit // 8
+            mask = 1 << (bit % 8)
+            if not self.map[byte] & mask:
+                self.map[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def flush(self):
+        BLOOM_HEADER.pack_into(self.map, 0, BLOOM_MAGIC, self.bits, self.hashes, self.count)
+        self.map.flush()
+
+    def close(self):
+        self.flush()
+        self.map.close()
+        self.file.close()
+
+
+class ChunkReader(io.RawIOBase):
+    """File-like view over an iterator of byte chunks (e.g. response.iter_content)"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            self.pending = next(self.chunks, None)
+            if self.pending is None:
+                self.pending = b''
+                return 0
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def open_stream(chunks: Iterable[bytes]) -> io.BufferedReader:
+    """Buffered reader over a body, transparently gunzipping .xml.gz payloads"""
+    reader = io.BufferedReader(ChunkReader(chunks), buffer_size=CHUNK_SIZE)
+    if reader.peek(2)[:2] == b'\x1f\x8b':
+        return io.BufferedReader(gzip.GzipFile(fileobj=reader), buffer_size=CHUNK_SIZE)
+    return reader
+
+
+def local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def parse_date(value: Optional[str]) -> Optional[str]:
+    """YYYY-MM-DD from W3C (sitemap/Atom) or RFC 822 (RSS) dates"""
+    if not value:
+        return None
+    value = value.strip()
+    if re.match(r"\d{4}-\d{2}-\d{2}", value):
+        return value[:10]
+    try:
+        return parsedate_to_datetime(value).strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+
+def record_fields(elem) -> Dict:
+    """Link, title and date of one <url>, <sitemap>, <item> or <entry> element"""
+    fields = {'url': None, 'title': None, 'date': None}
+    for child in elem.iter():
+        name = local_name(child.tag)
+        text = (child.text or '').strip()
+        if name == 'loc' and text:
+            fields['url'] = fields['url'] or text
+        elif name == 'link':
+            # RSS puts the URL in the text, Atom in href (prefer rel="alternate")
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                fields['url'] = href
+            elif text and not fields['url']:
+                fields['url'] = text
+        elif name == 'title' and text and not fields['title']:
+            fields['title'] = text
+        elif name in ('lastmod', 'pubdate', 'publication_date', 'updated', 'published', 'date') and text:
+            fields['date'] = fields['date'] or parse_date(text)
+    return fields
+
+
+def parse_listing(stream) -> Iterator[Dict]:
+    """Stream records out of a sitemap, sitemap index, RSS or Atom document
+
+    Each finished record is detached from the tree, so memory stays flat
+    however many URLs the document lists.
+    """
+    stack = []
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            continue
+        stack.pop()
+        name = local_name(elem.tag)
+        if name in ('url', 'sitemap', 'item', 'entry'):
+            fields = record_fields(elem)
+            fields['kind'] = 'sitemap' if name == 'sitemap' else 'page'
+            if fields['url']:
+                yield fields
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+
+def slugify(text: str, limit: int = 60) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip('-')[:limit].rstrip('-')
+
+
+def load_discovered(data_dir: Path) -> List[Dict]:
+    """Articles queued by earlier discovery runs"""
+    path = Path(data_dir) / "discovery" / "queue.json"
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class Discovery:
+    def __init__(self, data_dir: Path, session, rate_limiter=None, keywords: Optional[List[str]] = None,
+                 capacity: int = 1_000_000, error_rate: float = 0.001, max_sitemaps: int = 1000):
+        self.data_dir = Path(data_dir)
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.keywords = keywords or DEFAULT_KEYWORDS
+        self.keyword_re = re.compile(r"\b(?:" + "|".join(re.escape(k).replace(r"\ ", r"[\s_-]+")
+                                                         for k in self.keywords) + r")", re.IGNORECASE)
+        self.queue_path = self.data_dir / "discovery" / "queue.json"
+        self.seen = BloomFilter(self.data_dir / "discovery" / "seen.bloom", capacity, error_rate)
+        self.max_sitemaps = max_sitemaps
+        self.stats = {'candidates': 0, 'seen': 0, 'irrelevant': 0, 'old': 0, 'queued': 0, 'sitemaps': 0, 'errors': 0}
+
+    def close(self):
+        self.seen.close()
+
+    def seed(self, urls: Iterable[str]):
+        """Mark URLs that are already handled (scraper list, index) as seen"""
+        for url in urls:
+            normalized = normalize_url(url)
+            if normalized:
+                self.seen.add(seen_key(normalized))
+
+    def fetch(self, url: str):
+        """Streamed GET of a listing; None on failure"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(urlsplit(url).netloc)
+        try:
+            response = self.session.get(url, timeout=30, stream=True)
+        except Exception as e:
+            print(f"  {url}: {str(e)}")
+            self.stats['errors'] += 1
+            return None
+        if response.status_code != 200:
+            print(f"  {url}: HTTP {response.status_code}")
+            response.close()
+            self.stats['errors'] += 1
+            return None
+        return response
+
+    def candidates(self, listings: Iterable[str]) -> Iterator[Dict]:
+        """Page records from the listings, following sitemap indexes breadth-first"""
+        pending = deque(listings)
+        visited = set()
+        while pending and len(visited) < self.max_sitemaps:
+            url = pending.popleft()
+            if url in visited:
+                continue
+            visited.add(url)
+            response = self.fetch(url)
+            if response is None:
+                continue
+            self.stats['sitemaps'] += 1
+            try:
+                with response:
+                    for record in parse_listing(open_stream(response.iter_content(CHUNK_SIZE))):
+                        if record['kind'] == 'sitemap':
+                            pending.append(record['url'])
+                        else:
+                            yield record
+            except (ET.ParseError, OSError, EOFError) as e:
+                print(f"  {url}: unreadable listing ({str(e)})")
+                self.stats['errors'] += 1
+
+    def is_relevant(self, record: Dict) -> bool:
+        return bool(self.keyword_re.search(f"{record.get('title') or ''} {unquote(record['url'])}"))
+
+    def article(self, url: str, record: Dict) -> Dict:
+        title = record.get('title') or unquote(urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]).replace('-', ' ')
+        haystack = f"{title} {url}".lower()
+        platform = next((name for name in PLATFORMS if name.lower() in haystack), 'Multiple')
+        return {
+            'id': f"{slugify(title) or 'article'}-{hashlib.sha1(url.encode()).hexdigest()[:8]}",
+            'title': title,
+            'url': url,
+            'category': 'discovered',
+            'date': record.get('date'),
+            'platform': platform,
+            'key_topics': sorted({re.sub(r"[\s_-]+", " ", match.group())
+                                  for match in self.keyword_re.finditer(haystack)}),
+        }
+
+    def run(self, listings: Iterable[str], since: Optional[str] = None) -> List[Dict]:
+        """Queue every relevant, unseen page from the listings; returns the new articles"""
+        queued = load_discovered(self.data_dir)
+        new_articles = []
+        for record in self.candidates(listings):
+            self.stats['candidates'] += 1
+            # Cheapest test first: most sitemap entries are off-topic
+            if not self.is_relevant(record):
+                self.stats['irrelevant'] += 1
+                continue
+            if since and record.get('date') and record['date'] < since:
+                self.stats['old'] += 1
+                continue
+            url = normalize_url(record['url'])
+            if not url or seen_key(url) in self.seen:
+                self.stats['seen'] += 1
+                continue
+            self.seen.add(seen_key(url))
+            new_articles.append(self.article(url, record))
+        self.stats['queued'] = len(new_articles)
+        if new_articles:
+            queued.extend(new_articles)
+            self.queue_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.queue_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(queued, f, indent=2)
+            os.replace(tmp_path, self.queue_path)
+        self.seen.flush()
+        return new_articles
+
+
+def load_sources(path: Path) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def discover(scraper, sources_path: Optional[Path] = None, since: Optional[str] = None) -> List[Dict]:
+    """Run discovery with the scraper's session and per-domain rate limits
+
+    sources_path defaults to data/discovery_sources.json under the scraper's base directory.
+    """
+    sources = load_sources(sources_path or scraper.data_dir / "discovery_sources.json")
+    discovery = Discovery(scraper.data_dir, scraper.session, scraper.rate_limiter, sources.get('keywords'))
+    try:
+        # Everything the scraper already knows about counts as handled
+        discovery.seed(article['url'] for article in scraper.load_articles_metadata())
+        discovery.seed(entry['url'] for entry in scraper.index_entries.values() if entry.get('url'))
+        articles = discovery.run(sources.get('sitemaps', []) + sources.get('feeds', []), since)
+    finally:
+        discovery.close()
+    stats = discovery.stats
+    print(f"Discovery: {stats['candidates']} candidates from {stats['sitemaps']} listings, "
+          f"{stats['queued']} new articles queued ({stats['seen']} already seen, "
+          f"{stats['irrelevant']} off-topic, {stats['errors']} errors)")
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discover new articles from sitemaps and feeds")
+    parser.add_argument("--base-dir", default="..")
+    parser.add_argument("--sources", default=None, help="sources file (default: data/discovery_sources.json)")
+    parser.add_argument("--since", default=None, help="skip entries dated before YYYY-MM-DD")
+    parser.add_argument("--list", action="store_true", help="show the queued articles and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for article in load_discovered(Path(args.base_dir) / "data"):
+            print(f"{article['date'] or '-':<11} {article['platform']:<12} {article['title'][:70]}")
+            print(f"{'':<24} {article['url']}")
+        return
+
+    from scraper import EquityPerpsResearchScraper
+    scraper = EquityPerpsResearchScraper(args.base_dir)
+    sources_path = Path(args.sources) if args.sources else None
+    for article in discover(scraper, sources_path, args.since):
+        print(f"  + {article['title'][:70]} ({article['url']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML text extractor
+Single pass over the document with the stdlib tokenizer; accepts the page in chunks
+"""
+
+import codecs
+from html.parser import HTMLParser
+from typing import Optional, Union
+
+# Body containers in order of preference (mirrors the old regex cascade)
+BODY_ARTICLE, BODY_MAIN, BODY_CONTENT_DIV = range(3)
+
+SKIP_TAGS = {'script', 'style'}
+
+
+class TextBuffer:
+    """Whitespace-collapsing text accumulator that stops growing at a limit"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.pending_space = False
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.limit
+
+    def space(self):
+        self.pending_space = True
+
+    def add(self, data: str):
+        if self.full or not data:
+            return
+        words = data.split()
+        if not words:
+            self.pending_space = True
+            return
+        text = ' '.join(words)
+        if self.pending_space or data[0].isspace():
+            text = ' ' + text
+        self.pending_space = data[-1].isspace()
+        text = text[:self.limit - self.size]
+        self.parts.append(text)
+        self.size += len(text)
+
+    def value(self) -> str:
+        text = ''.join(self.parts)
+        return text + ' ' if self.pending_space and not self.full else text
+
+
+class StreamingExtractor(HTMLParser):
+    def __init__(self, max_chars: int = 5000, encoding: str = 'utf-8'):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self.skip_depth = 0
+        self.head_done = False
+        self.in_title = False
+        self.title_done = False
+        self.title = TextBuffer(1000)
+        self.description = ""
+
+        # One buffer per candidate container plus the whole-document fallback
+        self.bodies = [TextBuffer(max_chars) for _ in range(3)]
+        self.fallback = TextBuffer(max_chars)
+        self.capture_tag = [None, None, None]
+        self.capture_depth = [0, 0, 0]
+        self.captured = [False, False, False]
+
+    @property
+    def complete(self) -> bool:
+        """True once nothing later in the document can change the result"""
+        article_settled = self.captured[BODY_ARTICLE] or self.bodies[BODY_ARTICLE].full
+        return article_settled and self.bodies[BODY_ARTICLE].size > 0 and self.title_done and self.head_done
+
+    def feed(self, data: Union[str, bytes]):
+        """Feed a chunk of the document (str, or bytes decoded incrementally)"""
+        if self.complete:
+            return
+        if isinstance(data, bytes):
+            data = self.decoder.decode(data)
+        super().feed(data)
+
+    def close(self):
+        if not self.complete:
+            super().feed(self.decoder.decode(b'', final=True))
+        super().close()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag == 'body':
+            self.head_done = True
+        if tag == 'title' and not self.title_done:
+            self.in_title = True
+        elif tag == 'meta' and not self.description:
+            attr_map = dict(attrs)
+            if (attr_map.get('name') or '').lower() == 'description':
+                self.description = attr_map.get('content') or ""
+        self.track_container(tag, attrs)
+        self.tag_boundary()
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags never open a container
+        if tag == 'meta' and not self.description:
+            attr_map = dict(attrs)
+            if (attr_map.get('name') or '').lower() == 'description':
+                self.description = attr_map.get('content') or ""
+        self.tag_boundary()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if tag == 'head':
+            self.head_done = True
+        if tag == 'title' and self.in_title:
+            self.in_title = False
+            self.title_done = True
+        for kind in range(3):
+            if self.capture_tag[kind] == tag and not self.captured[kind]:
+                self.capture_depth[kind] -= 1
+                if self.capture_depth[kind] == 0:
+                    self.captured[kind] = True
+        self.tag_boundary()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.in_title:
+            self.title.add(data)
+        self.fallback.add(data)
+        for kind in range(3):
+            if self.capture_depth[kind] and not self.captured[kind]:
+                self.bodies[kind].add(data)
+
+    def track_container(self, tag: str, attrs):
+        """Start or nest the first article, main and content-div containers"""
+        kind = None
+        if tag == 'article':
+            kind = BODY_ARTICLE
+        elif tag == 'main':
+            kind = BODY_MAIN
+        elif tag == 'div':
+            kind = BODY_CONTENT_DIV
+            if self.capture_tag[kind] is None:
+                classes = dict(attrs).get('class') or ''
+                if 'content' not in classes:
+                    return
+        if kind is None or self.captured[kind]:
+            return
+        self.capture_tag[kind] = tag
+        self.capture_depth[kind] += 1
+
+    def tag_boundary(self):
+        # Tags separate words, as the old tag-to-space substitution did
+        self.fallback.space()
+        for kind in range(3):
+            if self.capture_depth[kind] and not self.captured[kind]:
+                self.bodies[kind].space()
+
+    def body_text(self) -> str:
+        for kind in range(3):
+            if self.capture_tag[kind] is not None:
+                text = self.bodies[kind].value()
+                if text.strip():
+                    return text
+        return self.fallback.value()
+
+    def render(self) -> str:
+        """Format the extract the way the category text files expect"""
+        title = self.title.value().strip()
+        return f"Title: {title}\n\nDescription: {self.description}\n\nContent Extract:\n{self.body_text()}"
+
+
+def extract_text(html: Union[str, bytes], max_chars: int = 5000, encoding: Optional[str] = None,
+                 chunk_size: int = 64 * 1024) -> str:
+    """Extract title, description and body text from a complete document"""
+    extractor = StreamingExtractor(max_chars=max_chars, encoding=encoding or 'utf-8')
+    # Feed in slices so parsing can stop as soon as the result is settled
+    for offset in range(0, len(html), chunk_size):
+        extractor.feed(html[offset:offset + chunk_size])
+        if extractor.complete:
+            break
+    extractor.close()
+    return extractor.render()
+
+
+def extract_file(path: str, encoding: Optional[str] = None, max_chars: int = 5000,
+                 chunk_size: int = 64 * 1024) -> str:
+    """Extract from a document on disk, reading it in chunks (process-pool friendly)"""
+    extractor = StreamingExtractor(max_chars=max_chars, encoding=encoding or 'utf-8')
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            extractor.feed(chunk)
+            if extractor.complete:
+                break
+    extractor.close()
+    return extractor.render()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Batch claim verification
+Every claim's key terms go into one Aho-Corasick automaton; the corpus is scanned once, in
+parallel across files, and each line is checked against the claims whose terms it contains
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from facts import NUMBER, SCALES, format_number, number
+from search_index import collect_sources
+
+# Below this many files the scan runs in-process (spawning workers costs more)
+PARALLEL_MIN_FILES = 64
+
+# Relative slack when comparing a stated figure with the claimed one
+TOLERANCE = 0.02
+
+# Passages kept per claim and verdict in the report
+MAX_PASSAGES = 5
+
+# Any figure with a recognisable unit: $ amounts, percentages, leverage and counted units
+QUANTITY_RE = re.compile(
+    r"(\$)?(?<![\w.,])" + NUMBER + r"(?:\s?[-–]\s?\$?" + NUMBER + r")?"
+    r"\s?(trillion|billion|million|thousand|[tbmk](?![a-z0-9])|%|×|x(?![a-z0-9]))?"
+    r"(?:\s?(hours?|hrs?|tps|transactions per second|orders per second|hype)(?![a-z]))?")
+UNIT_KINDS = {'hour': 'hours', 'hours': 'hours', 'hr': 'hours', 'hrs': 'hours', 'tps': 'tps',
+              'transactions per second': 'tps', 'orders per second': 'tps', 'hype': 'hype'}
+SCALE_WORDS = dict(SCALES, thousand=1e3)
+
+
+def parse_quantities(text: str) -> Iterator[Tuple[int, str, float, float]]:
+    """(position, kind, low, high) for each figure in lower-cased text"""
+    for match in QUANTITY_RE.finditer(text):
+        dollar, low, high, scale, unit = match.groups()
+        low, high = number(low), number(high)
+        high = high if high is not None else low
+        if unit:
+            kind = UNIT_KINDS[unit]
+        elif dollar:
+            kind = 'usd'
+        elif scale == '%':
+            kind = 'percent'
+        elif scale in ('×', 'x'):
+            kind = 'leverage'
+        else:
+            continue
+        factor = SCALE_WORDS.get(scale, 1.0) if scale not in (None, '%', '×', 'x') else 1.0
+        yield match.start(), kind, low * factor, high * factor
+
+
+def format_quantity(kind: str, low: float, high: float) -> str:
+    if kind == 'usd':
+        for suffix, scale in (('T', 1e12), ('B', 1e9), ('M', 1e6), ('K', 1e3)):
+            if low >= scale:
+                break
+        else:
+            suffix, scale = '', 1.0
+        span = format_number(low / scale) if low == high else f"{format_number(low / scale)}-{format_number(high / scale)}"
+        return f"${span}{suffix}"
+    span = format_number(low) if low == high else f"{format_number(low)}-{format_number(high)}"
+    return {'percent': f"{span}%", 'leverage': f"{span}×"}.get(kind, f"{span} {kind}")
+
+
+# Words and single punctuation marks; keywords and text are matched as token sequences
+TOKEN_RE = re.compile(r"[a-z0-9]+|[^\sa-z0-9]")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over keyword token sequences
+
+    Matching whole tokens means 'aster' never fires inside 'faster'. find()
+    walks a line's tokens once whatever the number of keywords; callers skip
+    lines sharing no token with the vocabulary by a set test first.
+    """
+
+    def __init__(self, keywords: List[Tuple[str, ...]]):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for token in keyword:
+                following = goto[state].get(token)
+                if following is None:
+                    goto.append({})
+                    output.append([])
+                    following = goto[state][token] = len(goto) - 1
+                state = following
+            output[state].append(index)
+
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for token, following in goto[state].items():
+                pending.append(following)
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[following] = goto[fallback].get(token, 0)
+                output[following] = output[following] + output[fail[following]]
+        self.goto, self.fail, self.output = goto, fail, output
+        self.vocabulary = frozenset(token for keyword in keywords for token in keyword)
+
+    def find(self, tokens: List[str]) -> Iterator[int]:
+        """Index of each keyword occurring in the token sequence"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            yield from output[state]
+
+
+class ClaimSet:
+    """Claims compiled for one-pass scanning
+
+    A claim lists groups of alternative terms ('require'); a line is about
+    the claim when it, together with the document title, contains a term
+    from every group. If the claim states a figure ('value'), lines with a
+    figure of the same kind either agree with it (supporting) or not
+    (conflicting).
+    """
+
+    def __init__(self, claims: List[Dict]):
+        self.claims = claims
+        keywords: Dict[str, int] = {}
+        self.groups: List[List[frozenset]] = []
+        self.triggers: Dict[int, List[int]] = defaultdict(list)
+        self.values: List[Optional[Tuple[str, float, float]]] = []
+        for claim_index, claim in enumerate(claims):
+            groups = []
+            for group in claim['require']:
+                ids = frozenset(keywords.setdefault(tuple(tokenize(term)), len(keywords)) for term in group)
+                groups.append(ids)
+            self.groups.append(groups)
+            stated = list(parse_quantities(claim['value'].lower())) if claim.get('value') else []
+            if claim.get('value') and not stated:
+                raise ValueError(f"claim {claim['id']}: cannot parse value {claim['value']!r}")
+            self.values.append(stated[0][1:] if stated else None)
+        self.automaton = KeywordAutomaton(list(keywords))
+
+        # Each claim is only looked at on lines holding a term of its most selective group
+        # (terms shared by the fewest claims); the other groups are checked per line
+        usage = defaultdict(int)
+        for groups in self.groups:
+            for keyword_id in set().union(*groups):
+                usage[keyword_id] += 1
+        for claim_index, groups in enumerate(self.groups):
+            trigger = min(groups, key=lambda group: sum(usage[keyword_id] for keyword_id in group))
+            for keyword_id in trigger:
+                self.triggers[keyword_id].append(claim_index)
+
+    def agrees(self, claim_index: int, low: float, high: float) -> bool:
+        """A stated figure agrees when one range lies within the other"""
+        _, claimed_low, claimed_high = self.values[claim_index]
+
+        def within(inner_low, inner_high, outer_low, outer_high):
+            return inner_low >= outer_low * (1 - TOLERANCE) and inner_high <= outer_high * (1 + TOLERANCE)
+
+        return within(low, high, claimed_low, claimed_high) or within(claimed_low, claimed_high, low, high)
+
+    def scan_text(self, text: str) -> List[Tuple[int, str, int, List[str]]]:
+        """(claim index, 'supports'/'conflicts'/'mentions', line number, figures) per matching line"""
+        lines = text.lower().split('\n')
+        hits: Dict[int, set] = {}
+        title_ids = set()
+        title_seen = False
+        vocabulary = self.automaton.vocabulary
+        for index, line in enumerate(lines):
+            tokens = TOKEN_RE.findall(line)
+            found = set(self.automaton.find(tokens)) if not vocabulary.isdisjoint(tokens) else set()
+            if found:
+                hits[index] = found
+            if not title_seen and line.startswith('# '):
+                # Terms in the document's title (e.g. the platform) apply to every line
+                title_ids, title_seen = found, True
+        if not hits:
+            return []
+
+        results = []
+        for index, keyword_ids in sorted(hits.items()):
+            keyword_ids = keyword_ids | title_ids
+            candidates = {claim for keyword_id in keyword_ids for claim in self.triggers.get(keyword_id, ())}
+            figures = None
+            for claim in sorted(candidates):
+                if any(group.isdisjoint(keyword_ids) for group in self.groups[claim]):
+                    continue
+                if self.values[claim] is None:
+                    results.append((claim, 'mentions', index + 1, []))
+                    continue
+                if figures is None:
+                    figures = [figure[1:] for figure in parse_quantities(lines[index])]
+                kind = self.values[claim][0]
+                stated = [(low, high) for figure_kind, low, high in figures if figure_kind == kind]
+                if not stated:
+                    continue
+                verdict = 'supports' if any(self.agrees(claim, low, high) for low, high in stated) else 'conflicts'
+                results.append((claim, verdict, index + 1, [format_quantity(kind, low, high) for low, high in stated]))
+        return results
+
+
+# Set in each worker process by init_worker (or directly for an in-process scan)
+CLAIMS: Optional[ClaimSet] = None
+
+
+def init_worker(claims: List[Dict]):
+    global CLAIMS
+    CLAIMS = ClaimSet(claims)
+
+
+def scan_files(paths: List[str]) -> List[Tuple[str, int, str, int, str, List[str]]]:
+    """Scan a batch of files; returns (path, claim index, verdict, line, passage, figures)"""
+    results = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        found = CLAIMS.scan_text(text)
+        if found:
+            lines = text.splitlines()
+            for claim, verdict, line, figures in found:
+                passage = lines[line - 1].strip() if line <= len(lines) else ''
+                results.append((path, claim, verdict, line, passage[:300], figures))
+    return results
+
+
+def scan_corpus(claims: List[Dict], paths: List[str], workers: Optional[int] = None) -> List[Tuple]:
+    """One pass over every file, fanned out over worker processes for large corpora"""
+    workers = workers or multiprocessing.cpu_count()
+    if workers < 2 or len(paths) < PARALLEL_MIN_FILES:
+        init_worker(claims)
+        return scan_files(paths)
+    # Several batches per worker keeps them busy when file sizes vary
+    batches = [paths[i::workers * 4] for i in range(workers * 4)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=init_worker, initargs=(claims,)) as pool:
+            return [result for batch in pool.map(scan_files, batches) for result in batch]
+    except BrokenProcessPool:
+        init_worker(claims)
+        return scan_files(paths)
+
+
+def corpus_paths(base_dir: Path, include: List[Path]) -> List[str]:
+    """Indexed articles (as the search index sees them) plus any extra files or directories"""
+    paths = [str(source['path']) for source in collect_sources(base_dir) if source['path'].exists()]
+    for path in include:
+        if path.is_dir():
+            paths.extend(str(item) for item in sorted(path.rglob('*.md')))
+        elif path.exists():
+            paths.append(str(path))
+    return list(dict.fromkeys(paths))
+
+
+def load_claims(path: Path) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['claims']
+
+
+def verify(claims: List[Dict], paths: List[str], base_dir: Path, workers: Optional[int] = None) -> List[Dict]:
+    """Per-claim verdict with its supporting and conflicting passages"""
+    results = [{'claim': claim, 'supports': [], 'conflicts': [], 'mentions': []} for claim in claims]
+    names = {}
+    for path, claim, verdict, line, passage, figures in sorted(scan_corpus(claims, paths, workers)):
+        if path not in names:
+            names[path] = os.path.relpath(path, base_dir)
+        results[claim][verdict].append({'location': f"{names[path]}:{line}", 'passage': passage, 'figures': figures})
+    for result in results:
+        if result['supports'] and result['conflicts']:
+            result['status'] = 'disputed'
+        elif result['supports']:
+            result['status'] = 'supported'
+        elif result['conflicts']:
+            result['status'] = 'conflicting'
+        elif result['mentions']:
+            result['status'] = 'mentioned'
+        else:
+            result['status'] = 'not found'
+    return results
+
+
+def render_report(results: List[Dict], file_count: int, seconds: float) -> str:
+    content = ["# Claim Verification Report\n\n"]
+    content.append(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}* - "
+                   f"{len(results)} claims checked against {file_count} files in {seconds:.2f}s\n\n")
+    content.append("| Claim | Status | Supporting | Conflicting |\n")
+    content.append("|-------|--------|------------|-------------|\n")
+    for result in results:
+        supporting = len(result['supports']) + len(result['mentions'])
+        content.append(f"| {result['claim']['claim']} | **{result['status'].upper()}** "
+                       f"| {supporting} | {len(result['conflicts'])} |\n")
+    content.append("\n")
+
+    for result in results:
+        claim = result['claim']
+        content.append(f"## {claim['claim']}\n\n")
+        content.append(f"Status: **{result['status']}**")
+        content.append(f" (claimed {claim['value']})\n\n" if claim.get('value') else "\n\n")
+        for verdict, heading in (('supports', "Supporting"), ('mentions', "Mentioned in"),
+                                 ('conflicts', "Conflicting")):
+            passages = result[verdict]
+            if not passages:
+                continue
+            content.append(f"**{heading}**:\n")
+            for passage in passages[:MAX_PASSAGES]:
+                figures = f" [{', '.join(passage['figures'])}]" if verdict == 'conflicts' else ""
+                content.append(f"- `{passage['location']}`{figures}: {passage['passage']}\n")
+            if len(passages) > MAX_PASSAGES:
+                content.append(f"- *...and {len(passages) - MAX_PASSAGES} more*\n")
+            content.append("\n")
+    return ''.join(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify a batch of claims against the article corpus in one pass")
+    parser.add_argument("--base-dir", default="..")
+    parser.add_argument("--claims", default="../data/claims.json", help="claims file")
+    parser.add_argument("--include", action="append", default=[], metavar="PATH",
+                        help="also scan these Markdown files or directories (repeatable)")
+    parser.add_argument("--output", default="../docs/CLAIM_CHECK.md", help="report path")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    claims = load_claims(Path(args.claims))
+    paths = corpus_paths(base_dir, [Path(path) for path in args.include])
+    start = time.perf_counter()
+    results = verify(claims, paths, base_dir, args.workers)
+    seconds = time.perf_counter() - start
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_report(results, len(paths), seconds))
+    tmp_path.replace(output)
+
+    for result in results:
+        print(f"{result['status']:<12} {result['claim']['claim']}")
+    print(f"{len(claims)} claims, {len(paths)} files, {seconds:.2f}s -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Market fact table
+Compiled patterns pull leverage, volumes, market share, trading hours and oracles out of each
+article once; facts are stored in SQLite indexed by platform, metric and date for the reports
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from metadata_store import load_store
+from search_index import collect_sources, load_document
+
+# Bump when the patterns change so every source is extracted again
+EXTRACTOR_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    source_key TEXT NOT NULL,
+    article_id TEXT,
+    source TEXT,
+    platform TEXT,
+    metric TEXT NOT NULL,
+    qualifier TEXT,
+    value TEXT NOT NULL,
+    low REAL,
+    high REAL,
+    date TEXT,
+    origin TEXT NOT NULL,
+    snippet TEXT
+);
+CREATE INDEX IF NOT EXISTS facts_lookup ON facts(platform, metric, date);
+CREATE INDEX IF NOT EXISTS facts_metric ON facts(metric, qualifier, date);
+CREATE INDEX IF NOT EXISTS facts_source ON facts(source_key);
+
+CREATE TABLE IF NOT EXISTS sources (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Platforms recognised in text besides those in the metadata store
+KNOWN_PLATFORMS = ('Hyperliquid', 'Aster', 'PancakeSwap', 'Bitget', 'Ostium', 'Lighter', 'Extended Exchange',
+                   'dYdX', 'GMX', 'Jupiter', 'Kraken', 'Robinhood', 'Hyperunit')
+
+# Hand-recorded platform facts outrank curated metadata, which counts double against text when facts disagree
+ORIGIN_WEIGHT = "CASE origin WHEN 'curated' THEN 3 WHEN 'metadata' THEN 2 ELSE 1 END"
+
+NUMBER = r"(\d+(?:,\d{3})*(?:\.\d+)?)"
+LEVERAGE_RE = re.compile(NUMBER + r"\s?(?:[-–]\s?" + NUMBER + r"\s?)?[x×](?![\w])")
+PERCENT_RE = re.compile(NUMBER + r"\s?(?:[-–]\s?" + NUMBER + r"\s?)?%")
+AMOUNT_RE = re.compile(r"\$\s?" + NUMBER + r"(?:\s?[-–]\s?\$?" + NUMBER + r")?\s?(trillion|billion|million|[TBMK])\b",
+                       re.IGNORECASE)
+HOURS_RE = re.compile(r"\b24\s?/\s?[57]\b|\b(?:US|U\.S\.|traditional) market hours\b"
+                      r"|\b\d{1,2}:\d{2}\s?[-–]\s?\d{1,2}:\d{2}\s?(?:UTC|ET|EST|EDT)\b", re.IGNORECASE)
+ORACLE_RE = re.compile(r"\b(Pyth(?: Network)?|Chainlink|RedStone|Chronicle|Stork|UMA)\b")
+YEAR_RE = re.compile(r"\b(20\d\d)\b")
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+(?=[A-Z$*])")
+MARKUP_RE = re.compile(r"\*\*|__|`|^\s*(?:[-*+]|\d+\.|#+)\s*")
+
+SCALES = {'k': 1e3, 'm': 1e6, 'million': 1e6, 'b': 1e9, 'billion': 1e9, 't': 1e12, 'trillion': 1e12}
+VOLUME_PERIODS = (('daily', 'daily'), ('24h', 'daily'), ('monthly', 'monthly'), ('weekly', 'weekly'),
+                  ('annual', 'annual'), ('yearly', 'annual'), ('per year', 'annual'),
+                  ('cumulative', 'cumulative'), ('all-time', 'cumulative'), ('total', 'cumulative'))
+
+# Metadata fields holding curated figures ('key: value' pairs)
+METADATA_FIELDS = ('key_features', 'metrics', 'market_stats', 'impact_estimates', 'platforms_covered')
+
+
+def number(text: Optional[str]) -> Optional[float]:
+    return float(text.replace(',', '')) if text else None
+
+
+def format_number(value: float) -> str:
+    return f"{value:,.1f}".rstrip('0').rstrip('.')
+
+
+def format_range(low: float, high: Optional[float], prefix: str = '', suffix: str = '') -> str:
+    if high is not None and high != low:
+        return f"{prefix}{format_number(low)}-{format_number(high)}{suffix}"
+    return f"{prefix}{format_number(low)}{suffix}"
+
+
+def normalize_hours(text: str) -> str:
+    text = re.sub(r"\s+", "", text) if '/' in text else text
+    if text.lower().endswith('market hours'):
+        return 'US market hours'
+    return re.sub(r"\s?[-–]\s?", "-", text)
+
+
+def normalize_oracle(name: str) -> str:
+    return 'Pyth Network' if name.startswith('Pyth') else name
+
+
+class FactExtractor:
+    """Turns text into (platform, metric, qualifier, value, low, high, origin, snippet) facts
+
+    Text is split into clauses (sentences, list items, table cells). A clause
+    yields a metric only when it carries that metric's keywords, and facts are
+    attributed to the nearest platform named in the clause, then the current
+    section heading, then the article's own platform. Table cells belong to the
+    platform in their row header, else to the section's or article's platform;
+    cells in a column headed by another platform are skipped.
+    """
+
+    def __init__(self, platforms: Iterable[str]):
+        names = sorted({name for name in platforms if name and name != 'Multiple'}, key=len, reverse=True)
+        self.platforms = {name.lower(): name for name in names}
+        self.platform_re = re.compile(r"\b(" + "|".join(re.escape(name) for name in names) + r")\b",
+                                      re.IGNORECASE) if names else None
+
+    def mentions(self, text: str) -> List[Tuple[int, str]]:
+        if not self.platform_re:
+            return []
+        return [(match.start(), self.platforms[match.group(1).lower()]) for match in self.platform_re.finditer(text)]
+
+    def attribute(self, mentions: List[Tuple[int, str]], position: int, default: Optional[str]) -> Optional[str]:
+        before = [name for start, name in mentions if start <= position]
+        if before:
+            return before[-1]
+        return mentions[0][1] if mentions else default
+
+    def clause_facts(self, clause: str, default: Optional[str], origin: str, pinned: bool = False) -> Iterator[Tuple]:
+        """Facts in one clause; pinned attributes them all to default, ignoring platforms the clause names"""
+        lower = clause.lower()
+        mentions = [] if pinned else self.mentions(clause)
+        snippet = clause.strip()[:240]
+
+        def fact(match, metric, qualifier, value, low=None, high=None):
+            platform = self.attribute(mentions, match.start(), default)
+            return (platform, metric, qualifier, value, low, high, origin, snippet)
+
+        if 'leverage' in lower:
+            for match in LEVERAGE_RE.finditer(clause):
+                low, high = number(match.group(1)), number(match.group(2))
+                yield fact(match, 'leverage', None, format_range(low, high, suffix='×'), low, high)
+        if '%' in clause:
+            if 'burn' in lower:
+                metric = 'fee_burn'
+            elif any(word in lower for word in ('share', 'dominan', 'volume', 'of the market')):
+                metric = 'market_share'
+            else:
+                metric = None
+            if metric:
+                for match in PERCENT_RE.finditer(clause):
+                    low, high = number(match.group(1)), number(match.group(2))
+                    yield fact(match, metric, None, format_range(low, high, suffix='%'), low, high)
+        if '$' in clause:
+            if 'revenue' in lower or 'shift' in lower:
+                metric = 'revenue_shift'
+            elif any(word in lower for word in ('market size', 'market potential', 'global equity', 'equity market')):
+                metric = 'market_size'
+            elif 'volume' in lower:
+                metric = 'volume'
+            else:
+                metric = None
+            if metric:
+                year = YEAR_RE.search(clause)
+                qualifier = next((period for word, period in VOLUME_PERIODS if word in lower),
+                                 year.group(1) if year else None)
+                for match in AMOUNT_RE.finditer(clause):
+                    unit = match.group(3).lower()
+                    scale = SCALES[unit]
+                    low, high = number(match.group(1)), number(match.group(2))
+                    value = format_range(low, high, prefix='$', suffix=unit[0].upper())
+                    yield fact(match, metric, qualifier, value, low * scale, high * scale if high else None)
+        if 'hour' in lower or 'trading' in lower or 'schedule' in lower:
+            for match in HOURS_RE.finditer(clause):
+                yield fact(match, 'trading_hours', None, normalize_hours(match.group()))
+        if 'oracle' in lower or 'pric' in lower or 'feed' in lower or 'pyth' in lower:
+            for match in ORACLE_RE.finditer(clause):
+                yield fact(match, 'oracle', None, normalize_oracle(match.group(1)))
+
+    def text_facts(self, text: str, platform: Optional[str]) -> Iterator[Tuple]:
+        """Facts from an article's extracted text (Markdown tables are read cell by cell)"""
+        section_platform = None
+        header: List[str] = []
+        header_platforms: List[Optional[str]] = []
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                header = []
+                continue
+            if stripped.startswith('#'):
+                mentioned = self.mentions(stripped)
+                section_platform = mentioned[0][1] if mentioned else None
+                continue
+            default = section_platform or platform
+            if stripped.startswith('|'):
+                cells = [cell.strip() for cell in stripped.strip('|').split('|')]
+                if all(set(cell) <= set('-: ') for cell in cells):
+                    continue
+                if not header:
+                    # Header row: metric keywords (or a platform) per column
+                    header = [MARKUP_RE.sub('', cell) for cell in cells]
+                    header_platforms = [self.attribute(self.mentions(cell), 0, None) for cell in cells]
+                    continue
+                label = MARKUP_RE.sub('', cells[0])
+                row_platform = self.attribute(self.mentions(label), 0, None)
+                for column, cell in enumerate(cells[1:], 1):
+                    heading = header[column] if column < len(header) else ''
+                    column_platform = header_platforms[column] if column < len(header_platforms) else None
+                    if not row_platform and column_platform and column_platform != default:
+                        continue  # another platform's column in a comparison table
+                    yield from self.clause_facts(f"{heading} {label}: {MARKUP_RE.sub('', cell)}",
+                                                 row_platform or default, 'table', pinned=True)
+                continue
+            header = []
+            for clause in SENTENCE_RE.split(MARKUP_RE.sub('', stripped)):
+                yield from self.clause_facts(clause, default, 'text')
+
+    def curated_facts(self, platform: str, fields: Dict[str, str]) -> Iterator[Tuple]:
+        """Facts recorded by hand in curated_facts.json; metrics the patterns don't cover
+        (asset_type, chain) are stored as given"""
+        for metric, value in fields.items():
+            clause = f"{metric.replace('_', ' ')}: {value}"
+            facts = [fact for fact in self.clause_facts(clause, platform, 'curated', pinned=True) if fact[1] == metric]
+            yield from facts or [(platform, metric, None, value, None, None, 'curated', clause)]
+
+    def metadata_facts(self, article: Dict) -> Iterator[Tuple]:
+        """Facts from the curated 'key: value' fields of articles_metadata.json"""
+        platform = article.get('platform')
+        for field in METADATA_FIELDS:
+            values = article.get(field)
+            if not isinstance(values, dict):
+                continue
+            for key, value in values.items():
+                if isinstance(value, str):
+                    yield from self.clause_facts(f"{key.replace('_', ' ')}: {value}", platform, 'metadata')
+
+
+class FactTable:
+    """SQLite fact table (data/facts.db), refreshed per source by fingerprint"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def state(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def fingerprints(self) -> Dict[str, str]:
+        with self.lock:
+            return dict(self.conn.execute("SELECT key, fingerprint FROM sources").fetchall())
+
+    def update(self, extracted: Dict[str, Tuple[str, Dict, List[Tuple]]], removed: Sequence[str],
+               extractor: str, metadata_version: str):
+        """Replace the facts of re-extracted sources and drop removed ones (one transaction)
+
+        extracted maps source key to (fingerprint, article fields, facts).
+        """
+        with self.lock, self.conn:
+            previous = self.conn.execute("SELECT value FROM state WHERE key = 'extractor'").fetchone()
+            if previous is None or previous[0] != extractor:
+                self.conn.execute("DELETE FROM facts")
+                self.conn.execute("DELETE FROM sources")
+            keys = [(key,) for key in list(removed) + list(extracted)]
+            self.conn.executemany("DELETE FROM facts WHERE source_key = ?", keys)
+            self.conn.executemany("DELETE FROM sources WHERE key = ?", keys)
+            rows = [(key, article.get('id'), article.get('source') or article.get('title'), platform, metric,
+                     qualifier, value, low, high, article.get('date'), origin, snippet)
+                    for key, (_, article, facts) in extracted.items()
+                    for platform, metric, qualifier, value, low, high, origin, snippet in facts]
+            self.conn.executemany("INSERT INTO facts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.executemany("INSERT INTO sources (key, fingerprint) VALUES (?, ?)",
+                                  [(key, fingerprint) for key, (fingerprint, _, _) in extracted.items()])
+            pairs = self.conn.execute("SELECT key, fingerprint FROM sources ORDER BY key").fetchall()
+            version = hashlib.sha256(json.dumps([extractor, [list(pair) for pair in pairs]]).encode()).hexdigest()[:16]
+            self.conn.executemany("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                                  [('extractor', extractor), ('metadata', metadata_version), ('version', version)])
+
+    def version(self) -> Optional[str]:
+        """Changes whenever any fact does; used as a report input"""
+        return self.state('version')
+
+    def lookup(self, metric: Optional[str] = None, platform: Optional[str] = None,
+               qualifier: Optional[str] = None, after: Optional[str] = None,
+               before: Optional[str] = None) -> List[Dict]:
+        """Facts matching the filters, newest first"""
+        clauses, params = [], []
+        for column, value in (('metric', metric), ('platform', platform), ('qualifier', qualifier)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if after:
+            clauses.append("date >= ?")
+            params.append(after)
+        if before:
+            clauses.append("date <= ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            rows = self.conn.execute(f"SELECT * FROM facts {where} ORDER BY date DESC, rowid", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def values(self, metric: str, platform: Optional[str] = None, qualifier: Optional[str] = None,
+               any_platform: bool = False) -> List[Dict]:
+        """Distinct values of a metric for one platform (None = market-wide figures), or across
+        all of them, best-supported first
+
+        Values are ranked by weighted source count, then by the newest article
+        stating them; 'sources' names the articles behind each.
+        """
+        sql = (f"SELECT value, MIN(low) AS low, MAX(high) AS high, SUM({ORIGIN_WEIGHT}) AS support, "
+               f"MAX(date) AS date, json_group_array(DISTINCT source) AS sources, "
+               f"json_group_array(DISTINCT platform) AS platforms FROM facts WHERE metric = ?")
+        params = [metric]
+        if not any_platform:
+            sql += " AND platform IS ?"
+            params.append(platform)
+        if qualifier is not None:
+            sql += " AND qualifier = ?"
+            params.append(qualifier)
+        sql += " GROUP BY value ORDER BY support DESC, date DESC, value"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        facts = []
+        for row in rows:
+            fact = dict(row)
+            for key in ('sources', 'platforms'):
+                fact[key] = sorted(name for name in json.loads(fact[key]) if name)
+            facts.append(fact)
+        return facts
+
+    def best(self, metric: str, platform: Optional[str] = None, qualifier: Optional[str] = None) -> Optional[Dict]:
+        """Best-supported value for a platform's metric (None platform = market-wide figures)"""
+        values = self.values(metric, platform, qualifier)
+        return values[0] if values else None
+
+    def qualifiers(self, metric: str, platform: Optional[str] = None) -> List[str]:
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT qualifier FROM facts WHERE metric = ? AND platform IS ? "
+                                     "AND qualifier IS NOT NULL ORDER BY qualifier", (metric, platform)).fetchall()
+        return [row[0] for row in rows]
+
+    def platforms(self, metric: Optional[str] = None) -> List[str]:
+        """Platforms with facts (for one metric), most-cited first"""
+        sql = "SELECT platform FROM facts WHERE platform IS NOT NULL"
+        params = []
+        if metric:
+            sql += " AND metric = ?"
+            params.append(metric)
+        sql += f" GROUP BY platform ORDER BY SUM({ORIGIN_WEIGHT}) DESC, platform"
+        with self.lock:
+            return [row[0] for row in self.conn.execute(sql, params).fetchall()]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+
+def source_fingerprint(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def load_curated(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def sync_facts(base_dir: Path, db_path: Optional[Path] = None) -> Dict:
+    """Extract facts from new and changed articles only
+
+    Sources are the hand-recorded platform facts in curated_facts.json, the
+    curated metadata fields of each article and every document the search index
+    covers; unchanged ones (by fingerprint) are not read, and the metadata
+    articles are not even loaded while articles_metadata.json is the version
+    last extracted.
+    """
+    base_dir = Path(base_dir)
+    table = FactTable(db_path or base_dir / "data" / "facts.db")
+    store = None
+    if (base_dir / "data" / "articles_metadata.json").exists():
+        store = load_store(base_dir / "data")
+    recorded = load_curated(base_dir / "data" / "curated_facts.json")
+    extractor = FactExtractor(list(KNOWN_PLATFORMS) + list(recorded.get('platforms', {}))
+                              + (list(store.counts('platform')) if store else []))
+    extractor_version = source_fingerprint(EXTRACTOR_VERSION, sorted(extractor.platforms))
+    metadata_version = json.dumps(store.source_version()) if store else ''
+    known = table.fingerprints() if table.state('extractor') == extractor_version else {}
+
+    @functools.lru_cache(maxsize=None)
+    def metadata() -> Dict[str, Dict]:
+        return {article['id']: article for article in store.articles()} if store else {}
+
+    @functools.lru_cache(maxsize=None)
+    def lookups() -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        articles = metadata().values()
+        return ({article.get('url'): article for article in articles},
+                {(article.get('title') or '').lower(): article for article in articles})
+
+    wanted = {}
+    if known and table.state('metadata') == metadata_version:
+        wanted.update((key, (fingerprint, None)) for key, fingerprint in known.items() if key.startswith('metadata:'))
+    else:
+        for article in metadata().values():
+            wanted[f"metadata:{article['id']}"] = (source_fingerprint(article), article)
+    for source in collect_sources(base_dir):
+        if source['path'].exists():
+            wanted[f"text:{source['key']}"] = (source['fingerprint'], source)
+    for platform, fields in recorded.get('platforms', {}).items():
+        wanted[f"curated:{platform}"] = (source_fingerprint(recorded.get('source'), recorded.get('date'), fields),
+                                         (platform, fields))
+
+    extracted = {}
+    for key, (fingerprint, item) in wanted.items():
+        if known.get(key) == fingerprint:
+            continue
+        if key.startswith('metadata:'):
+            extracted[key] = (fingerprint, item, list(extractor.metadata_facts(item)))
+            continue
+        if key.startswith('curated:'):
+            platform, fields = item
+            article = {'source': recorded.get('source'), 'date': recorded.get('date')}
+            extracted[key] = (fingerprint, article, list(extractor.curated_facts(platform, fields)))
+            continue
+        by_url, by_title = lookups()
+        doc = load_document(item, base_dir, by_url)
+        # Notes whose URL line doesn't match the metadata are matched by title
+        curated = metadata().get(doc.get('id')) or by_title.get((doc.get('title') or '').lower(), {})
+        article = {'id': curated.get('id', doc.get('id')), 'title': doc.get('title'),
+                   'date': doc.get('date') or curated.get('date'), 'source': curated.get('source')}
+        platform = doc.get('platform') or curated.get('platform')
+        platform = platform if platform != 'Multiple' else None
+        extracted[key] = (fingerprint, article, list(extractor.text_facts(doc['text'], platform)))
+    removed = [key for key in known if key not in wanted]
+    if (extracted or removed or table.state('extractor') != extractor_version
+            or table.state('metadata') != metadata_version):
+        table.update(extracted, removed, extractor_version, metadata_version)
+    stats = {'extracted': len(extracted), 'removed': len(removed), 'facts': table.count()}
+    table.close()
+    return stats
+
+
+def load_facts(data_dir: Path) -> FactTable:
+    return FactTable(Path(data_dir) / "facts.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and query market facts")
+    parser.add_argument("--base-dir", default="..")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="extract facts from new and changed articles")
+    show_parser = sub.add_parser("show", help="list facts")
+    show_parser.add_argument("--metric", default=None)
+    show_parser.add_argument("--platform", default=None)
+    show_parser.add_argument("--after", default=None)
+    sub.add_parser("best", help="best-supported value per platform and metric")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    stats = sync_facts(base_dir)
+    if args.command == "sync":
+        print(f"Extracted {stats['extracted']} sources ({stats['removed']} removed); {stats['facts']} facts")
+        return
+    table = load_facts(base_dir / "data")
+    if args.command == "show":
+        for fact in table.lookup(args.metric, args.platform, after=args.after):
+            qualifier = f" ({fact['qualifier']})" if fact['qualifier'] else ""
+            print(f"{fact['date'] or '-':<10}  {fact['platform'] or '(market)':<18} {fact['metric']:<14} "
+                  f"{fact['value']}{qualifier}  [{fact['origin']}: {fact['source'] or fact['article_id']}]")
+    else:
+        for metric in ('leverage', 'trading_hours', 'oracle', 'market_share', 'volume', 'fee_burn'):
+            for platform in table.platforms(metric):
+                fact = table.best(metric, platform)
+                print(f"{platform:<18} {metric:<14} {fact['value']:<18} {', '.join(fact['sources'])}")
+
+
+if __name__ == "__main__":
+    main()
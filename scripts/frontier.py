@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Persistent crawl frontier
+Per-URL crawl state in SQLite with priorities, exponential backoff retries and resumable crawls
+"""
+
+import argparse
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS frontier_ready ON frontier(state, next_attempt);
+
+CREATE TABLE IF NOT EXISTS crawl (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# URL states: waiting for this crawl, claimed by a worker, finished for this crawl,
+# waiting out a backoff, or given up on until the next crawl
+PENDING, IN_PROGRESS, DONE, RETRY, DEAD = 'pending', 'in_progress', 'done', 'retry', 'dead'
+
+
+class CrawlFrontier:
+    def __init__(self, db_path: Path, max_attempts: int = 5, base_delay: float = 2.0,
+                 max_delay: float = 3600.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def sync(self, articles: Iterable[Dict]) -> Dict:
+        """Register the crawl's URLs and decide whether this run resumes or starts a new crawl
+
+        A crawl is unfinished while any URL is still pending or was claimed when the
+        previous run stopped; such a run picks up only the remaining work. Otherwise
+        finished and abandoned URLs are queued again for a fresh crawl. URLs waiting
+        out a backoff keep their schedule either way.
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            existing = {row[0]: row[1] for row in self.conn.execute("SELECT id, url FROM frontier")}
+            # Pending or claimed work left over from the previous run means it was interrupted
+            resumed = self.conn.execute("SELECT COUNT(*) FROM frontier WHERE state IN (?, ?)",
+                                        (PENDING, IN_PROGRESS)).fetchone()[0] > 0
+            seen = set()
+            for position, article in enumerate(articles):
+                seen.add(article['id'])
+                priority = int(article.get('priority') or 0)
+                if article['id'] not in existing:
+                    self.conn.execute("INSERT INTO frontier (id, url, priority, position, updated_at) "
+                                      "VALUES (?, ?, ?, ?, ?)", (article['id'], article['url'], priority, position, now))
+                elif existing[article['id']] != article['url']:
+                    # A new URL for the same article starts over
+                    self.conn.execute("UPDATE frontier SET url = ?, priority = ?, position = ?, state = ?, "
+                                      "attempts = 0, next_attempt = 0, last_error = NULL, updated_at = ? WHERE id = ?",
+                                      (article['url'], priority, position, PENDING, now, article['id']))
+                else:
+                    self.conn.execute("UPDATE frontier SET priority = ?, position = ? WHERE id = ?",
+                                      (priority, position, article['id']))
+            removed = [(article_id,) for article_id in existing if article_id not in seen]
+            self.conn.executemany("DELETE FROM frontier WHERE id = ?", removed)
+
+            # Claimed but never finished: queue again
+            interrupted = self.conn.execute("UPDATE frontier SET state = ? WHERE state = ?",
+                                            (PENDING, IN_PROGRESS)).rowcount
+            if not resumed:
+                self.conn.execute("UPDATE frontier SET state = ?, attempts = 0, updated_at = ? WHERE state IN (?, ?)",
+                                  (PENDING, now, DONE, DEAD))
+                self.conn.execute("INSERT INTO crawl (key, value) VALUES ('generation', 1) "
+                                  "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+            generation = self.conn.execute("SELECT value FROM crawl WHERE key = 'generation'").fetchone()
+        return {'resumed': resumed, 'interrupted': interrupted, 'generation': generation[0] if generation else 0}
+
+    def claim(self, limit: Optional[int] = None) -> List[str]:
+        """Ids that are due now, highest priority first, marked in progress"""
+        now = time.time()
+        sql = ("SELECT id FROM frontier WHERE state IN (?, ?) AND next_attempt <= ? "
+               "ORDER BY priority DESC, position")
+        params = [PENDING, RETRY, now]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock, self.conn:
+            ids = [row[0] for row in self.conn.execute(sql, params)]
+            self.conn.executemany("UPDATE frontier SET state = ?, updated_at = ? WHERE id = ?",
+                                  [(IN_PROGRESS, now, article_id) for article_id in ids])
+        return ids
+
+    def complete_many(self, article_ids: Iterable[str]):
+        """Mark articles finished for this crawl"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE frontier SET state = ?, attempts = 0, next_attempt = 0, last_error = NULL, "
+                                  "updated_at = ? WHERE id = ?", [(DONE, now, article_id) for article_id in article_ids])
+
+    def fail(self, article_id: str, error: Optional[str] = None, permanent: bool = False) -> str:
+        """Record a failed attempt; schedules a retry with jittered exponential backoff
+
+        Permanent failures (e.g. a body over the size cap) are not retried in this crawl.
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT attempts FROM frontier WHERE id = ?", (article_id,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            if permanent or attempts >= self.max_attempts:
+                state, next_attempt = DEAD, 0
+            else:
+                state, next_attempt = RETRY, now + self.backoff(attempts)
+            self.conn.execute("UPDATE frontier SET state = ?, attempts = ?, next_attempt = ?, last_error = ?, "
+                              "updated_at = ? WHERE id = ?", (state, attempts, next_attempt, error, now, article_id))
+        return state
+
+    def backoff(self, attempts: int) -> float:
+        """base * 2^(attempts-1), capped, with +/-50% jitter so retries against one host spread out"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    def next_due(self) -> Optional[float]:
+        """Seconds until the earliest scheduled retry (None if nothing is waiting)"""
+        with self.lock:
+            row = self.conn.execute("SELECT MIN(next_attempt) FROM frontier WHERE state = ?", (RETRY,)).fetchone()
+        return max(0.0, row[0] - time.time()) if row and row[0] is not None else None
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall())
+
+    def failures(self) -> List[Dict]:
+        with self.lock:
+            rows = self.conn.execute("SELECT id, url, state, attempts, next_attempt, last_error FROM frontier "
+                                     "WHERE state IN (?, ?) ORDER BY next_attempt", (RETRY, DEAD)).fetchall()
+        return [dict(zip(('id', 'url', 'state', 'attempts', 'next_attempt', 'last_error'), row)) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the crawl frontier")
+    parser.add_argument("--data-dir", default="../data")
+    args = parser.parse_args()
+
+    frontier = CrawlFrontier(Path(args.data_dir) / "frontier.db")
+    print(f"States: {frontier.counts()}")
+    for item in frontier.failures():
+        when = "gave up" if item['state'] == DEAD else f"retry in {max(0, item['next_attempt'] - time.time()):.0f}s"
+        print(f"  {item['id']}: {item['attempts']} attempts, {when} ({item['last_error']})")
+
+
+if __name__ == "__main__":
+    main()
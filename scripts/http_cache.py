@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache for the research scraper
+Stores bodies with their ETag/Last-Modified validators so re-scrapes can use conditional GETs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Path, ttl: float = 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = self.load_index()
+        self.total_bytes = sum(entry['size'] for entry in self.entries.values())
+
+    def load_index(self) -> Dict[str, Dict]:
+        """Load the entry index, dropping entries whose body file has gone missing"""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Entries from before bodies were stored as raw bytes carry no digest; refetch those
+        return {key: entry for key, entry in entries.items()
+                if 'digest' in entry and self.body_path(key).exists()}
+
+    def save_index(self):
+        """Persist the entry index atomically"""
+        with self.lock:
+            snapshot = json.dumps(self.entries)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def body_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.body"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Return the cache entry for a URL, if any"""
+        with self.lock:
+            entry = self.entries.get(self.key(url))
+            if entry:
+                entry['accessed_at'] = time.time()
+            return entry
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Entries younger than the TTL are served without contacting the server"""
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from a stored entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def open_body(self, entry: Dict) -> Optional[BinaryIO]:
+        """Open a stored body for streaming reads; None if it was evicted since the lookup
+
+        The open file stays readable even if another thread evicts the entry afterwards.
+        """
+        try:
+            return open(self.body_path(entry['key']), 'rb')
+        except FileNotFoundError:
+            return None
+
+    def store_file(self, url: str, source: Path, headers, digest: str,
+                   content_type: str, encoding: Optional[str] = None) -> Dict:
+        """Store a 200 response body that is already on disk, with its validators"""
+        key = self.key(url)
+        path = self.body_path(key)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.unlink(missing_ok=True)
+        try:
+            # Bodies are only ever replaced, never rewritten in place, so a hard link is safe
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        entry = {
+            'key': key,
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'digest': digest,
+            'content_type': content_type,
+            'encoding': encoding,
+            'size': path.stat().st_size,
+            'stored_at': now,
+            'accessed_at': now,
+        }
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous:
+                self.total_bytes -= previous['size']
+            self.entries[key] = entry
+            self.total_bytes += entry['size']
+            self.evict()
+        return entry
+
+    def revalidated(self, entry: Dict, headers) -> Dict:
+        """Refresh an entry after a 304 so the TTL starts again"""
+        with self.lock:
+            entry['stored_at'] = time.time()
+            entry['etag'] = headers.get('ETag') or entry.get('etag')
+            entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+        return entry
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (lock held)"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]['accessed_at']):
+            if self.total_bytes <= self.max_bytes:
+                break
+            del self.entries[key]
+            self.total_bytes -= entry['size']
+            try:
+                self.body_path(key).unlink()
+            except FileNotFoundError:
+                pass
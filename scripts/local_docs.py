@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Local documentation ingester
+Walks Markdown trees (e.g. hyperunit/documentation) in parallel, parses front matter, headings
+and links, and feeds changed pages through the scraper's save_article path
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MARKDOWN_SUFFIXES = ('.md', '.markdown')
+
+# Published locations of known mirrors, so pages get their real URLs
+KNOWN_SOURCES = {
+    'hyperunit': {'base_url': 'https://docs.hyperunit.xyz', 'platform': 'Hyperunit'},
+}
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+LINK_RE = re.compile(r"(?<!!)\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+def scan_dir(path: str) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+    """One directory's Markdown files (path, mtime_ns, size) and subdirectories"""
+    files, dirs = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            elif entry.name.lower().endswith(MARKDOWN_SUFFIXES) and entry.is_file():
+                stat = entry.stat()
+                files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    return files, dirs
+
+
+def scan_tree(root: Path, executor: ThreadPoolExecutor) -> Dict[str, Tuple[int, int]]:
+    """Stat every Markdown file under root, scanning directories concurrently"""
+    found = {}
+    pending = {executor.submit(scan_dir, str(root))}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            files, dirs = future.result()
+            for path, mtime_ns, size in files:
+                found[Path(os.path.relpath(path, root)).as_posix()] = (mtime_ns, size)
+            pending |= {executor.submit(scan_dir, directory) for directory in dirs}
+    return found
+
+
+def heading_slug(text: str) -> str:
+    """GitHub-style anchor for a heading"""
+    text = re.sub(r"[`*_~\[\]()]", "", text.lower())
+    return re.sub(r"[^\w\- ]", "", text).strip().replace(' ', '-')
+
+
+def split_front_matter(text: str) -> Tuple[Dict[str, object], str]:
+    """Simple YAML front matter (key: value, [a, b] lists) delimited by --- lines"""
+    if not text.startswith('---\n'):
+        return {}, text
+    end = text.find('\n---', 4)
+    if end < 0:
+        return {}, text
+    meta = {}
+    for line in text[4:end].splitlines():
+        key, sep, value = line.partition(':')
+        if not sep or not key.strip() or line.startswith((' ', '-')):
+            continue
+        value = value.strip().strip('"\'')
+        if value.startswith('[') and value.endswith(']'):
+            value = [item.strip().strip('"\'') for item in value[1:-1].split(',') if item.strip()]
+        meta[key.strip().lower()] = value
+    body_start = text.find('\n', end + 4)
+    return meta, text[body_start + 1:] if body_start >= 0 else ''
+
+
+def parse_markdown(text: str) -> Dict:
+    """Front matter, headings and link targets (links inside code fences are ignored)"""
+    meta, body = split_front_matter(text)
+    headings, links = [], []
+    in_fence = False
+    for line in body.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        match = HEADING_RE.match(line)
+        if match:
+            headings.append([len(match.group(1)), match.group(2), heading_slug(match.group(2))])
+        links.extend(target for _, target in LINK_RE.findall(line))
+    return {'meta': meta, 'body': body, 'headings': headings, 'links': links}
+
+
+def page_route(relpath: str) -> str:
+    """Site path of a page: developers/api/index.md -> /developers/api"""
+    stem = relpath.rsplit('.', 1)[0]
+    if stem == 'index' or stem.endswith('/index'):
+        stem = stem[:-len('index')].rstrip('/')
+    return '/' + stem
+
+
+def parse_file(root: Path, relpath: str) -> Dict:
+    data = (root / relpath).read_bytes()
+    parsed = parse_markdown(data.decode('utf-8', errors='replace'))
+    parsed['digest'] = hashlib.sha256(data).hexdigest()
+    return parsed
+
+
+class DocTree:
+    """Incremental ingestion state for one documentation tree (data/local_docs/<name>.json)"""
+
+    def __init__(self, root: Path, state_dir: Path, name: Optional[str] = None,
+                 base_url: Optional[str] = None, platform: Optional[str] = None, workers: int = 8):
+        self.root = Path(root)
+        self.name = name or (self.root.parent.name if self.root.name == 'documentation' else self.root.name)
+        known = KNOWN_SOURCES.get(self.name, {})
+        self.base_url = (base_url or known.get('base_url') or '').rstrip('/')
+        self.platform = platform or known.get('platform') or self.name.title()
+        self.workers = workers
+        self.state_path = Path(state_dir) / f"{self.name}.json"
+        self.graph_path = Path(state_dir) / f"{self.name}.links.json"
+        # Per page: id, mtime, size, digest and the parsed front matter, headings and links
+        # (bodies are not kept; they are read from the file when a page is ingested)
+        self.files: Dict[str, Dict] = self.load_state()
+        self.bodies: Dict[str, str] = {}
+
+    def load_state(self) -> Dict[str, Dict]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                files = json.load(f)['files']
+        except (OSError, ValueError, KeyError):
+            return {}
+        for state in files.values():
+            state.pop('body', None)  # stored by older versions
+        return files
+
+    def save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'root': str(self.root), 'files': self.files}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def doc_id(self, relpath: str) -> str:
+        return f"{self.name}-" + re.sub(r"[^a-z0-9]+", "-", relpath.rsplit('.', 1)[0].lower()).strip('-')
+
+    def url(self, relpath: str) -> str:
+        if not self.base_url or Path(relpath).name.lower() == 'readme.md':
+            # Not a published page (or no known site): an id independent of where the tree
+            # is checked out, since text file names and dedup/search keys derive from the URL
+            return f"local:{self.name}/{relpath}"
+        return self.base_url + page_route(relpath)
+
+    def refresh(self, is_indexed) -> Tuple[List[str], List[str]]:
+        """Stat the tree; re-parse only new/changed files (or ones missing from the index)
+
+        Returns (changed, removed) relative paths.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            stats = scan_tree(self.root, executor)
+            changed = [relpath for relpath, (mtime_ns, size) in stats.items()
+                       if relpath not in self.files
+                       or self.files[relpath]['mtime_ns'] != mtime_ns or self.files[relpath]['size'] != size
+                       or not is_indexed(self.files[relpath]['id'])]
+            parsed = dict(zip(changed, executor.map(lambda relpath: parse_file(self.root, relpath), changed)))
+        removed = [relpath for relpath in self.files if relpath not in stats]
+        for relpath in removed:
+            del self.files[relpath]
+        for relpath, doc in parsed.items():
+            mtime_ns, size = stats[relpath]
+            self.files[relpath] = {
+                'id': self.doc_id(relpath), 'mtime_ns': mtime_ns, 'size': size, 'digest': doc['digest'],
+                'meta': doc['meta'], 'headings': doc['headings'], 'links': doc['links'],
+            }
+            self.bodies[relpath] = doc['body']
+        return sorted(changed), removed
+
+    def body(self, relpath: str) -> str:
+        """Page text after the front matter (parsed this run, else read from the file)"""
+        if relpath not in self.bodies:
+            self.bodies[relpath] = parse_file(self.root, relpath)['body']
+        return self.bodies[relpath]
+
+    def article(self, relpath: str) -> Dict:
+        state = self.files[relpath]
+        meta = state['meta']
+        title = meta.get('title') or next((text for level, text, _ in state['headings'] if level == 1),
+                                          Path(relpath).stem)
+        topics = meta.get('tags') or meta.get('topics')
+        if isinstance(topics, str):
+            topics = [topic.strip() for topic in topics.split(',') if topic.strip()]
+        if not topics:
+            topics = [text for level, text, _ in state['headings'] if level == 2][:5]
+        # No front-matter date: leave it unset (a checkout's mtimes are not publication dates)
+        date = meta.get('date')
+        return {
+            'id': state['id'],
+            'title': title,
+            'url': self.url(relpath),
+            'category': 'documentation',
+            'date': str(date)[:10] if date else None,
+            'platform': self.platform,
+            'key_topics': list(topics),
+            'source': f"local:{self.name}",
+        }
+
+    def resolve(self, relpath: str, target: str, routes: Dict[str, str]) -> Tuple[Optional[str], bool]:
+        """(linked file, anchor found) for an internal link; (None, False) if it is broken"""
+        path, _, anchor = target.partition('#')
+        if not path:
+            linked = relpath
+        else:
+            if self.base_url and path.startswith(self.base_url):
+                path = path[len(self.base_url):] or '/'
+            if path.startswith('/'):
+                linked = routes.get(path.rstrip('/') or '/')
+            else:
+                joined = posixpath.normpath(posixpath.join(posixpath.dirname(relpath), path))
+                linked = next((candidate for candidate in (joined, joined + '.md', joined + '/index.md')
+                               if candidate in self.files), None)
+        if linked is None:
+            return None, False
+        return linked, not anchor or any(slug == anchor for _, _, slug in self.files[linked]['headings'])
+
+    def link_graph(self) -> Dict[str, Dict]:
+        """Outgoing, incoming, external and broken links per page"""
+        routes = {page_route(relpath): relpath for relpath in self.files}
+        graph = {relpath: {'id': state['id'], 'title': self.article(relpath)['title'], 'url': self.url(relpath),
+                           'headings': len(state['headings']), 'links': [], 'backlinks': [],
+                           'external': [], 'broken': []}
+                 for relpath, state in sorted(self.files.items())}
+        for relpath, state in self.files.items():
+            node = graph[relpath]
+            for target in state['links']:
+                if re.match(r"^[a-z][a-z0-9+.-]*:", target) and not (self.base_url and target.startswith(self.base_url)):
+                    node['external'].append(target)
+                    continue
+                linked, anchor_found = self.resolve(relpath, target, routes)
+                if linked is None or not anchor_found:
+                    node['broken'].append(target)
+                elif linked != relpath and linked not in node['links']:
+                    node['links'].append(linked)
+                    graph[linked]['backlinks'].append(relpath)
+        return graph
+
+
+def ingest(scraper, root: Path, name: Optional[str] = None, base_url: Optional[str] = None,
+           platform: Optional[str] = None, workers: int = 8) -> Dict:
+    """Emit a documentation tree's new and changed pages into the scraper's index
+
+    Pages go through save_article like fetched articles (text file, dedup, index
+    entry), with the Markdown file itself as the raw copy. An unchanged tree costs
+    one parallel stat pass.
+    """
+    tree = DocTree(root, scraper.data_dir / "local_docs", name, base_url, platform, workers)
+
+    def is_indexed(article_id: str) -> bool:
+        return article_id in scraper.index_entries
+
+    changed, removed = tree.refresh(is_indexed)
+    if not changed and not removed and tree.graph_path.exists():
+        return {'name': tree.name, 'pages': len(tree.files), 'changed': 0, 'removed': 0}
+
+    removed_ids = {tree.doc_id(relpath) for relpath in removed}
+    for article_id in removed_ids:
+        scraper.remove_article(article_id)
+    for relpath in changed:
+        state = tree.files[relpath]
+        article = tree.article(relpath)
+        # Relative to the base directory even when the tree lives outside it
+        path = scraper.base_dir / os.path.relpath(tree.root / relpath, scraper.base_dir)
+        download = {'path': path, 'digest': state['digest'], 'text': tree.body(relpath),
+                    'content_type': 'text/markdown', 'encoding': 'utf-8', 'size': state['size'], 'local': True}
+        scraper.save_article(article, download)
+        scraper.finish_article(article)
+
+    graph = tree.link_graph()
+    tree.graph_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = tree.graph_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'name': tree.name, 'root': str(tree.root), 'platform': tree.platform, 'pages': graph}, f, indent=2)
+    os.replace(tmp_path, tree.graph_path)
+    tree.save_state()
+    return {'name': tree.name, 'pages': len(tree.files), 'changed': len(changed), 'removed': len(removed),
+            'broken_links': sum(len(node['broken']) for node in graph.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a local Markdown documentation tree")
+    parser.add_argument("root", nargs="*", default=["../hyperunit/documentation"])
+    parser.add_argument("--base-dir", default="..")
+    parser.add_argument("--name", default=None, help="source name (default: derived from the path)")
+    parser.add_argument("--base-url", default=None, help="published site the pages belong to")
+    parser.add_argument("--platform", default=None)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from scraper import EquityPerpsResearchScraper
+    scraper = EquityPerpsResearchScraper(args.base_dir)
+    for root in args.root:
+        stats = ingest(scraper, Path(root), args.name, args.base_url, args.platform, args.workers)
+        print(f"{stats['name']}: {stats['pages']} pages, {stats['changed']} ingested, {stats['removed']} removed"
+              + (f", {stats['broken_links']} broken links" if 'broken_links' in stats else ""))
+    scraper.checkpoint()
+    # Same hooks as after a crawl; the summary covers every indexed article, not just this ingest
+    scraper.stats.consume(scraper.index_entries.values())
+    scraper.update_outputs()
+
+
+if __name__ == "__main__":
+    main()
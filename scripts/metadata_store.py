@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed article metadata store
+Indexed columns for platform, category, date and topics; imported from and exported to articles_metadata.json
+"""
+
+import argparse
+import functools
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Columns with their own SQL column, in the order articles_metadata.json lists them;
+# every other field is kept verbatim in the 'extra' JSON column
+COLUMNS = ('id', 'title', 'url', 'category', 'date', 'source', 'platform')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    url TEXT,
+    category TEXT,
+    date TEXT,
+    source TEXT,
+    platform TEXT,
+    position INTEGER NOT NULL,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS articles_platform ON articles(platform);
+CREATE INDEX IF NOT EXISTS articles_category ON articles(category);
+CREATE INDEX IF NOT EXISTS articles_date ON articles(date);
+CREATE INDEX IF NOT EXISTS articles_url ON articles(url);
+CREATE INDEX IF NOT EXISTS articles_position ON articles(position);
+
+CREATE TABLE IF NOT EXISTS article_topics (
+    article_id TEXT NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (article_id, position)
+);
+CREATE INDEX IF NOT EXISTS article_topics_topic ON article_topics(topic);
+
+CREATE TABLE IF NOT EXISTS collection (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Collection-level key recording which JSON file version the store was imported from
+SOURCE_VERSION_KEY = '_source_version'
+
+
+class MetadataStore:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def import_json(self, json_path: Path) -> int:
+        """Replace the store's contents with articles_metadata.json (one transaction)"""
+        json_path = Path(json_path)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM article_topics")
+            self.conn.execute("DELETE FROM articles")
+            self.conn.execute("DELETE FROM collection")
+            self.insert_articles(data.get('articles', []), start=0)
+            self.conn.executemany("INSERT INTO collection (key, value) VALUES (?, ?)",
+                                  [(key, json.dumps(value)) for key, value in data.get('metadata', {}).items()])
+            self.conn.execute("INSERT INTO collection (key, value) VALUES (?, ?)",
+                              (SOURCE_VERSION_KEY, json.dumps(file_version(json_path))))
+        return len(data.get('articles', []))
+
+    def export_json(self, json_path: Path):
+        """Write the store back out in the articles_metadata.json layout"""
+        json_path = Path(json_path)
+        data = {'articles': self.articles(), 'metadata': self.collection()}
+        tmp_path = json_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        os.replace(tmp_path, json_path)
+        # The exported file matches the store; don't re-import it on next load
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO collection (key, value) VALUES (?, ?)",
+                              (SOURCE_VERSION_KEY, json.dumps(file_version(json_path))))
+
+    def insert_articles(self, articles: Iterable[Dict], start: int):
+        rows = []
+        topics = []
+        for offset, article in enumerate(articles):
+            extra = {key: value for key, value in article.items() if key not in COLUMNS and key != 'topics'}
+            rows.append(tuple(article.get(column) for column in COLUMNS) + (start + offset, json.dumps(extra)))
+            topics.extend((article['id'], position, topic)
+                          for position, topic in enumerate(article.get('topics') or []))
+        self.conn.executemany(f"INSERT INTO articles ({', '.join(COLUMNS)}, position, extra) "
+                              f"VALUES ({', '.join('?' * (len(COLUMNS) + 2))})", rows)
+        self.conn.executemany("INSERT INTO article_topics (article_id, position, topic) VALUES (?, ?, ?)", topics)
+
+    def articles(self, columns: Optional[Sequence[str]] = None, platform: Optional[str] = None,
+                 category: Optional[str] = None, topic: Optional[str] = None,
+                 after: Optional[str] = None, before: Optional[str] = None) -> List[Dict]:
+        """Articles in file order, optionally filtered, reading only the requested columns
+
+        columns may name any field; 'topics' reads the topic table and anything
+        outside COLUMNS is taken from the extra JSON. Missing fields are omitted,
+        as in the source file. after is inclusive, before exclusive.
+        """
+        wanted = list(columns) if columns else list(COLUMNS) + ['*extra', 'topics']
+        sql_columns = [column for column in wanted if column in COLUMNS]
+        need_extra = '*extra' in wanted or any(column not in COLUMNS and column != 'topics' for column in wanted)
+        need_topics = 'topics' in wanted
+
+        select = ['a.id AS _id'] + [f"a.{column}" for column in sql_columns]
+        if need_extra:
+            select.append('a.extra')
+        where, params = [], []
+        for column, value in (('platform', platform), ('category', category)):
+            if value is not None:
+                where.append(f"a.{column} = ?")
+                params.append(value)
+        if after:
+            where.append("a.date >= ?")
+            params.append(after)
+        if before:
+            where.append("a.date < ?")
+            params.append(before)
+        if topic is not None:
+            where.append("a.id IN (SELECT article_id FROM article_topics WHERE topic = ?)")
+            params.append(topic)
+        sql = f"SELECT {', '.join(select)} FROM articles a"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.position"
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            topics = self.topics_for([row['_id'] for row in rows]) if need_topics else {}
+
+        results = []
+        for row in rows:
+            article = {}
+            extra = json.loads(row['extra']) if need_extra else {}
+            for column in wanted:
+                if column in COLUMNS:
+                    if row[column] is not None:
+                        article[column] = row[column]
+                elif column == '*extra':
+                    article.update(extra)
+                elif column == 'topics':
+                    if row['_id'] in topics:
+                        article['topics'] = topics[row['_id']]
+                elif column in extra:
+                    article[column] = extra[column]
+            results.append(article)
+        return results
+
+    def topics_for(self, ids: List[str]) -> Dict[str, List[str]]:
+        """Topic lists for the given article ids (lock held)"""
+        topics: Dict[str, List[str]] = {}
+        # Stay under SQLite's bound-parameter limit
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            for article_id, topic in self.conn.execute(
+                    f"SELECT article_id, topic FROM article_topics WHERE article_id IN ({', '.join('?' * len(chunk))}) "
+                    f"ORDER BY article_id, position", chunk):
+                topics.setdefault(article_id, []).append(topic)
+        return topics
+
+    def counts(self, column: str) -> Dict[str, int]:
+        """Article count per value of an indexed column ('topics' counts topic mentions)"""
+        if column == 'topics':
+            sql = "SELECT topic, COUNT(*) FROM article_topics GROUP BY topic"
+        elif column in ('platform', 'category', 'date', 'source'):
+            sql = f"SELECT {column}, COUNT(*) FROM articles WHERE {column} IS NOT NULL GROUP BY {column}"
+        else:
+            raise ValueError(f"cannot count by {column}")
+        with self.lock:
+            return dict(self.conn.execute(sql).fetchall())
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def date_range(self) -> Dict[str, Optional[str]]:
+        with self.lock:
+            earliest, latest = self.conn.execute("SELECT MIN(date), MAX(date) FROM articles").fetchone()
+        return {'earliest': earliest, 'latest': latest}
+
+    def collection(self) -> Dict:
+        """The collection-level 'metadata' block of the JSON file"""
+        with self.lock:
+            rows = self.conn.execute("SELECT key, value FROM collection WHERE key != ? ORDER BY rowid",
+                                     (SOURCE_VERSION_KEY,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def source_version(self) -> Optional[List[int]]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM collection WHERE key = ?", (SOURCE_VERSION_KEY,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def file_version(path: Path) -> List[int]:
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+@functools.lru_cache(maxsize=None)
+def open_store(data_dir: str) -> MetadataStore:
+    """Process-wide store for a data directory"""
+    return MetadataStore(Path(data_dir) / "metadata.db")
+
+
+def load_store(data_dir: Path) -> MetadataStore:
+    """Shared store, re-imported when the JSON file has changed (checked on every call, since a
+    long-lived process such as `cli.py serve` outlives the scraper runs that rewrite it)"""
+    data_dir = Path(data_dir).resolve()
+    store = open_store(str(data_dir))
+    json_path = data_dir / "articles_metadata.json"
+    if json_path.exists() and store.source_version() != file_version(json_path):
+        store.import_json(json_path)
+    return store
+
+
+def print_stats(store: MetadataStore):
+    print(f"Articles: {store.count()}")
+    for column in ('category', 'platform'):
+        print(f"By {column}: {store.counts(column)}")
+    print(f"Date range: {store.date_range()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the article metadata store")
+    parser.add_argument("command", choices=["import", "export", "stats"])
+    parser.add_argument("--data-dir", default="../data")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    json_path = data_dir / "articles_metadata.json"
+    if args.command == "import":
+        store = MetadataStore(data_dir / "metadata.db")
+        print(f"Imported {store.import_json(json_path)} articles into {store.db_path}")
+    elif args.command == "export":
+        store = load_store(data_dir)
+        store.export_json(json_path)
+        print(f"Exported {store.count()} articles to {json_path}")
+    else:
+        print_stats(load_store(data_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Run instrumentation for the research scraper
+Per-stage and per-domain latency histograms, counters, queue depth gauges, optional
+cProfile/tracemalloc hooks and a JSON run report
+"""
+
+import argparse
+import bisect
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Histogram bucket upper bounds in seconds: 0.1ms doubling up to ~110s, then overflow
+BUCKET_BOUNDS = [0.0001 * 2 ** i for i in range(21)]
+
+
+class Histogram:
+    """Fixed log-scale latency buckets; percentiles are estimated from bucket bounds"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds: float):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                # Never report beyond what was actually observed
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'total': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+        }
+
+
+class Gauge:
+    """Sampled level of something like a queue: last, max and mean over the samples"""
+
+    def __init__(self):
+        self.samples = 0
+        self.total = 0
+        self.last = 0
+        self.max = 0
+
+    def set(self, value: int):
+        self.samples += 1
+        self.total += value
+        self.last = value
+        self.max = max(self.max, value)
+
+    def summary(self) -> Dict:
+        return {'samples': self.samples, 'last': self.last, 'max': self.max,
+                'mean': round(self.total / self.samples, 3) if self.samples else None}
+
+
+class RunMetrics:
+    """Thread-safe collector shared by the scraper and its pipeline stages
+
+    Stages are timed overall and per domain; counters (bytes, cache outcomes,
+    statuses) may also be broken down by domain.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.started_clock = time.perf_counter()
+        self.stages: Dict[str, Histogram] = {}
+        self.domain_stages: Dict[str, Dict[str, Histogram]] = {}
+        self.counters: Dict[str, int] = {}
+        self.domain_counters: Dict[str, Dict[str, int]] = {}
+        self.gauges: Dict[str, Gauge] = {}
+        self.extra: Dict[str, object] = {}
+
+    def observe(self, stage: str, seconds: float, domain: Optional[str] = None):
+        with self.lock:
+            self.stages.setdefault(stage, Histogram()).observe(seconds)
+            if domain:
+                self.domain_stages.setdefault(domain, {}).setdefault(stage, Histogram()).observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, domain: Optional[str] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, domain)
+
+    def count(self, name: str, value: int = 1, domain: Optional[str] = None):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if domain:
+                counters = self.domain_counters.setdefault(domain, {})
+                counters[name] = counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: int):
+        with self.lock:
+            self.gauges.setdefault(name, Gauge()).set(value)
+
+    def cache_summary(self) -> Dict:
+        """Hit rate over lookups that could have gone to the network (local files excluded)"""
+        outcomes = {key.split('.', 1)[1]: value for key, value in self.counters.items()
+                    if key.startswith('cache.')}
+        hits = outcomes.get('fresh', 0) + outcomes.get('revalidated', 0)
+        lookups = hits + outcomes.get('miss', 0)
+        return dict(outcomes, hit_rate=round(hits / lookups, 4) if lookups else None)
+
+    def report(self) -> Dict:
+        """Everything collected so far, as plain JSON-friendly data"""
+        duration = time.perf_counter() - self.started_clock
+        with self.lock:
+            counters = dict(self.counters)
+            report = {
+                'started_at': datetime.fromtimestamp(self.started).isoformat(),
+                'duration': round(duration, 6),
+                'counters': counters,
+                'throughput': {
+                    'articles_per_second': round(counters.get('articles', 0) / duration, 3) if duration else None,
+                    'bytes_per_second': round(counters.get('bytes.network', 0) / duration, 1) if duration else None,
+                },
+                'stages': {stage: hist.summary() for stage, hist in sorted(self.stages.items())},
+                'domains': {
+                    domain: {
+                        'stages': {stage: hist.summary() for stage, hist in sorted(stages.items())},
+                        'counters': dict(self.domain_counters.get(domain, {})),
+                    }
+                    for domain, stages in sorted(self.domain_stages.items())
+                },
+                'queues': {name: gauge.summary() for name, gauge in sorted(self.gauges.items())},
+            }
+            report['cache'] = self.cache_summary()
+            report.update(self.extra)
+        return report
+
+    def write_report(self, path: Path) -> Path:
+        """Write the run report atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+@contextmanager
+def profiling(metrics: RunMetrics, output_dir: Path, cpu: bool = False, memory: bool = False,
+              top: int = 25):
+    """Profile the enclosed block with cProfile and/or tracemalloc
+
+    Only the calling process is covered; extraction worker processes are not.
+    The hottest functions and allocation sites are added to the run report, and
+    the full cProfile stats are saved next to it for pstats/snakeviz.
+    """
+    profiler = cProfile.Profile() if cpu else None
+    if memory:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            stats_path = output_dir / f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.pstats"
+            profiler.dump_stats(str(stats_path))
+            metrics.extra['profile'] = {'stats_file': str(stats_path), 'top': top_functions(profiler, top)}
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            metrics.extra['memory'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [{'location': str(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+                        for stat in snapshot.statistics('lineno')[:top]],
+            }
+
+
+def top_functions(profiler: cProfile.Profile, limit: int) -> List[Dict]:
+    """Functions with the most cumulative time"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (calls, _, total, cumulative, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({name})", 'calls': calls,
+                     'total': round(total, 6), 'cumulative': round(cumulative, 6)})
+    rows.sort(key=lambda row: row['cumulative'], reverse=True)
+    return rows[:limit]
+
+
+def latest_report(runs_dir: Path) -> Optional[Path]:
+    return max(Path(runs_dir).glob("run-*.json"), default=None)
+
+
+def print_report(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    print(f"{path}: {report['duration']:.2f}s, {report['counters'].get('articles', 0)} articles, "
+          f"cache hit rate {report['cache'].get('hit_rate')}")
+    print(f"{'stage':<14}{'count':>7}{'total':>10}{'mean':>10}{'p50':>10}{'p90':>10}{'max':>10}")
+    for stage, summary in report['stages'].items():
+        print(f"{stage:<14}{summary['count']:>7}{summary['total']:>10.3f}"
+              + ''.join(f"{summary[key] or 0:>10.4f}" for key in ('mean', 'p50', 'p90', 'max')))
+    for name, queue in report['queues'].items():
+        print(f"queue {name}: max {queue['max']}, mean {queue['mean']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a scraper run report")
+    parser.add_argument("report", nargs="?", help="report file (default: latest in ../data/runs)")
+    args = parser.parse_args()
+
+    path = Path(args.report) if args.report else latest_report(Path("../data/runs"))
+    if not path:
+        print("No run reports found")
+        return
+    print_report(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,57 +4,172 @@ Organize Equity Perpetuals Research Articles
 Simple organizer without external dependencies
 """
 
-import json
-import os
 from pathlib import Path
 from datetime import datetime
 
+from aggregate import Aggregator
+from build_graph import BuildGraph
+from facts import FactTable, format_number, load_facts, sync_facts
+from metadata_store import load_store
+
 class ResearchOrganizer:
     def __init__(self, base_dir: str = ".."):
         self.base_dir = Path(base_dir)
         self.data_dir = self.base_dir / "data"
         self.docs_dir = self.base_dir / "docs"
+        # Input fingerprints of every report, so unchanged reports are not rebuilt
+        self.graph = BuildGraph(self.data_dir / "build_state.json")
+        self.facts = None
+        self.profiles = None
         
     def load_metadata(self):
-        """Load articles metadata"""
-        with open(self.data_dir / "articles_metadata.json", 'r') as f:
-            return json.load(f)
+        """Open the articles metadata store (imported once per process, re-imported when the JSON changes)"""
+        return load_store(self.data_dir)
+    
+    def build_report(self, target: Path, inputs: dict, render):
+        """Render a report only if its inputs changed, and write it only if its bytes did"""
+        written = self.graph.build(target, inputs, render)
+        if written is None:
+            print(f"{target.name} up to date")
+        elif written:
+            print(f"Created {target.name}")
+        else:
+            print(f"{target.name} unchanged")
+    
+    def load_facts(self) -> FactTable:
+        """Fact table, after extracting any new or changed articles (once per run)"""
+        if self.facts is None:
+            sync_facts(self.base_dir)
+            self.facts = load_facts(self.data_dir)
+        return self.facts
+    
+    def platform_profiles(self) -> dict:
+        """Category, assets and chain of each platform, from the metadata store (once per run)"""
+        if self.profiles is not None:
+            return self.profiles
+        profiles = {}
+        for article in self.load_metadata().articles(columns=('platform', 'category', 'assets', 'chain')):
+            if not article.get('platform') or article['platform'] == 'Multiple':
+                continue
+            profile = profiles.setdefault(article['platform'], {'categories': [], 'assets': [], 'chain': None})
+            if article.get('category') not in profile['categories']:
+                profile['categories'].append(article.get('category'))
+            for asset in article.get('assets') or []:
+                if asset not in profile['assets']:
+                    profile['assets'].append(asset)
+            profile['chain'] = profile['chain'] or article.get('chain')
+        self.profiles = profiles
+        return profiles
+    
+    @staticmethod
+    def split_platforms(facts: FactTable, profiles: dict) -> tuple:
+        """Platforms with facts, most-cited first, as (DeFi, CeFi) lists"""
+        platforms = facts.platforms()
+        cefi = [platform for platform in platforms if 'cefi' in profiles.get(platform, {}).get('categories', [])]
+        return [platform for platform in platforms if platform not in cefi], cefi
+    
+    @staticmethod
+    def fact_value(facts: FactTable, metric: str, platform=None, qualifier=None, default: str = "-") -> str:
+        fact = facts.best(metric, platform, qualifier)
+        return fact['value'] if fact else default
+    
+    @staticmethod
+    def platform_highlights(facts: FactTable, platform: str) -> list:
+        """Short phrases for a platform's best-supported figures"""
+        highlights = []
+        asset_type = facts.best('asset_type', platform)
+        if asset_type:
+            highlights.append(asset_type['value'])
+        share = facts.best('market_share', platform)
+        if share:
+            highlights.append(f"~{share['value']} market share")
+        for period in ('monthly', 'daily'):
+            volume = facts.best('volume', platform, period)
+            if volume:
+                highlights.append(f"{volume['value']} {period} volume")
+                break
+        for metric, template in (('leverage', "{} leverage"), ('trading_hours', "{} trading"),
+                                 ('oracle', "{} oracles")):
+            fact = facts.best(metric, platform)
+            if fact:
+                highlights.append(template.format(fact['value']))
+        return highlights
+    
+    def platform_assets(self, facts: FactTable, profile: dict, platform: str) -> str:
+        """Asset type with the tickers the articles list, e.g. 'Synthetic Stocks (AAPL, AMZN, TSLA)'"""
+        asset_type = self.fact_value(facts, 'asset_type', platform, default=None)
+        tickers = ', '.join(profile.get('assets') or [])
+        if asset_type and tickers:
+            return f"{asset_type} ({tickers})"
+        return asset_type or tickers or '-'
+    
+    @staticmethod
+    def month_name(date: str):
+        """Month of a 'YYYY-MM[-DD]' date, or None for a bare or malformed year"""
+        try:
+            return datetime.strptime(date[:7], '%Y-%m').strftime('%B')
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def leverage_span(facts: FactTable, platforms: list):
+        """Lowest and highest best-supported leverage across platforms"""
+        levels = [facts.best('leverage', platform) for platform in platforms]
+        levels = [fact for fact in levels if fact]
+        if not levels:
+            return None
+        low = min(fact['low'] for fact in levels)
+        high = max(fact['high'] or fact['low'] for fact in levels)
+        return f"{format_number(low)}×-{format_number(high)}×"
     
     def create_key_insights(self):
         """Create KEY_INSIGHTS.md document"""
-        data = self.load_metadata()
-        
+        facts = self.load_facts()
+        profiles = self.platform_profiles()
+        self.build_report(self.docs_dir / "KEY_INSIGHTS.md", {'facts': facts.version(), 'platforms': profiles},
+                          lambda: self.render_key_insights(facts, profiles))
+    
+    def render_key_insights(self, facts: FactTable, profiles: dict) -> str:
         content = ["# Key Insights from Equity Perpetuals Research\n\n"]
         content.append(f"*Generated: {datetime.now().strftime('%Y-%m-%d')}*\n\n")
+        defi, cefi = self.split_platforms(facts, profiles)
         
-        # Platform Insights
+        # Platform Insights (figures from the fact table)
         content.append("## 🏛️ Platform Landscape\n\n")
-        content.append("### DeFi Leaders\n")
-        content.append("- **Hyperliquid**: Dominates with ~80% of decentralized perps market ($357B monthly volume)\n")
-        content.append("- **Aster**: Pioneer in 24/7 US stock perps with 50× leverage via Pyth Network\n")
-        content.append("- **PancakeSwap**: BNB Chain stock perps respecting US market hours (regulatory-conscious)\n\n")
-        
-        content.append("### CeFi Innovations\n")
-        content.append("- **Bitget**: First RWA Index perpetuals (Tesla/Nvidia indexes with 10× leverage)\n")
-        content.append("- Movement toward 24/5 trading schedules (bridging crypto and TradFi)\n\n")
+        for heading, platforms in (("DeFi Leaders", defi), ("CeFi Innovations", cefi)):
+            content.append(f"### {heading}\n")
+            for platform in platforms:
+                highlights = self.platform_highlights(facts, platform)
+                if highlights:
+                    content.append(f"- **{platform}**: {', '.join(highlights)}\n")
+            content.append("\n")
         
         # Technical Architecture
         content.append("## 🔧 Technical Architecture Patterns\n\n")
         content.append("### Core Components\n")
         content.append("1. **Order Book Models**: Hyperliquid's on-chain order book achieves CEX-like performance\n")
-        content.append("2. **Oracle Integration**: Pyth Network emerging as standard for real-time equity pricing\n")
+        oracles = facts.values('oracle', any_platform=True)
+        if oracles:
+            content.append(f"2. **Oracle Integration**: {oracles[0]['value']} emerging as standard for real-time equity pricing\n")
+        else:
+            content.append("2. **Oracle Integration**: Real-time price feeds for equity pricing\n")
         content.append("3. **Hybrid Infrastructure**: L1-EVM architectures balancing speed and composability\n")
         content.append("4. **Funding Rate Mechanisms**: Path-dependent rates ensuring price alignment\n\n")
         
         # Leverage & Risk
         content.append("## ⚖️ Leverage & Risk Parameters\n\n")
-        content.append("| Platform | Max Leverage | Asset Type | Trading Hours |\n")
-        content.append("|----------|-------------|------------|---------------|\n")
-        content.append("| Aster | 50× | US Stocks | 24/7 |\n")
-        content.append("| PancakeSwap | 25× | Synthetic Stocks | US Market Hours |\n")
-        content.append("| Hyperliquid | 50× | Crypto (mainly) | 24/7 |\n")
-        content.append("| Bitget | 10× | RWA Indexes | 24/5 |\n")
-        content.append("| Ostium | 100-200× | RWAs | 24/7 |\n\n")
+        content.append("| Platform | Max Leverage | Asset Type | Trading Hours | Oracle | Sources |\n")
+        content.append("|----------|--------------|------------|---------------|--------|---------|\n")
+        for platform in defi + cefi:
+            leverage = facts.best('leverage', platform)
+            if not leverage:
+                continue
+            asset_type = self.fact_value(facts, 'asset_type', platform)
+            hours = self.fact_value(facts, 'trading_hours', platform)
+            oracle = self.fact_value(facts, 'oracle', platform)
+            content.append(f"| {platform} | {leverage['value']} | {asset_type} | {hours} | {oracle} "
+                           f"| {', '.join(leverage['sources'])} |\n")
+        content.append("\n")
         
         # Regulatory Approaches
         content.append("## 📋 Regulatory Strategies\n\n")
@@ -66,16 +181,28 @@ class ResearchOrganizer:
         # Market Impact
         content.append("## 💰 Market Disruption Potential\n\n")
         content.append("### Revenue Shift Estimates\n")
-        content.append("- **$25-70B annually** could shift from prime brokers to DeFi (stock lending disruption)\n")
-        content.append("- **$120T global equity market** potential for tokenization\n")
-        content.append("- **$2.6T** in decentralized perps volume in 2025 alone\n\n")
+        shift = facts.best('revenue_shift')
+        if shift:
+            period = " annually" if facts.qualifiers('revenue_shift') == ['annual'] else ""
+            content.append(f"- **{shift['value']}{period}** could shift from prime brokers to DeFi (stock lending disruption)\n")
+        size = facts.best('market_size')
+        if size:
+            content.append(f"- **{size['value']} global equity market** potential for tokenization\n")
+        for year in facts.qualifiers('volume'):
+            if year.isdigit():
+                content.append(f"- **{facts.best('volume', None, year)['value']}** in decentralized perps volume in {year} alone\n")
+        content.append("\n")
         
         # Innovation Trends
         content.append("## 🚀 Innovation Trends\n\n")
         content.append("1. **24/7 Trading**: Breaking traditional market hour constraints\n")
         content.append("2. **Cross-Chain Perps**: Multi-chain deployment strategies emerging\n")
         content.append("3. **RWA Integration**: Bridging traditional assets (stocks, commodities, forex)\n")
-        content.append("4. **Fee Burning Models**: Hyperliquid's 97% fee burn creating deflationary pressure\n")
+        burns = facts.values('fee_burn', any_platform=True)
+        if burns and burns[0]['platforms']:
+            content.append(f"4. **Fee Burning Models**: {burns[0]['platforms'][0]}'s {burns[0]['value']} fee burn creating deflationary pressure\n")
+        else:
+            content.append("4. **Fee Burning Models**: Fee burns creating deflationary pressure\n")
         content.append("5. **Reverse Auction Listings**: Novel token distribution mechanisms\n\n")
         
         # Academic Contributions
@@ -114,73 +241,91 @@ class ResearchOrganizer:
         content.append("## 📖 Key References\n\n")
         content.append("See [INDEX.md](INDEX.md) for complete article list with URLs\n")
         
-        # Write the file
-        with open(self.docs_dir / "KEY_INSIGHTS.md", 'w') as f:
-            f.writelines(content)
-        
-        print(f"Created KEY_INSIGHTS.md")
+        return ''.join(content)
     
     def create_summary(self):
         """Create SUMMARY.md document"""
-        data = self.load_metadata()
-        
+        store = self.load_metadata()
+        collection = store.collection()
+        platform_titles = store.articles(columns=('platform', 'title', 'date'))
+        facts = self.load_facts()
+        profiles = self.platform_profiles()
+        self.build_report(self.docs_dir / "SUMMARY.md",
+                          {'collection': collection, 'articles': platform_titles,
+                           'facts': facts.version(), 'platforms': profiles},
+                          lambda: self.render_summary(collection, platform_titles, facts, profiles))
+    
+    def render_summary(self, collection: dict, platform_titles: list, facts: FactTable, profiles: dict) -> str:
         content = ["# Equity Perpetuals Research Summary\n\n"]
         content.append(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n\n")
+        defi, cefi = self.split_platforms(facts, profiles)
+        date_range = collection.get('date_range') or {}
+        years = f"{(date_range.get('earliest') or '')[:4]}-{(date_range.get('latest') or '')[:4]}"
         
         # Executive Summary
         content.append("## Executive Summary\n\n")
         content.append("This research collection covers the emerging landscape of blockchain-based equity perpetual ")
-        content.append("futures, examining 16 key articles from 2022-2025. The materials span DeFi platforms ")
-        content.append("(Hyperliquid, Aster, PancakeSwap), centralized exchanges (Bitget), and academic research.\n\n")
+        content.append(f"futures, examining {collection.get('total_articles', len(platform_titles))} key articles from {years}. ")
+        content.append(f"The materials span DeFi platforms ({', '.join(defi[:3])}), ")
+        content.append(f"centralized exchanges ({', '.join(cefi[:3])}), and academic research.\n\n")
         
         # Statistics
         content.append("## Collection Statistics\n\n")
-        content.append(f"- **Total Articles**: {data['metadata']['total_articles']}\n")
-        content.append(f"- **Date Range**: {data['metadata']['date_range']['earliest']} to {data['metadata']['date_range']['latest']}\n")
+        content.append(f"- **Total Articles**: {collection['total_articles']}\n")
+        content.append(f"- **Date Range**: {collection['date_range']['earliest']} to {collection['date_range']['latest']}\n")
         content.append("- **Categories**:\n")
-        for cat, count in data['metadata']['categories'].items():
+        for cat, count in collection['categories'].items():
             content.append(f"  - {cat}: {count} articles\n")
         content.append("\n")
         
         # Platform Coverage
         content.append("## Platform Coverage\n\n")
-        platforms = {}
-        for article in data['articles']:
-            if 'platform' in article:
-                plat = article['platform']
-                if plat not in platforms:
-                    platforms[plat] = []
-                platforms[plat].append(article['title'])
+        platforms = Aggregator(group_by=('platform',), key=None).consume(platform_titles).group('platform')
+        platforms.pop(None, None)
         
         for platform, articles in sorted(platforms.items()):
             if platform != "Multiple" and len(articles) > 0:
                 content.append(f"### {platform}\n")
-                for title in articles[:3]:  # Show first 3
-                    content.append(f"- {title}\n")
+                for article in articles[:3]:  # Show first 3
+                    content.append(f"- {article['title']}\n")
                 if len(articles) > 3:
                     content.append(f"- *...and {len(articles)-3} more*\n")
                 content.append("\n")
         
         # Key Themes
         content.append("## Dominant Themes\n\n")
+        leverage = self.leverage_span(facts, defi + cefi)
+        shares = facts.values('market_share', any_platform=True)
+        oracles = facts.values('oracle', any_platform=True)
         themes = {
             "24/7 Trading": "Breaking traditional market hours with continuous trading",
-            "High Leverage": "Platforms offering 25×-200× leverage on equity positions",
+            "High Leverage": f"Platforms offering {leverage} leverage on equity positions" if leverage else None,
             "Regulatory Navigation": "Synthetic vs tokenized approaches to avoid securities laws",
-            "Market Dominance": "Hyperliquid capturing 80% of decentralized perps volume",
-            "Oracle Integration": "Pyth Network emerging as standard for equity price feeds",
+            "Market Dominance": (f"{shares[0]['platforms'][0]} capturing {shares[0]['value']} of decentralized perps volume"
+                                 if shares and shares[0]['platforms'] else None),
+            "Oracle Integration": f"{oracles[0]['value']} emerging as standard for equity price feeds" if oracles else None,
             "TradFi Bridge": "Connecting traditional assets to DeFi infrastructure"
         }
         
         for theme, description in themes.items():
-            content.append(f"**{theme}**: {description}\n\n")
-        
-        # Recent Developments
-        content.append("## Recent Developments (2025)\n\n")
-        content.append("1. **Aster Launch (July)**: First major 24/7 US stock perps platform with 50× leverage\n")
-        content.append("2. **PancakeSwap Stock Perps (August)**: BNB Chain entry with regulatory-conscious design\n")
-        content.append("3. **Bitget RWA Indexes (August)**: CeFi innovation with tokenized equity index perps\n")
-        content.append("4. **Hyperliquid Growth**: Achieving $357B monthly volume and 80% market share\n\n")
+            if description:
+                content.append(f"**{theme}**: {description}\n\n")
+        
+        # Recent Developments: first article per platform in the latest year, with its figures
+        year = (date_range.get('latest') or '')[:4]
+        content.append(f"## Recent Developments ({year})\n\n")
+        firsts = {}
+        for article in sorted(platform_titles, key=lambda article: article.get('date') or ''):
+            platform = article.get('platform')
+            if platform and platform != 'Multiple' and (article.get('date') or '').startswith(year):
+                firsts.setdefault(platform, article)
+        for number, (platform, article) in enumerate(firsts.items(), 1):
+            month = self.month_name(article['date'])
+            highlights = self.platform_highlights(facts, platform)
+            details = f" ({', '.join(highlights)})" if highlights else ""
+            label = f"{platform} ({month})" if month else platform
+            content.append(f"{number}. **{label}**: {article['title']}{details}\n")
+        content.append("\n")
         
         # Research Categories
         content.append("## Research by Category\n\n")
@@ -194,8 +339,8 @@ class ResearchOrganizer:
         }
         
         for cat, description in categories_detail.items():
-            if cat in data['metadata']['categories']:
-                count = data['metadata']['categories'][cat]
+            if cat in collection['categories']:
+                count = collection['categories'][cat]
                 content.append(f"### {cat.upper()} ({count} articles)\n")
                 content.append(f"{description}\n\n")
         
@@ -203,11 +348,21 @@ class ResearchOrganizer:
         content.append("## Key Market Metrics\n\n")
         content.append("| Metric | Value | Source |\n")
         content.append("|--------|-------|--------|\n")
-        content.append("| Hyperliquid Market Share | ~80% | Multiple sources |\n")
-        content.append("| Monthly Volume (Hyperliquid) | $357B | BlockByte |\n")
-        content.append("| 2025 DeFi Perps Volume | $2.6T | 21Shares |\n")
-        content.append("| Potential Revenue Shift | $25-70B/year | Sentora |\n")
-        content.append("| Global Equity Market Size | $120T | Market estimates |\n\n")
+        rows = []
+        for platform in facts.platforms('market_share'):
+            rows.append((f"{platform} Market Share", facts.best('market_share', platform)))
+        for platform in facts.platforms('volume'):
+            for period in facts.qualifiers('volume', platform):
+                rows.append((f"{period.title()} Volume ({platform})", facts.best('volume', platform, period)))
+        for year in facts.qualifiers('volume'):
+            if year.isdigit():
+                rows.append((f"{year} DeFi Perps Volume", facts.best('volume', None, year)))
+        rows.append(("Potential Revenue Shift", facts.best('revenue_shift')))
+        rows.append(("Global Equity Market Size", facts.best('market_size')))
+        for metric, fact in rows:
+            if fact:
+                content.append(f"| {metric} | {fact['value']} | {', '.join(fact['sources'])} |\n")
+        content.append("\n")
         
         # Next Steps
         content.append("## Recommended Reading Order\n\n")
@@ -221,36 +376,43 @@ class ResearchOrganizer:
         content.append("*This summary is part of the Equity Perpetuals Research collection.*\n")
         content.append("*For updates or additions, see the scripts/organize.py tool.*\n")
         
-        # Write the file
-        with open(self.docs_dir / "SUMMARY.md", 'w') as f:
-            f.writelines(content)
-        
-        print(f"Created SUMMARY.md")
+        return ''.join(content)
     
     def create_quick_reference(self):
         """Create a quick reference card"""
-        data = self.load_metadata()
-        
+        facts = self.load_facts()
+        profiles = self.platform_profiles()
+        self.build_report(self.data_dir / "quick_reference.md", {'facts': facts.version(), 'platforms': profiles},
+                          lambda: self.render_quick_reference(facts, profiles))
+    
+    def render_quick_reference(self, facts: FactTable, profiles: dict) -> str:
         content = ["# Quick Reference: Equity Perps Platforms\n\n"]
+        defi, cefi = self.split_platforms(facts, profiles)
         
         content.append("## DeFi Platforms\n\n")
-        content.append("| Platform | Leverage | Assets | Chain | Special Features |\n")
-        content.append("|----------|----------|--------|-------|------------------|\n")
-        content.append("| Aster | 50× | US Stocks | - | 24/7, Pyth oracles |\n")
-        content.append("| PancakeSwap | 25× | AAPL, AMZN, TSLA | BNB | US hours, synthetic |\n")
-        content.append("| Hyperliquid | 50× | Crypto | L1 | 80% market share |\n")
-        content.append("| Ostium | 100-200× | RWAs | Arbitrum | Extreme leverage |\n\n")
+        content.append("| Platform | Leverage | Assets | Chain | Trading Hours | Oracle | Market Share |\n")
+        content.append("|----------|----------|--------|-------|---------------|--------|--------------|\n")
+        for platform in defi:
+            profile = profiles.get(platform, {})
+            chain = self.fact_value(facts, 'chain', platform, default=None) or profile.get('chain') or '-'
+            content.append(f"| {platform} | {self.fact_value(facts, 'leverage', platform)} "
+                           f"| {self.platform_assets(facts, profile, platform)} | {chain} "
+                           f"| {self.fact_value(facts, 'trading_hours', platform)} "
+                           f"| {self.fact_value(facts, 'oracle', platform)} "
+                           f"| {self.fact_value(facts, 'market_share', platform)} |\n")
+        content.append("\n")
         
         content.append("## CeFi Platforms\n\n")
-        content.append("| Platform | Type | Leverage | Trading Hours |\n")
-        content.append("|----------|------|----------|---------------|\n")
-        content.append("| Bitget | RWA Indexes | 10× | 24/5 |\n\n")
-        
-        # Write to data directory
-        with open(self.data_dir / "quick_reference.md", 'w') as f:
-            f.writelines(content)
+        content.append("| Platform | Leverage | Assets | Trading Hours |\n")
+        content.append("|----------|----------|--------|---------------|\n")
+        for platform in cefi:
+            profile = profiles.get(platform, {})
+            content.append(f"| {platform} | {self.fact_value(facts, 'leverage', platform)} "
+                           f"| {self.platform_assets(facts, profile, platform)} "
+                           f"| {self.fact_value(facts, 'trading_hours', platform)} |\n")
+        content.append("\n")
         
-        print(f"Created quick_reference.md")
+        return ''.join(content)
     
     def run(self):
         """Run all organization tasks"""
@@ -261,6 +423,7 @@ class ResearchOrganizer:
         self.create_key_insights()
         self.create_summary()
         self.create_quick_reference()
+        self.graph.save()
         
         print("=" * 50)
         print("Organization complete!")
@@ -0,0 +1,787 @@
+#!/usr/bin/env python3
+"""
+Page-by-page PDF text extraction
+Memory-mapped stdlib PDF reader (xref tables and streams, object streams, Flate) with pages
+fanned out across a process pool
+"""
+
+import argparse
+import base64
+import mmap
+import multiprocessing
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+WHITESPACE = b' \t\r\n\x0c\x00'
+TOKEN_RE = re.compile(rb"[^\s()<>\[\]{}/%]+")
+REF_RE = re.compile(rb"(\d+)\s+(\d+)\s+R(?![^\s()<>\[\]{}/%])")
+OBJ_HEADER_RE = re.compile(rb"(\d+)\s+(\d+)\s+obj")
+NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)$")
+XREF_ENTRY_RE = re.compile(rb"(\d{10})\s(\d{5})\s([nf])")
+XREF_SECTION_RE = re.compile(rb"(\d+)\s+(\d+)")
+
+ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('f'): b'\f',
+           ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+
+# Glyph names pdfTeX and friends use in /Differences arrays that are not plain letters
+GLYPH_NAMES = {
+    'space': ' ', 'exclam': '!', 'quotedbl': '"', 'numbersign': '#', 'dollar': '$', 'percent': '%',
+    'ampersand': '&', 'quoteright': '’', 'quotesingle': "'", 'parenleft': '(', 'parenright': ')',
+    'asterisk': '*', 'plus': '+', 'comma': ',', 'hyphen': '-', 'period': '.', 'slash': '/',
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5', 'six': '6',
+    'seven': '7', 'eight': '8', 'nine': '9', 'colon': ':', 'semicolon': ';', 'less': '<', 'equal': '=',
+    'greater': '>', 'question': '?', 'at': '@', 'bracketleft': '[', 'backslash': '\\',
+    'bracketright': ']', 'underscore': '_', 'quoteleft': '‘', 'braceleft': '{', 'bar': '|',
+    'braceright': '}', 'asciitilde': '~', 'endash': '–', 'emdash': '—', 'bullet': '•',
+    'quotedblleft': '“', 'quotedblright': '”', 'fi': 'fi', 'fl': 'fl', 'ff': 'ff',
+    'ffi': 'ffi', 'ffl': 'ffl', 'dotlessi': 'i', 'minus': '−', 'multiply': '×',
+    'section': '§', 'dagger': '†', 'daggerdbl': '‡', 'ellipsis': '…',
+}
+
+# Documents with at least this many pages are split across worker processes
+PARALLEL_MIN_PAGES = 8
+
+
+class PdfError(Exception):
+    pass
+
+
+class Name(str):
+    """A PDF name object (/Type)"""
+
+
+class Keyword(str):
+    """A bare PDF keyword or content-stream operator"""
+
+
+class Ref(tuple):
+    """An indirect reference (object number, generation)"""
+
+
+class Stream:
+    def __init__(self, attrs: Dict, raw):
+        self.attrs = attrs
+        self.raw = raw
+
+
+def skip_whitespace(data, pos: int) -> int:
+    size = len(data)
+    while pos < size:
+        c = data[pos]
+        if c in WHITESPACE:
+            pos += 1
+        elif c == 0x25:  # comment
+            while pos < size and data[pos] not in (10, 13):
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def parse_literal_string(data, pos: int) -> Tuple[bytes, int]:
+    """Parse a (string) starting just after the opening parenthesis"""
+    out = bytearray()
+    depth = 1
+    size = len(data)
+    while pos < size:
+        c = data[pos]
+        if c == 0x5C:  # backslash
+            pos += 1
+            c = data[pos]
+            if c in ESCAPES:
+                out += ESCAPES[c]
+                pos += 1
+            elif 0x30 <= c <= 0x37:
+                end = pos
+                while end < pos + 3 and 0x30 <= data[end] <= 0x37:
+                    end += 1
+                out.append(int(bytes(data[pos:end]), 8) & 0xFF)
+                pos = end
+            elif c == 13:
+                pos += 2 if pos + 1 < size and data[pos + 1] == 10 else 1
+            elif c == 10:
+                pos += 1
+            else:
+                out.append(c)
+                pos += 1
+            continue
+        if c == 0x28:
+            depth += 1
+        elif c == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos + 1
+        out.append(c)
+        pos += 1
+    raise PdfError("unterminated string")
+
+
+def parse_object(data, pos: int):
+    """Parse one PDF object at pos; returns (object, end position)"""
+    pos = skip_whitespace(data, pos)
+    if pos >= len(data):
+        raise PdfError("unexpected end of data")
+    c = data[pos]
+    if c == 0x2F:  # /Name
+        match = TOKEN_RE.match(data, pos + 1)
+        raw = match.group() if match else b''
+        name = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), raw)
+        return Name(name.decode('latin-1')), pos + 1 + len(raw)
+    if c == 0x3C:  # << dict >> or <hex>
+        if data[pos + 1] == 0x3C:
+            result = {}
+            pos += 2
+            while True:
+                pos = skip_whitespace(data, pos)
+                if data[pos] == 0x3E:
+                    return result, pos + 2
+                key, pos = parse_object(data, pos)
+                value, pos = parse_object(data, pos)
+                result[key] = value
+        end = data.find(b'>', pos)
+        digits = re.sub(rb"[^0-9A-Fa-f]", b'', bytes(data[pos + 1:end]))
+        if len(digits) % 2:
+            digits += b'0'
+        return bytes.fromhex(digits.decode()), end + 1
+    if c == 0x5B:  # [array]
+        result = []
+        pos += 1
+        while True:
+            pos = skip_whitespace(data, pos)
+            if data[pos] == 0x5D:
+                return result, pos + 1
+            value, pos = parse_object(data, pos)
+            result.append(value)
+    if c == 0x28:
+        return parse_literal_string(data, pos + 1)
+    if c in b'{}':
+        return Keyword(chr(c)), pos + 1
+    if c in b')>]':
+        raise PdfError(f"unexpected delimiter at {pos}")
+
+    ref = REF_RE.match(data, pos)
+    if ref:
+        return Ref((int(ref.group(1)), int(ref.group(2)))), ref.end()
+    match = TOKEN_RE.match(data, pos)
+    token = match.group()
+    end = match.end()
+    if NUMBER_RE.match(token):
+        return (float(token) if b'.' in token else int(token)), end
+    if token == b'true':
+        return True, end
+    if token == b'false':
+        return False, end
+    if token == b'null':
+        return None, end
+    return Keyword(token.decode('latin-1')), end
+
+
+def png_unpredict(data: bytes, columns: int) -> bytes:
+    """Undo PNG row predictors (xref streams commonly use /Predictor 12)"""
+    row_size = columns + 1
+    previous = bytearray(columns)
+    out = bytearray()
+    for start in range(0, len(data) - columns, row_size):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + row_size])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                upper_left = previous[i - 1] if i else 0
+                p = left + up - upper_left
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - upper_left)
+                predictor = left if pa <= pb and pa <= pc else (up if pb <= pc else upper_left)
+                row[i] = (row[i] + predictor) & 0xFF
+        out += row
+        previous = row
+    return bytes(out)
+
+
+def decode_pdf_string(value) -> str:
+    """Decode a PDF text string (UTF-16BE with BOM, otherwise PDFDocEncoding ~ Latin-1)"""
+    if isinstance(value, str):
+        return value
+    if value.startswith(b'\xfe\xff'):
+        return value[2:].decode('utf-16-be', errors='replace')
+    return value.decode('latin-1')
+
+
+class Font:
+    """Maps a font's character codes to text (ToUnicode CMap, else simple encodings) and widths"""
+
+    def __init__(self, doc: 'PdfDocument', attrs: Dict):
+        self.code_length = 2 if attrs.get('Subtype') == 'Type0' else 1
+        self.mapping: Dict[bytes, str] = {}
+        self.differences: Dict[int, str] = {}
+        self.widths: Dict[int, float] = {}
+        self.default_width = 500.0
+        self.load_widths(doc, attrs)
+        to_unicode = doc.resolve(attrs.get('ToUnicode'))
+        if isinstance(to_unicode, Stream):
+            try:
+                self.parse_cmap(doc.stream_data(to_unicode))
+            except (PdfError, zlib.error, ValueError, IndexError):
+                self.mapping = {}
+        encoding = doc.resolve(attrs.get('Encoding'))
+        if isinstance(encoding, dict):
+            code = 0
+            for item in doc.resolve(encoding.get('Differences')) or []:
+                if isinstance(item, int):
+                    code = item
+                elif isinstance(item, Name):
+                    self.differences[code] = self.glyph_text(item)
+                    code += 1
+
+    def load_widths(self, doc: 'PdfDocument', attrs: Dict):
+        """Glyph advances in thousandths of an em (/Widths, or /W of a CID font)"""
+        if attrs.get('Subtype') == 'Type0':
+            descendants = doc.resolve(attrs.get('DescendantFonts')) or [{}]
+            cid_font = doc.resolve(descendants[0]) or {}
+            self.default_width = float(doc.resolve(cid_font.get('DW')) or 1000)
+            spec = doc.resolve(cid_font.get('W')) or []
+            i = 0
+            while i + 1 < len(spec):
+                first, item = spec[i], doc.resolve(spec[i + 1])
+                if isinstance(item, list):
+                    for offset, width in enumerate(item):
+                        self.widths[first + offset] = float(doc.resolve(width))
+                    i += 2
+                elif i + 2 < len(spec):
+                    for code in range(first, min(item, first + 65536) + 1):
+                        self.widths[code] = float(doc.resolve(spec[i + 2]))
+                    i += 3
+                else:
+                    break
+            return
+        first = doc.resolve(attrs.get('FirstChar')) or 0
+        for offset, width in enumerate(doc.resolve(attrs.get('Widths')) or []):
+            self.widths[first + offset] = float(doc.resolve(width) or 0)
+
+    @staticmethod
+    def glyph_text(name: str) -> str:
+        if name in GLYPH_NAMES:
+            return GLYPH_NAMES[name]
+        if len(name) == 1:
+            return name
+        if name.startswith('uni') and len(name) >= 7:
+            try:
+                return chr(int(name[3:7], 16))
+            except ValueError:
+                pass
+        return ''
+
+    def parse_cmap(self, data: bytes):
+        lengths = set()
+        for block in re.findall(rb"begincodespacerange(.*?)endcodespacerange", data, re.S):
+            for low in re.findall(rb"<([0-9A-Fa-f]+)>\s*<[0-9A-Fa-f]+>", block):
+                lengths.add(len(low) // 2)
+        if lengths:
+            self.code_length = min(lengths)
+        for block in re.findall(rb"beginbfchar(.*?)endbfchar", data, re.S):
+            for src, dst in re.findall(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>", block):
+                self.mapping[bytes.fromhex(src.decode())] = self.unicode(dst)
+        for block in re.findall(rb"beginbfrange(.*?)endbfrange", data, re.S):
+            for low, high, dst in re.findall(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f]*>|\[[^\]]*\])",
+                                             block):
+                width = len(low) // 2
+                start, stop = int(low, 16), int(high, 16)
+                if dst.startswith(b'['):
+                    targets = [self.unicode(item) for item in re.findall(rb"<([0-9A-Fa-f]*)>", dst)]
+                    for offset, text in enumerate(targets[:stop - start + 1]):
+                        self.mapping[(start + offset).to_bytes(width, 'big')] = text
+                    continue
+                base = bytes.fromhex(dst[1:-1].decode())
+                for offset in range(min(stop - start + 1, 65536)):
+                    # The last byte of the destination is incremented across the range
+                    target = base[:-1] + bytes([(base[-1] + offset) & 0xFF]) if base else b''
+                    self.mapping[(start + offset).to_bytes(width, 'big')] = self.unicode(target.hex().encode())
+
+    @staticmethod
+    def unicode(hex_digits: bytes) -> str:
+        raw = bytes.fromhex(hex_digits.decode()) if hex_digits else b''
+        return raw.decode('utf-16-be', errors='replace')
+
+    def decode(self, data: bytes) -> Tuple[str, float]:
+        """Text for a shown string and its advance in thousandths of an em"""
+        step = self.code_length
+        parts = []
+        advance = 0.0
+        for i in range(0, len(data), step):
+            code = data[i:i + step]
+            value = int.from_bytes(code, 'big')
+            advance += self.widths.get(value, self.default_width)
+            if self.mapping:
+                parts.append(self.mapping.get(code, ''))
+            elif step == 1:
+                parts.append(self.differences.get(value, chr(value)))
+        return ''.join(parts), advance
+
+
+class PdfDocument:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.file = open(self.path, 'rb')
+        try:
+            # Large papers are mapped rather than read: only the objects touched are paged in
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self.data = self.file.read()
+        if not self.data[:1024].lstrip().startswith(b'%PDF'):
+            self.close()
+            raise PdfError(f"{self.path} is not a PDF")
+        self.offsets: Dict[int, Tuple] = {}
+        self.cache: Dict[int, object] = {}
+        self.object_streams: Dict[int, Dict[int, object]] = {}
+        self.fonts: Dict[Ref, Font] = {}
+        try:
+            self.trailer = self.read_xref()
+        except (PdfError, ValueError, IndexError, AttributeError, zlib.error):
+            self.trailer = self.rebuild_xref()
+        self.pages = self.collect_pages()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def read_xref(self) -> Dict:
+        """Follow startxref through xref tables and streams, newest section first"""
+        tail_start = max(0, len(self.data) - 2048)
+        marker = self.data.rfind(b'startxref', tail_start)
+        if marker < 0:
+            raise PdfError("no startxref")
+        offset, _ = parse_object(self.data, marker + len(b'startxref'))
+        trailer = None
+        seen = set()
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            pos = skip_whitespace(self.data, offset)
+            if self.data[pos:pos + 4] == b'xref':
+                section = self.read_xref_table(pos + 4)
+            else:
+                section = self.read_xref_stream(pos)
+            if trailer is None:
+                trailer = section
+            if 'XRefStm' in section:
+                self.read_xref_stream(section['XRefStm'])
+            offset = section.get('Prev')
+        if not trailer or 'Root' not in trailer:
+            raise PdfError("no trailer")
+        return trailer
+
+    def read_xref_table(self, pos: int) -> Dict:
+        while True:
+            pos = skip_whitespace(self.data, pos)
+            if self.data[pos:pos + 7] == b'trailer':
+                trailer, _ = parse_object(self.data, pos + 7)
+                return trailer
+            header = XREF_SECTION_RE.match(self.data, pos)
+            if not header:
+                raise PdfError("bad xref section")
+            start, count = int(header.group(1)), int(header.group(2))
+            pos = header.end()
+            for number in range(start, start + count):
+                pos = skip_whitespace(self.data, pos)
+                entry = XREF_ENTRY_RE.match(self.data, pos)
+                if not entry:
+                    raise PdfError("bad xref entry")
+                pos = entry.end()
+                if entry.group(3) == b'n' and number not in self.offsets:
+                    self.offsets[number] = ('offset', int(entry.group(1)))
+
+    def read_xref_stream(self, pos: int) -> Dict:
+        _, stream = self.parse_indirect(pos)
+        if not isinstance(stream, Stream):
+            raise PdfError("bad xref stream")
+        attrs = stream.attrs
+        widths = attrs['W']
+        data = self.stream_data(stream)
+        index = attrs.get('Index') or [0, attrs['Size']]
+        row_size = sum(widths)
+        row = 0
+        for section in range(0, len(index), 2):
+            for number in range(index[section], index[section] + index[section + 1]):
+                fields = []
+                offset = row * row_size
+                for width in widths:
+                    fields.append(int.from_bytes(data[offset:offset + width], 'big') if width else None)
+                    offset += width
+                row += 1
+                kind = 1 if fields[0] is None else fields[0]
+                if number in self.offsets:
+                    continue
+                if kind == 1:
+                    self.offsets[number] = ('offset', fields[1])
+                elif kind == 2:
+                    self.offsets[number] = ('compressed', fields[1], fields[2] or 0)
+        return attrs
+
+    def rebuild_xref(self) -> Dict:
+        """Recover object offsets by scanning the file (damaged or missing xref)"""
+        self.offsets.clear()
+        trailer = {}
+        for match in re.finditer(rb"(?<![0-9])(\d+)\s+(\d+)\s+obj\b", self.data):
+            self.offsets[int(match.group(1))] = ('offset', match.start())
+        for match in re.finditer(rb"trailer", self.data):
+            try:
+                value, _ = parse_object(self.data, match.end())
+                if isinstance(value, dict):
+                    trailer.update(value)
+            except (PdfError, IndexError, AttributeError):
+                continue
+        if 'Root' not in trailer:
+            for number in list(self.offsets):
+                obj = self.get(number)
+                if isinstance(obj, dict) and obj.get('Type') == 'Catalog':
+                    trailer['Root'] = Ref((number, 0))
+                    break
+        if 'Root' not in trailer:
+            raise PdfError("no document catalog")
+        return trailer
+
+    def parse_indirect(self, pos: int):
+        header = OBJ_HEADER_RE.match(self.data, skip_whitespace(self.data, pos))
+        if not header:
+            raise PdfError(f"no object at {pos}")
+        value, end = parse_object(self.data, header.end())
+        if isinstance(value, dict):
+            end = skip_whitespace(self.data, end)
+            if self.data[end:end + 6] == b'stream':
+                start = end + 6
+                if self.data[start:start + 2] == b'\r\n':
+                    start += 2
+                elif self.data[start:start + 1] in (b'\n', b'\r'):
+                    start += 1
+                length = value.get('Length')
+                if isinstance(length, Ref):
+                    length = self.get(length[0])
+                if not isinstance(length, int) or self.data[start + length:start + length + 20].find(b'endstream') < 0:
+                    length = self.data.find(b'endstream', start) - start
+                value = Stream(value, self.data[start:start + length])
+        return int(header.group(1)), value
+
+    def get(self, number: int):
+        if number in self.cache:
+            return self.cache[number]
+        location = self.offsets.get(number)
+        value = None
+        if location and location[0] == 'offset':
+            _, value = self.parse_indirect(location[1])
+        elif location:
+            value = self.object_stream(location[1]).get(number)
+        self.cache[number] = value
+        return value
+
+    def object_stream(self, number: int) -> Dict[int, object]:
+        if number not in self.object_streams:
+            stream = self.get(number)
+            data = self.stream_data(stream)
+            count, first = stream.attrs['N'], stream.attrs['First']
+            header = [int(token) for token in data[:first].split()]
+            objects = {}
+            for index in range(count):
+                objects[header[2 * index]], _ = parse_object(data, first + header[2 * index + 1])
+            self.object_streams[number] = objects
+        return self.object_streams[number]
+
+    def resolve(self, value):
+        seen = 0
+        while isinstance(value, Ref) and seen < 32:
+            value = self.get(value[0])
+            seen += 1
+        return value
+
+    def stream_data(self, stream: Stream) -> bytes:
+        data = bytes(stream.raw)
+        filters = self.resolve(stream.attrs.get('Filter'))
+        params = self.resolve(stream.attrs.get('DecodeParms'))
+        if not isinstance(filters, list):
+            filters = [filters] if filters else []
+        if not isinstance(params, list):
+            params = [params] * len(filters)
+        for name, param in zip(filters, params):
+            param = self.resolve(param) or {}
+            if name in ('FlateDecode', 'Fl'):
+                try:
+                    data = zlib.decompress(data)
+                except zlib.error:
+                    # Truncated streams still yield their complete prefix
+                    data = zlib.decompressobj().decompress(data)
+                if param.get('Predictor', 1) >= 10:
+                    data = png_unpredict(data, param.get('Columns', 1) * param.get('Colors', 1)
+                                         * param.get('BitsPerComponent', 8) // 8)
+            elif name in ('ASCIIHexDecode', 'AHx'):
+                digits = re.sub(rb"[^0-9A-Fa-f]", b'', data.split(b'>')[0])
+                data = bytes.fromhex((digits + b'0' * (len(digits) % 2)).decode())
+            elif name in ('ASCII85Decode', 'A85'):
+                data = base64.a85decode(data.strip().removesuffix(b'~>'), adobe=False)
+            else:
+                raise PdfError(f"unsupported filter {name}")
+        return data
+
+    def collect_pages(self) -> List[Tuple[Dict, Dict]]:
+        """(page dict, effective resources) for every page, in order"""
+        root = self.resolve(self.trailer['Root'])
+        pages = []
+        stack = [(self.resolve(root.get('Pages')), None)]
+        visited = set()
+        while stack:
+            node, inherited = stack.pop()
+            if not isinstance(node, dict) or id(node) in visited:
+                continue
+            visited.add(id(node))
+            resources = self.resolve(node.get('Resources')) or inherited
+            kids = self.resolve(node.get('Kids'))
+            if node.get('Type') == 'Page' or kids is None:
+                pages.append((node, resources or {}))
+            else:
+                for kid in reversed(kids):
+                    stack.append((self.resolve(kid), resources))
+        return pages
+
+    def info(self) -> Dict[str, str]:
+        info = self.resolve(self.trailer.get('Info'))
+        if not isinstance(info, dict):
+            return {}
+        return {key: decode_pdf_string(self.resolve(value)) for key, value in info.items()
+                if isinstance(self.resolve(value), (bytes, str))}
+
+    def font(self, resources: Dict, name: str) -> Optional[Font]:
+        fonts = self.resolve(resources.get('Font')) or {}
+        ref = fonts.get(name)
+        if ref is None:
+            return None
+        key = ref if isinstance(ref, Ref) else id(ref)
+        if key not in self.fonts:
+            attrs = self.resolve(ref)
+            self.fonts[key] = Font(self, attrs) if isinstance(attrs, dict) else None
+        return self.fonts[key]
+
+    def page_text(self, index: int) -> str:
+        page, resources = self.pages[index]
+        contents = self.resolve(page.get('Contents'))
+        if contents is None:
+            return ''
+        if not isinstance(contents, list):
+            contents = [contents]
+        data = b'\n'.join(self.stream_data(stream) for stream in map(self.resolve, contents)
+                          if isinstance(stream, Stream))
+        return ContentText(self, resources).run(data)
+
+
+class ContentText:
+    """Interprets the text operators of one page's content stream
+
+    Tracks the pen position (line origin plus glyph advances) so that word gaps
+    and line breaks can be told from runs a producer merely split.
+    """
+
+    def __init__(self, doc: PdfDocument, resources: Dict):
+        self.doc = doc
+        self.resources = resources
+        self.font: Optional[Font] = None
+        self.size = 0.0
+        self.scale = 1.0
+        self.x = self.y = 0.0
+        self.line_x = self.line_y = 0.0
+        self.parts: List[str] = []
+
+    def show(self, value: bytes):
+        if self.font is not None:
+            text, advance = self.font.decode(value)
+        else:
+            text, advance = value.decode('latin-1'), 500.0 * len(value)
+        self.parts.append(text)
+        self.x += advance / 1000 * self.size * self.scale
+
+    def space(self):
+        if self.parts and not self.parts[-1].endswith((' ', '\n')):
+            self.parts.append(' ')
+
+    def newline(self):
+        if self.parts and not self.parts[-1].endswith('\n'):
+            self.parts.append('\n')
+
+    def move_to(self, x: float, y: float):
+        """Start a new run at (x, y); emit a break or a space if the move implies one"""
+        em = max(self.size * abs(self.scale), 1.0)
+        if abs(y - self.y) > 0.5 * em:
+            self.newline()
+        elif abs(x - self.x) > 0.15 * em:
+            self.space()
+        self.x, self.y = x, y
+        self.line_x, self.line_y = x, y
+
+    def run(self, data: bytes) -> str:
+        operands = []
+        pos = 0
+        size = len(data)
+        while True:
+            pos = skip_whitespace(data, pos)
+            if pos >= size:
+                break
+            try:
+                value, pos = parse_object(data, pos)
+            except (PdfError, IndexError, AttributeError, ValueError):
+                # Skip an unparseable byte rather than lose the rest of the page
+                pos += 1
+                operands = []
+                continue
+            if not isinstance(value, Keyword):
+                operands.append(value)
+                continue
+            if value == 'ID':
+                # Inline image data: skip to the EI operator
+                end = re.compile(rb"\sEI(?=[\s]|$)").search(data, pos)
+                pos = end.end() if end else size
+            else:
+                try:
+                    self.operator(value, operands)
+                except (TypeError, ValueError, IndexError):
+                    pass
+            operands = []
+        text = ''.join(self.parts)
+        text = re.sub(r"[ \t]+", ' ', text)
+        return re.sub(r" ?\n ?", '\n', text).strip()
+
+    def operator(self, op: str, operands: List):
+        if op == 'BT':
+            self.scale = 1.0
+            self.move_to(0.0, self.y)
+        elif op == 'Tf' and len(operands) >= 2:
+            self.font = self.doc.font(self.resources, operands[0])
+            self.size = float(operands[1])
+        elif op == 'Tj' and operands and isinstance(operands[-1], bytes):
+            self.show(operands[-1])
+        elif op in ("'", '"') and operands and isinstance(operands[-1], bytes):
+            self.newline()
+            self.show(operands[-1])
+        elif op == 'TJ' and operands and isinstance(operands[-1], list):
+            for item in operands[-1]:
+                if isinstance(item, bytes):
+                    self.show(item)
+                elif isinstance(item, (int, float)):
+                    # Large negative kerning is how most producers typeset a word gap
+                    if item < -200:
+                        self.space()
+                    self.x -= item / 1000 * self.size * self.scale
+        elif op in ('Td', 'TD') and len(operands) >= 2:
+            self.move_to(self.line_x + operands[0] * self.scale, self.line_y + operands[1] * self.scale)
+        elif op == 'Tm' and len(operands) >= 6:
+            self.scale = float(operands[0]) or 1.0
+            self.move_to(float(operands[4]), float(operands[5]))
+        elif op == 'T*':
+            self.newline()
+            self.x = self.line_x
+
+
+# Documents kept open by a pool worker between batches, by path (least recently used first)
+WORKER_DOCUMENTS: Dict[str, Tuple[Tuple[int, int], PdfDocument]] = {}
+WORKER_DOCUMENTS_MAX = 4
+
+
+def open_document(path: str, version: Tuple[int, int]) -> PdfDocument:
+    """Per-worker document cache, so a worker handling several batches parses the xref once
+
+    Replaced and evicted documents are closed, releasing their file and mmap.
+    """
+    cached = WORKER_DOCUMENTS.pop(path, None)
+    if cached and cached[0] == version:
+        WORKER_DOCUMENTS[path] = cached
+        return cached[1]
+    if cached:
+        cached[1].close()
+    doc = PdfDocument(Path(path))
+    WORKER_DOCUMENTS[path] = (version, doc)
+    while len(WORKER_DOCUMENTS) > WORKER_DOCUMENTS_MAX:
+        oldest = next(iter(WORKER_DOCUMENTS))
+        WORKER_DOCUMENTS.pop(oldest)[1].close()
+    return doc
+
+
+def extract_pages(path: str, pages: Sequence[int]) -> List[str]:
+    """Extract a batch of pages in a pool worker (the document stays open for its next batch)"""
+    stat = Path(path).stat()
+    return page_texts(open_document(str(path), (stat.st_mtime_ns, stat.st_size)), pages)
+
+
+def page_texts(doc: PdfDocument, pages: Sequence[int]) -> List[str]:
+    """Text of the given pages of an open document; unreadable pages come back empty"""
+    texts = []
+    for index in pages:
+        try:
+            texts.append(doc.page_text(index))
+        except (PdfError, ValueError, IndexError, KeyError, AttributeError, TypeError, zlib.error):
+            texts.append('')
+    return texts
+
+
+def page_batches(page_count: int, workers: int) -> List[range]:
+    """Split pages into a few batches per worker"""
+    size = max(1, -(-page_count // (workers * 4)))
+    return [range(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def submit_pages(pool, path: str, page_count: int, workers: int) -> list:
+    """Queue a document's page batches on an existing pool; returns the futures in page order"""
+    return [pool.submit(extract_pages, path, list(batch)) for batch in page_batches(page_count, workers)]
+
+
+def extract_pdf(path: Path, workers: Optional[int] = None) -> Tuple[Dict[str, str], List[str]]:
+    """Extract (document info, page texts), fanning pages out over a process pool for long documents"""
+    path = str(path)
+    workers = workers or multiprocessing.cpu_count()
+    with PdfDocument(Path(path)) as doc:
+        info = doc.info()
+        page_count = doc.page_count
+        if workers < 2 or page_count < PARALLEL_MIN_PAGES:
+            return info, page_texts(doc, range(page_count))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = submit_pages(pool, path, page_count, workers)
+            return info, [text for future in futures for text in future.result()]
+    except BrokenProcessPool:
+        with PdfDocument(Path(path)) as doc:
+            return info, page_texts(doc, range(page_count))
+
+
+def render_pdf(info: Dict[str, str], pages: List[str], title: Optional[str] = None) -> str:
+    """Format a paper the way the category text files expect, one block per page"""
+    body = '\n\n'.join(f"[Page {number}]\n{text}" for number, text in enumerate(pages, 1) if text)
+    return (f"Title: {title or info.get('Title', '')}\n\nDescription: {info.get('Subject', '')}\n\n"
+            f"Content Extract:\n{body}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract text from PDF files page by page")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    for path in args.paths:
+        info, pages = extract_pdf(Path(path), workers=args.workers)
+        print(render_pdf(info, pages))
+
+
+if __name__ == "__main__":
+    main()
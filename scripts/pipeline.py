@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Staged scrape pipeline
+Fetch threads -> bounded queue -> extraction processes -> bounded queue -> writer thread
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from extractor import extract_file
+from pdf_extract import PdfDocument, PdfError, page_texts, render_pdf, submit_pages
+
+PDF_TYPE = 'application/pdf'
+
+# Marks the end of a stage's output
+DONE = object()
+
+
+class ScrapePipeline:
+    def __init__(self, scraper, fetch_workers: int = 8, extract_workers: Optional[int] = None,
+                 queue_size: int = 32):
+        self.scraper = scraper
+        self.fetch_workers = max(1, fetch_workers)
+        self.extract_workers = extract_workers or multiprocessing.cpu_count()
+        # Bounded hand-offs: a slow stage blocks the one feeding it instead of piling up work
+        self.extract_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.max_in_flight = self.extract_workers * 2
+        self.metrics = scraper.metrics
+        # First exception that stopped the writer, re-raised by run()
+        self.write_error: Optional[BaseException] = None
+
+    def run(self, articles: List[Dict]):
+        """Process articles through all stages and wait for the writer to finish"""
+        pending = queue.Queue()
+        for article in articles:
+            pending.put(article)
+
+        fetchers = [threading.Thread(target=self.fetch_stage, args=(pending,), daemon=True)
+                    for _ in range(min(self.fetch_workers, max(1, len(articles))))]
+        extractor = threading.Thread(target=self.extract_stage, daemon=True)
+        writer = threading.Thread(target=self.write_stage, daemon=True)
+
+        for thread in [writer, extractor] + fetchers:
+            thread.start()
+        for thread in fetchers:
+            thread.join()
+        self.extract_queue.put(DONE)
+        extractor.join()
+        writer.join()
+        if self.write_error is not None:
+            raise self.write_error
+
+    def fetch_stage(self, pending: queue.Queue):
+        """Download bodies to disk; route them to extraction only when needed"""
+        while True:
+            try:
+                article = pending.get_nowait()
+            except queue.Empty:
+                return
+            download = self.scraper.fetch_article(article, extract=False)
+            if self.needs_extraction(article, download):
+                self.extract_queue.put((article, download))
+                self.metrics.gauge('extract_queue', self.extract_queue.qsize())
+            else:
+                self.write_queue.put((article, download))
+                self.metrics.gauge('write_queue', self.write_queue.qsize())
+
+    def needs_extraction(self, article: Dict, download: Optional[Dict]) -> bool:
+        if not download or not download['path']:
+            return False
+        if download['content_type'] not in self.scraper.extractable_types:
+            return False
+        previous = self.scraper.index_entries.get(article['id'])
+        return not self.scraper.is_unchanged(article, previous, download['digest'])
+
+    def extract_stage(self):
+        """Fan extraction out over a process pool, keeping a bounded number in flight"""
+        in_flight = deque()
+        pool = None
+        try:
+            context = multiprocessing.get_context('spawn')
+            pool = ProcessPoolExecutor(max_workers=self.extract_workers, mp_context=context)
+            while True:
+                item = self.extract_queue.get()
+                if item is DONE:
+                    break
+                article, download = item
+                started = time.perf_counter()
+                try:
+                    future = self.submit(pool, download)
+                except BrokenProcessPool:
+                    # Workers could not start (e.g. no importable __main__): extract here instead
+                    future = None
+                except (PdfError, OSError, ValueError) as e:
+                    # Unreadable PDF: keep the raw file, skip the text
+                    print(f"  PDF error for {article['id']}: {str(e)}")
+                    download['text'] = None
+                    self.write_queue.put((article, download))
+                    continue
+                in_flight.append((article, download, future, started))
+                self.metrics.gauge('extract_in_flight', len(in_flight))
+                if len(in_flight) >= self.max_in_flight:
+                    self.finish_extraction(*in_flight.popleft())
+            while in_flight:
+                self.finish_extraction(*in_flight.popleft())
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            # Never leave the writer waiting, even if this stage failed
+            self.write_queue.put(DONE)
+
+    def submit(self, pool, download: Dict):
+        """Queue a document's extraction; returns a callable that collects the text
+
+        PDFs are split into page batches so one long paper occupies every worker.
+        """
+        path = str(download['path'])
+        if download['content_type'] != PDF_TYPE:
+            future = pool.submit(extract_file, path, download['encoding'])
+            return future.result
+        with PdfDocument(download['path']) as doc:
+            info, page_count = doc.info(), doc.page_count
+        futures = submit_pages(pool, path, page_count, self.extract_workers)
+        return lambda: render_pdf(info, [text for future in futures for text in future.result()])
+    
+    def extract_inline(self, download: Dict) -> str:
+        path = str(download['path'])
+        if download['content_type'] != PDF_TYPE:
+            return extract_file(path, download['encoding'])
+        with PdfDocument(download['path']) as doc:
+            return render_pdf(doc.info(), page_texts(doc, range(doc.page_count)))
+    
+    def finish_extraction(self, article: Dict, download: Dict, collect, started: float):
+        """Collect a document's text; extract time runs from submission, so it includes pool queueing"""
+        try:
+            try:
+                download['text'] = collect() if collect else None
+            except BrokenProcessPool:
+                collect = None
+            if collect is None:
+                download['text'] = self.extract_inline(download)
+        except Exception as e:
+            print(f"  Extraction error for {article['id']}: {str(e)}")
+            self.scraper.discard_download(download)
+            download = None
+        self.metrics.observe('extract', time.perf_counter() - started, urlparse(article['url']).netloc)
+        self.write_queue.put((article, download))
+        self.metrics.gauge('write_queue', self.write_queue.qsize())
+
+    def write_stage(self):
+        """Persist raw files, text extracts and metadata (single writer, no file races)
+
+        If recording an article fails (index, frontier or checkpoint I/O), later items
+        are still taken off the queue, unwritten, so the stages feeding it never block
+        on a dead consumer; run() re-raises the error once everything has stopped.
+        """
+        while True:
+            item = self.write_queue.get()
+            if item is DONE:
+                return
+            article, download = item
+            if self.write_error is not None:
+                self.scraper.discard_download(download)
+                continue
+            try:
+                try:
+                    with self.metrics.timer('save', urlparse(article['url']).netloc):
+                        self.scraper.save_article(article, download)
+                except Exception as e:
+                    print(f"  Save error for {article['id']}: {str(e)}")
+                    article['error'] = str(e)
+                    self.scraper.save_article(article, None)
+                self.scraper.finish_article(article)
+            except Exception as e:
+                print(f"  Write error for {article['id']}: {str(e)} (stopping writes)")
+                self.write_error = e
+                continue
+            print(f"  {article['id']}: {article['status']}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Per-domain rate limiting for the research scraper
+Token buckets keyed by host so concurrent fetches only wait on their own domain
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: later callers queue up behind earlier reservations
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class DomainRateLimiter:
+    def __init__(self, rate: float = 1.0, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, domain: str) -> TokenBucket:
+        """Get or create the bucket for a domain"""
+        with self.lock:
+            if domain not in self.buckets:
+                self.buckets[domain] = TokenBucket(self.rate, self.burst)
+            return self.buckets[domain]
+
+    def acquire(self, domain: str):
+        """Wait for this domain's next request slot"""
+        self.bucket(domain).acquire()
@@ -4,19 +4,82 @@ Equity Perpetuals Research Scraper
 Fetches and organizes articles about blockchain equity perpetuals
 """
 
+import argparse
 import json
 import os
-import re
+import threading
 import time
 import hashlib
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional
 from urllib.parse import urlparse
-import requests
 from pathlib import Path
 
+# Article fields rendered into the category text file; a change to any of them forces a rewrite
+RENDERED_FIELDS = ('title', 'url', 'category', 'date', 'platform', 'key_topics')
+
+# Per-run bookkeeping that is not persisted in index.json
+TRANSIENT_FIELDS = ('cache', 'error', 'permanent_error')
+
+# Save index.json after this many finished articles (or seconds), so an interrupted crawl keeps its work
+CHECKPOINT_EVERY = 200
+CHECKPOINT_SECONDS = 30.0
+
+# Download chunk size and per-content-type body size caps (bytes)
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = {
+    'text/html': 10 * 1024 * 1024,
+    'application/xhtml+xml': 10 * 1024 * 1024,
+    'text/plain': 5 * 1024 * 1024,
+    'application/pdf': 64 * 1024 * 1024,
+    'default': 5 * 1024 * 1024,
+}
+
+# Bodies fed to the HTML extractor while downloading
+EXTRACTABLE_TYPES = {'text/html', 'application/xhtml+xml', 'text/plain'}
+
+# Bodies extracted page by page after download (pdf_extract.py)
+PDF_TYPES = {'application/pdf'}
+
+
+def new_session(pool_size: int):
+    """requests session whose connection pool lets every worker keep a connection alive"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) Research Bot'
+    })
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 class EquityPerpsResearchScraper:
-    def __init__(self, base_dir: str = ".."):
+    def __init__(self, base_dir: str = "..", max_workers: int = 8,
+                 domain_rate: float = 1.0, domain_burst: int = 1,
+                 use_cache: bool = True, cache_ttl: float = 24 * 3600,
+                 cache_max_bytes: int = 512 * 1024 * 1024,
+                 max_bytes: Optional[Dict[str, int]] = None,
+                 extract_workers: Optional[int] = None,
+                 dedup: bool = True, skip_duplicates: bool = False,
+                 duplicate_threshold: float = 0.7,
+                 max_attempts: int = 5, retry_wait: float = 60.0,
+                 profile: bool = False, trace_memory: bool = False,
+                 pack_raw: bool = False, raw_codec: Optional[str] = None,
+                 session=None):
+        # Imported here rather than at module level, so `cli.py scrape --help` and
+        # the offline tools that only need add_arguments() don't load the whole tree
+        from aggregate import Aggregator
+        from blobstore import BlobStore
+        from build_graph import BuildGraph
+        from dedup import DuplicateDetector
+        from frontier import CrawlFrontier
+        from http_cache import ResponseCache
+        from metrics import RunMetrics
+        from ratelimit import DomainRateLimiter
         self.base_dir = Path(base_dir)
         self.articles_dir = self.base_dir / "articles"
         self.data_dir = self.base_dir / "data"
@@ -27,10 +90,66 @@ class EquityPerpsResearchScraper:
             dir_path.mkdir(parents=True, exist_ok=True)
         
         self.articles_index = []
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) Research Bot'
-        })
+        # Summary statistics, kept current as articles are recorded
+        self.stats = Aggregator(group_by=('category', 'platform'), count_by=('status', 'duplicate_of'),
+                                multi=('key_topics',))
+        self.index_path = self.data_dir / "index.json"
+        self.index_entries = self.load_index()
+        self.dirty_ids = set()
+        
+        # HTTP session, opened on first fetch so offline runs never import requests
+        # (cli.py serve passes in a warm one that outlives the scraper)
+        self.max_workers = max(1, max_workers)
+        self.http_session = session
+        self.session_lock = threading.Lock()
+        self.extract_workers = extract_workers
+        # PDFs are extracted after download, so they are routed to the extraction stage too
+        self.extractable_types = EXTRACTABLE_TYPES | PDF_TYPES
+        
+        # Requests per second allowed against any single host
+        self.rate_limiter = DomainRateLimiter(rate=domain_rate, burst=domain_burst)
+        
+        # Raw bodies, compressed and stored once per distinct content digest
+        self.blobs = BlobStore(self.raw_dir / "store", codec=raw_codec, packed=pack_raw)
+        
+        # Download size caps per content type ('default' covers the rest)
+        self.max_bytes = dict(DEFAULT_MAX_BYTES, **(max_bytes or {}))
+        
+        # Conditional-GET cache so unchanged pages are neither downloaded nor re-extracted
+        self.cache = None
+        if use_cache:
+            self.cache = ResponseCache(self.data_dir / "cache" / "http", ttl=cache_ttl,
+                                       max_bytes=cache_max_bytes)
+        
+        # Persistent per-URL crawl state: retries with backoff and resumable crawls
+        self.frontier = CrawlFrontier(self.data_dir / "frontier.db", max_attempts=max_attempts)
+        self.retry_wait = retry_wait
+        self.completed_ids = []
+        self.checkpoint_time = time.monotonic()
+        
+        # Report input fingerprints, shared with organize.py
+        self.graph = BuildGraph(self.data_dir / "build_state.json")
+        
+        # MinHash signatures of every extract seen so far, for syndicated-copy detection
+        self.dedup = None
+        self.skip_duplicates = skip_duplicates
+        if dedup:
+            self.dedup = DuplicateDetector(self.data_dir / "dedup", threshold=duplicate_threshold)
+        
+        # Stage timings, counters and queue depths for the run report (data/runs/)
+        self.metrics = RunMetrics()
+        self.profile = profile
+        self.trace_memory = trace_memory
+    
+    @property
+    def session(self):
+        return self.http_session or self.open_session()
+    
+    def open_session(self):
+        with self.session_lock:
+            if self.http_session is None:
+                self.http_session = new_session(self.max_workers)
+        return self.http_session
     
     def load_articles_metadata(self) -> List[Dict]:
         """Load article metadata from INDEX.md or predefined list"""
@@ -117,200 +236,650 @@ class EquityPerpsResearchScraper:
                 "key_topics": ["continuous models", "derivatives theory", "foundations"]
             }
         ]
+        # Articles found in sitemaps and feeds (discovery.py never queues a known URL)
+        from discovery import load_discovered
+        known = {article['id'] for article in articles}
+        articles.extend(article for article in load_discovered(self.data_dir) if article['id'] not in known)
         return articles
     
-    def fetch_article(self, article: Dict) -> Optional[str]:
-        """Fetch article content with error handling"""
+    def fetch_article(self, article: Dict, extract: bool = True) -> Optional[Dict]:
+        """Fetch article content with error handling (streamed straight to disk)
+
+        With extract=False the body is only spooled and hashed; text extraction
+        is left to a separate stage (see pipeline.py).
+        """
+        article.pop('error', None)
+        article.pop('permanent_error', None)
+        domain = urlparse(article['url']).netloc
+        started = time.perf_counter()
+        body = None
         try:
-            print(f"Fetching: {article['title'][:50]}...")
+            # Papers already downloaded by hand are ingested in place
+            local_pdf = self.local_pdf(article)
+            if local_pdf:
+                article['cache'] = 'local'
+                return self.local_download(article, local_pdf, extract)
             
-            # Rate limiting
-            time.sleep(1)
+            article['cache'] = 'miss'
+            entry = self.cache.lookup(article['url']) if self.cache else None
+            # Opened now so a concurrent eviction can't pull the body out from under a 304
+            body = self.cache.open_body(entry) if entry else None
+            if body is None:
+                entry = None
+            if entry and self.cache.is_fresh(entry):
+                # Within the TTL: no request at all
+                article['cache'] = 'fresh'
+                return self.download_from_cache(article, entry, body, extract)
             
-            # Special handling for different domains
-            domain = urlparse(article['url']).netloc
+            print(f"Fetching: {article['title'][:50]}...")
             
-            if 'arxiv.org' in domain:
-                # For arXiv, we'd typically fetch the PDF
-                # For now, just fetch the abstract page
-                response = self.session.get(article['url'], timeout=10)
-            else:
-                response = self.session.get(article['url'], timeout=10)
+            # Rate limiting (per host, so other domains are not held up)
+            with self.metrics.timer('rate_wait', domain):
+                self.rate_limiter.acquire(domain)
             
-            if response.status_code == 200:
-                return response.text
-            else:
-                print(f"  Failed with status {response.status_code}")
-                return None
+            # Connection setup (DNS, TCP, TLS) through to the response headers
+            headers = self.cache.conditional_headers(entry) if self.cache else {}
+            with self.metrics.timer('request', domain):
+                if 'arxiv.org' in domain:
+                    # Fetch the full paper rather than the abstract page
+                    pdf_url = article['url'].replace('/abs/', '/pdf/')
+                    response = self.session.get(pdf_url, timeout=30, headers=headers, stream=True)
+                else:
+                    response = self.session.get(article['url'], timeout=10, headers=headers, stream=True)
+            self.metrics.count(f"http.{response.status_code}", domain=domain)
+            
+            with response:
+                if response.status_code == 304 and entry:
+                    # Unchanged since the last run: reuse the stored body
+                    article['cache'] = 'revalidated'
+                    self.cache.revalidated(entry, response.headers)
+                    return self.download_from_cache(article, entry, body, extract)
+                elif response.status_code == 200:
+                    content_type = self.content_type(response.headers.get('Content-Type'))
+                    download = self.stream_body(article, response.iter_content(CHUNK_SIZE),
+                                                content_type, response.encoding, extract,
+                                                declared_size=response.headers.get('Content-Length'))
+                    if download and self.cache:
+                        self.cache.store_file(article['url'], download['path'], response.headers,
+                                              download['digest'], content_type, download['encoding'])
+                    return download
+                else:
+                    print(f"  Failed with status {response.status_code}")
+                    article['error'] = f"HTTP {response.status_code}"
+                    # Missing pages will not come back on a retry
+                    article['permanent_error'] = response.status_code in (404, 410)
+                    return None
                 
         except Exception as e:
             print(f"  Error: {str(e)}")
+            article['error'] = str(e) or type(e).__name__
+            self.metrics.count('http.error', domain=domain)
+            return None
+        finally:
+            if body:
+                body.close()
+            self.metrics.observe('fetch', time.perf_counter() - started, domain)
+    
+    @staticmethod
+    def content_type(header: Optional[str]) -> str:
+        """Media type without parameters, defaulting to HTML"""
+        if not header:
+            return 'text/html'
+        return header.split(';', 1)[0].strip().lower()
+    
+    def max_bytes_for(self, content_type: str) -> int:
+        return self.max_bytes.get(content_type, self.max_bytes['default'])
+    
+    def local_pdf(self, article: Dict) -> Optional[Path]:
+        """A hand-downloaded arXiv PDF in the raw directory (e.g. 2209.03307v1.pdf), latest version first"""
+        parsed = urlparse(article['url'])
+        if 'arxiv.org' not in parsed.netloc:
+            return None
+        paper_id = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+        candidates = sorted(self.raw_dir.glob(f"{paper_id}v*.pdf")) + sorted(self.raw_dir.glob(f"{paper_id}.pdf"))
+        return candidates[-1] if candidates else None
+    
+    def local_download(self, article: Dict, path: Path, extract: bool = True) -> Dict:
+        """Describe a file already on disk as a download (hashed in chunks, never moved or deleted)"""
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        download = {'path': path, 'digest': hasher.hexdigest(), 'text': None,
+                    'content_type': 'application/pdf', 'encoding': None,
+                    'size': path.stat().st_size, 'local': True}
+        previous = self.index_entries.get(article['id'])
+        if self.is_unchanged(article, previous, download['digest']):
+            download['path'] = None
+        elif extract:
+            download['text'] = self.extract_pdf_text(article, path)
+        return download
+    
+    def extract_pdf_text(self, article: Dict, path: Path) -> Optional[str]:
+        """Extract a PDF page by page across the extraction processes"""
+        from pdf_extract import PdfError, extract_pdf, render_pdf
+        try:
+            with self.metrics.timer('extract', urlparse(article['url']).netloc):
+                info, pages = extract_pdf(path, workers=self.extract_workers)
+        except (PdfError, OSError, ValueError) as e:
+            print(f"  PDF error for {article['id']}: {str(e)}")
+            return None
+        return render_pdf(info, pages)
+    
+    def discard_download(self, download: Dict):
+        """Delete a spooled body that will not be saved (local source files are left alone)"""
+        if download and download['path'] and not download.get('local'):
+            download['path'].unlink(missing_ok=True)
+    
+    def download_from_cache(self, article: Dict, entry: Dict, body, extract: bool = True) -> Optional[Dict]:
+        """Turn a cached body (already open) into a download, skipping the read when nothing changed"""
+        previous = self.index_entries.get(article['id'])
+        if self.is_unchanged(article, previous, entry.get('digest')):
+            return {'path': None, 'digest': entry['digest'], 'text': None,
+                    'content_type': entry.get('content_type', 'text/html'), 'size': entry['size']}
+        return self.stream_body(article, iter(lambda: body.read(CHUNK_SIZE), b''),
+                                entry.get('content_type', 'text/html'), entry.get('encoding'), extract)
+    
+    def stream_body(self, article: Dict, chunks, content_type: str, encoding: Optional[str],
+                    extract: bool = True, declared_size: Optional[str] = None) -> Optional[Dict]:
+        """Spool a body to the raw directory while hashing and extracting it in the same pass"""
+        limit = self.max_bytes_for(content_type)
+        if declared_size and declared_size.isdigit() and int(declared_size) > limit:
+            print(f"  Skipped: {content_type} body of {declared_size} bytes exceeds {limit}")
+            article['error'] = f"{content_type} body over {limit} bytes"
+            article['permanent_error'] = True
             return None
+        
+        encoding = encoding or 'utf-8'
+        extractor = None
+        if extract and content_type in EXTRACTABLE_TYPES:
+            from extractor import StreamingExtractor
+            extractor = StreamingExtractor(encoding=encoding)
+        hasher = hashlib.sha256()
+        spool_path = self.raw_dir / f"{article['id']}.part"
+        size = 0
+        started = time.perf_counter()
+        extract_time = 0.0
+        try:
+            with open(spool_path, 'wb') as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > limit:
+                        print(f"  Aborted: {content_type} body exceeds {limit} bytes")
+                        raise OverflowError(content_type)
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    if extractor:
+                        fed = time.perf_counter()
+                        extractor.feed(chunk)
+                        extract_time += time.perf_counter() - fed
+        except BaseException:
+            spool_path.unlink(missing_ok=True)
+            if size > limit:
+                article['error'] = f"{content_type} body over {limit} bytes"
+                article['permanent_error'] = True
+                return None
+            raise
+        
+        # Body time excludes the extraction interleaved with it
+        domain = urlparse(article['url']).netloc
+        self.metrics.observe('download', time.perf_counter() - started - extract_time, domain)
+        self.metrics.count('bytes.network' if article.get('cache') == 'miss' else 'bytes.cache', size, domain)
+        
+        text = None
+        if extractor:
+            fed = time.perf_counter()
+            extractor.close()
+            text = extractor.render()
+            self.metrics.observe('extract', extract_time + time.perf_counter() - fed, domain)
+        elif extract and content_type in PDF_TYPES:
+            text = self.extract_pdf_text(article, spool_path)
+        return {'path': spool_path, 'digest': hasher.hexdigest(), 'text': text,
+                'content_type': content_type, 'encoding': encoding, 'size': size}
     
     def extract_text_content(self, html: str, url: str) -> str:
-        """Extract readable text from HTML (basic extraction)"""
-        # Remove script and style elements
-        html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL)
-        html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL)
-        
-        # Extract title
-        title_match = re.search(r'<title[^>]*>(.*?)</title>', html, re.IGNORECASE)
-        title = title_match.group(1) if title_match else ""
-        
-        # Extract meta description
-        desc_match = re.search(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', html, re.IGNORECASE)
-        description = desc_match.group(1) if desc_match else ""
-        
-        # Extract article body (common patterns)
-        body = ""
-        for pattern in [
-            r'<article[^>]*>(.*?)</article>',
-            r'<main[^>]*>(.*?)</main>',
-            r'<div[^>]*class=["\'][^"\']*content[^"\']*["\'][^>]*>(.*?)</div>',
-        ]:
-            match = re.search(pattern, html, re.DOTALL | re.IGNORECASE)
-            if match:
-                body = match.group(1)
-                break
-        
-        # Clean HTML tags
-        text = re.sub(r'<[^>]+>', ' ', body if body else html)
-        text = re.sub(r'\s+', ' ', text)
-        
-        return f"Title: {title}\n\nDescription: {description}\n\nContent Extract:\n{text[:5000]}"
-    
-    def save_article(self, article: Dict, content: Optional[str]):
+        """Extract readable text from HTML (single streaming pass)"""
+        from extractor import extract_text
+        with self.metrics.timer('extract', urlparse(url).netloc):
+            return extract_text(html)
+    
+    def save_article(self, article: Dict, download: Optional[Dict]):
         """Save article content and metadata"""
-        if not content:
+        if not download:
             article['status'] = 'failed'
             article['fetched_at'] = None
             return
         
+        # Same body and metadata as the indexed copy: skip extraction and writes
+        previous = self.index_entries.get(article['id'])
+        if self.is_unchanged(article, previous, download['digest']):
+            self.discard_download(download)
+            for key in ('status', 'fetched_at', 'local_path', 'raw_path', 'raw_blob', 'content_type',
+                        'content_digest'):
+                article[key] = previous.get(key)
+            if 'duplicate_of' in previous:
+                article['duplicate_of'] = previous['duplicate_of']
+            return
+        
+        # Syndicated copy of an earlier article: link it to the canonical one
+        duplicate = None
+        if self.dedup and download['text'] is not None:
+            duplicate = self.dedup.check(article['id'], download['text'])
+        if duplicate:
+            article['duplicate_of'] = duplicate[0]
+            print(f"  {article['id']} duplicates {duplicate[0]} (similarity {duplicate[1]:.2f})")
+            if self.skip_duplicates:
+                self.discard_download(download)
+                article['status'] = 'duplicate'
+                article['fetched_at'] = datetime.now().isoformat()
+                article['local_path'] = None
+                article['raw_path'] = None
+                article['raw_blob'] = None
+                article['content_type'] = download['content_type']
+                article['content_digest'] = download['digest']
+                return
+        
         # Generate filename
         file_hash = hashlib.md5(article['url'].encode()).hexdigest()[:8]
         filename = f"{article['id']}_{file_hash}.txt"
         
-        # Save raw HTML
-        raw_path = self.raw_dir / f"{article['id']}.html"
-        with open(raw_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Save raw body into the blob store under its digest (already spooled while downloading;
+        # local files stay where they are). Identical bodies are only stored once.
+        raw_path = raw_blob = None
+        if download.get('local'):
+            raw_path = download['path']
+        else:
+            raw_blob = self.blobs.put_file(download['path'], download['digest'])
         
-        # Extract and save text
-        text_content = self.extract_text_content(content, article['url'])
-        category_dir = self.articles_dir / article['category']
-        category_dir.mkdir(exist_ok=True)
+        # Save extracted text
+        text_path = None
+        if download['text'] is not None:
+            category_dir = self.articles_dir / article['category']
+            category_dir.mkdir(exist_ok=True)
+            text_path = category_dir / filename
+            self.write_text_file(article, text_path, download['text'])
         
-        text_path = category_dir / filename
+        # Update metadata
+        article['status'] = 'success'
+        article['fetched_at'] = datetime.now().isoformat()
+        article['local_path'] = str(text_path.relative_to(self.base_dir)) if text_path else None
+        article['raw_path'] = str(raw_path.relative_to(self.base_dir)) if raw_path else None
+        article['raw_blob'] = raw_blob
+        article['content_type'] = download['content_type']
+        article['content_digest'] = download['digest']
+    
+    def write_text_file(self, article: Dict, text_path: Path, text_content: str):
+        """Write the category text file: metadata header followed by the extract"""
         with open(text_path, 'w', encoding='utf-8') as f:
             f.write(f"# {article['title']}\n\n")
             f.write(f"URL: {article['url']}\n")
-            f.write(f"Date: {article['date']}\n")
+            f.write(f"Date: {article['date'] or '-'}\n")
             f.write(f"Platform: {article['platform']}\n")
             f.write(f"Topics: {', '.join(article['key_topics'])}\n\n")
             f.write("---\n\n")
             f.write(text_content)
+    
+    def is_unchanged(self, article: Dict, previous: Optional[Dict], digest: Optional[str]) -> bool:
+        """Check whether a previous successful save already covers this content"""
+        if not previous or previous.get('status') not in ('success', 'duplicate'):
+            return False
+        if not digest or previous.get('content_digest') != digest:
+            return False
+        if any(previous.get(field) != article.get(field) for field in RENDERED_FIELDS):
+            return False
+        if previous.get('raw_blob') and not self.blobs.exists(previous['raw_blob']):
+            return False
+        paths = [previous.get('raw_path'), previous.get('local_path')]
+        return all((self.base_dir / path).exists() for path in paths if path)
+    
+    def interleave_by_domain(self, articles: List[Dict]) -> List[Dict]:
+        """Order articles round-robin across domains so workers rarely wait on the same host"""
+        by_domain = OrderedDict()
+        for article in articles:
+            by_domain.setdefault(urlparse(article['url']).netloc, []).append(article)
         
-        # Update metadata
-        article['status'] = 'success'
-        article['fetched_at'] = datetime.now().isoformat()
-        article['local_path'] = str(text_path.relative_to(self.base_dir))
-        article['raw_path'] = str(raw_path.relative_to(self.base_dir))
+        ordered = []
+        queues = [iter(group) for group in by_domain.values()]
+        while queues:
+            remaining = []
+            for queue in queues:
+                article = next(queue, None)
+                if article is not None:
+                    ordered.append(article)
+                    remaining.append(queue)
+            queues = remaining
+        return ordered
+    
+    def process_article(self, article: Dict) -> Dict:
+        """Fetch and save a single article"""
+        download = self.fetch_article(article)
+        with self.metrics.timer('save', urlparse(article['url']).netloc):
+            self.save_article(article, download)
+        self.finish_article(article)
+        print(f"  {article['id']}: {article['status']}")
+        return article
+    
+    def finish_article(self, article: Dict):
+        """Record a saved article: index entry, statistics, frontier state and periodic checkpoint"""
+        self.update_index_entry(article)
+        self.stats.add(article)
+        domain = urlparse(article['url']).netloc
+        self.metrics.count('articles')
+        self.metrics.count(f"status.{article['status']}", domain=domain)
+        if article.get('cache'):
+            self.metrics.count(f"cache.{article['cache']}", domain=domain)
+        if article['status'] == 'failed':
+            error = article.get('error') or 'failed'
+            state = self.frontier.fail(article['id'], error, permanent=article.get('permanent_error', False))
+            if state == 'retry':
+                print(f"  {article['id']}: will retry ({error})")
+        else:
+            # Marked done in the frontier only once its index entry is on disk
+            self.completed_ids.append(article['id'])
+        
+        if (len(self.completed_ids) >= CHECKPOINT_EVERY
+                or time.monotonic() - self.checkpoint_time >= CHECKPOINT_SECONDS):
+            self.checkpoint(quiet=True)
+    
+    def checkpoint(self, quiet: bool = False):
+        """Persist progress so far (index entries, cache and dedup state, then the frontier)"""
+        self.save_index(quiet=quiet)
+        if self.cache:
+            self.cache.save_index()
+        if self.dedup:
+            self.dedup.save()
+        self.frontier.complete_many(self.completed_ids)
+        self.completed_ids = []
+        self.checkpoint_time = time.monotonic()
     
-    def scrape_all(self):
-        """Main scraping function"""
+    def crawl(self, articles: List[Dict], concurrent: bool = True):
+        """Process every URL the frontier hands out, waiting for retries due within retry_wait"""
+        by_id = {article['id']: article for article in articles}
+        while True:
+            ready = [by_id[article_id] for article_id in self.frontier.claim() if article_id in by_id]
+            if not ready:
+                wait = self.frontier.next_due()
+                if wait is None or wait > self.retry_wait:
+                    return
+                time.sleep(wait)
+                continue
+            # Fail the run here, not every article, when requests is not installed
+            self.open_session()
+            
+            if concurrent and self.max_workers > 1:
+                # Fetch, extract and write in separate stages; the per-domain buckets
+                # keep each host at its own pace
+                from pipeline import ScrapePipeline
+                print(f"Using {self.max_workers} fetch workers, "
+                      f"{self.extract_workers or os.cpu_count()} extract processes for {len(ready)} articles\n")
+                ScrapePipeline(self, fetch_workers=self.max_workers,
+                               extract_workers=self.extract_workers).run(self.interleave_by_domain(ready))
+            else:
+                # Process each article
+                for i, article in enumerate(ready, 1):
+                    print(f"[{i}/{len(ready)}] Processing {article['id']}")
+                    self.process_article(article)
+    
+    def scrape_all(self, concurrent: bool = True, report_path: Optional[Path] = None):
+        """Main scraping function (ends by writing the JSON run report)"""
+        from metrics import profiling
         print("Starting Equity Perps Research Scraper")
         print("=" * 50)
         
         # Load articles
         articles = self.load_articles_metadata()
-        print(f"Found {len(articles)} articles to process\n")
+        crawl = self.frontier.sync(articles)
+        if crawl['resumed']:
+            print(f"Resuming interrupted crawl {crawl['generation']} "
+                  f"({self.frontier.counts().get('pending', 0)} articles left)\n")
+        else:
+            print(f"Found {len(articles)} articles to process\n")
         
-        # Process each article
-        for i, article in enumerate(articles, 1):
-            print(f"[{i}/{len(articles)}] Processing {article['id']}")
-            
-            # Fetch content
-            content = self.fetch_article(article)
+        with profiling(self.metrics, self.data_dir / "runs", cpu=self.profile, memory=self.trace_memory):
+            try:
+                self.crawl(articles, concurrent)
+            finally:
+                # Keep whatever finished, even on Ctrl-C or a crash
+                self.checkpoint()
             
-            # Save article
-            self.save_article(article, content)
-            
-            # Add to index
-            self.articles_index.append(article)
-            
-            print(f"  Status: {article['status']}\n")
+            # Articles not processed in this run (done before a resume, or waiting out a backoff)
+            # are summarized from their last recorded state
+            for article in articles:
+                if 'status' not in article:
+                    article.update(self.index_entries.get(article['id'], {'status': 'pending', 'fetched_at': None}))
+                    self.stats.add(article)
+            self.articles_index.extend(articles)
+            self.update_outputs()
+        
+        print("=" * 50)
+        print("Scraping complete!")
+        print(f"Success: {self.stats.count('status', 'success')}")
+        print(f"Failed: {self.stats.count('status', 'failed')}")
+        print(f"Near-duplicates: {self.stats.total - self.stats.count('duplicate_of', None)}")
+        waiting = self.frontier.counts().get('retry', 0)
+        if waiting:
+            print(f"Retrying later: {waiting} (see frontier.py)")
+        
+        self.metrics.extra['frontier'] = self.frontier.counts()
+        report_path = report_path or self.data_dir / "runs" / f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        print(f"Run report: {self.metrics.write_report(report_path)}")
+    
+    def update_outputs(self):
+        """Bring everything derived from the saved articles up to date (after a crawl or an ingest)"""
+        # Refresh the full-text search index
+        with self.metrics.timer('search_index'):
+            self.update_search_index()
+        
+        # Repack the extracted texts for bulk analytics (skipped when nothing changed)
+        with self.metrics.timer('corpus'):
+            self.update_corpus()
         
-        # Save index
-        self.save_index()
+        # Extract market facts from new and changed articles for the organizer's reports
+        with self.metrics.timer('facts'):
+            self.update_facts()
         
         # Generate summary
-        self.generate_summary()
+        with self.metrics.timer('summary'):
+            self.generate_summary()
         
-        print("=" * 50)
-        print("Scraping complete!")
-        print(f"Success: {sum(1 for a in self.articles_index if a['status'] == 'success')}")
-        print(f"Failed: {sum(1 for a in self.articles_index if a['status'] == 'failed')}")
+        # Let a segment merge started by the index update finish before exiting
+        with self.metrics.timer('search_merge'):
+            self.search_writer.close()
+    
+    def load_index(self) -> Dict[str, Dict]:
+        """Load the previous run's index keyed by article id"""
+        if not self.index_path.exists():
+            return OrderedDict()
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return OrderedDict((entry['id'], entry) for entry in json.load(f))
+    
+    def update_index_entry(self, article: Dict):
+        """Record an article in the index, marking it dirty only if it changed"""
+        entry = {key: value for key, value in article.items() if key not in TRANSIENT_FIELDS}
+        if self.index_entries.get(article['id']) != entry:
+            self.index_entries[article['id']] = entry
+            self.dirty_ids.add(article['id'])
+    
+    def remove_article(self, article_id: str):
+        """Drop an article whose source is gone: index entry, text file and dedup signature"""
+        entry = self.index_entries.pop(article_id, None)
+        if entry is None:
+            return
+        self.dirty_ids.add(article_id)
+        if entry.get('local_path'):
+            (self.base_dir / entry['local_path']).unlink(missing_ok=True)
+        if self.dedup:
+            self.dedup.remove(article_id)
+    
+    def update_search_index(self):
+        """Index new and changed articles (unchanged ones are skipped by fingerprint)
+
+        A segment merge the update triggers runs in the background while the corpus,
+        facts and summary are refreshed; update_outputs() waits for it at the end.
+        """
+        from search_index import IndexWriter, sync_index
+        self.search_writer = IndexWriter(self.data_dir / "search")
+        stats = sync_index(self.base_dir, background_merge=True, writer=self.search_writer)
+        print(f"Search index: {stats['added']} indexed, {stats['deleted']} removed, "
+              f"{stats['doc_count']} documents")
+    
+    def update_corpus(self):
+        from corpus import pack_corpus
+        stats = pack_corpus(self.base_dir, self.data_dir / "corpus")
+        if stats['packed']:
+            print(f"Corpus packed: {stats['documents']} documents in {stats['segments']} segment(s)")
+    
+    def update_facts(self):
+        from facts import sync_facts
+        stats = sync_facts(self.base_dir)
+        if stats['extracted'] or stats['removed']:
+            print(f"Facts: {stats['extracted']} sources extracted, {stats['facts']} facts")
     
-    def save_index(self):
-        """Save the articles index as JSON"""
-        index_path = self.data_dir / "index.json"
-        with open(index_path, 'w', encoding='utf-8') as f:
-            json.dump(self.articles_index, f, indent=2)
-        print(f"Index saved to {index_path}")
+    def save_index(self, quiet: bool = False):
+        """Save the articles index as JSON (only when entries were touched)"""
+        if not self.dirty_ids and self.index_path.exists():
+            if not quiet:
+                print(f"Index unchanged: {self.index_path}")
+            return
+        
+        # Untouched entries keep their previous position and content
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with self.metrics.timer('save_index'):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self.index_entries.values()), f, indent=2)
+            os.replace(tmp_path, self.index_path)
+        if not quiet:
+            print(f"Index saved to {self.index_path} ({len(self.dirty_ids)} entries updated)")
+        self.dirty_ids.clear()
     
     def generate_summary(self):
-        """Generate a summary document"""
+        """Generate a summary document (skipped when no summarized field changed)"""
         summary_path = self.base_dir / "docs" / "SUMMARY.md"
+        platforms = self.stats.group('platform')
+        inputs = {
+            'total': self.stats.total,
+            'success': self.stats.count('status', 'success'),
+            'categories': list(self.stats.groups['category']),
+            'platforms': {platform: [[a['title'], a.get('status')] for a in arts]
+                          for platform, arts in platforms.items()},
+            'topics': self.stats.top('key_topics', 10),
+        }
+        written = self.graph.build(summary_path, inputs, lambda: self.render_summary(inputs))
+        self.graph.save()
         
+        if written is None:
+            print(f"Summary up to date: {summary_path}")
+        elif written:
+            print(f"Summary saved to {summary_path}")
+        else:
+            print(f"Summary unchanged: {summary_path}")
+    
+    def render_summary(self, stats: Dict) -> str:
+        """Render SUMMARY.md from the aggregated statistics"""
         content = ["# Equity Perpetuals Research Summary\n"]
         content.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
         
         # Statistics
         content.append("## Statistics\n")
-        content.append(f"- Total Articles: {len(self.articles_index)}\n")
-        content.append(f"- Successfully Fetched: {sum(1 for a in self.articles_index if a.get('status') == 'success')}\n")
-        
-        # By category
-        categories = {}
-        for article in self.articles_index:
-            cat = article['category']
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(article)
-        
-        content.append(f"- Categories: {', '.join(categories.keys())}\n\n")
+        content.append(f"- Total Articles: {stats['total']}\n")
+        content.append(f"- Successfully Fetched: {stats['success']}\n")
+        content.append(f"- Categories: {', '.join(stats['categories'])}\n\n")
         
         # By platform
-        platforms = {}
-        for article in self.articles_index:
-            plat = article['platform']
-            if plat not in platforms:
-                platforms[plat] = []
-            platforms[plat].append(article)
-        
         content.append("## Articles by Platform\n")
-        for platform, arts in sorted(platforms.items()):
+        for platform, arts in sorted(stats['platforms'].items()):
             content.append(f"\n### {platform} ({len(arts)} articles)\n")
-            for art in arts:
-                status = "✓" if art.get('status') == 'success' else "✗"
-                content.append(f"- [{status}] {art['title']}\n")
+            for title, status in arts:
+                marker = "✓" if status == 'success' else "✗"
+                content.append(f"- [{marker}] {title}\n")
         
         # Key topics frequency
-        topic_count = {}
-        for article in self.articles_index:
-            for topic in article['key_topics']:
-                topic_count[topic] = topic_count.get(topic, 0) + 1
-        
         content.append("\n## Top Topics\n")
-        for topic, count in sorted(topic_count.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for topic, count in stats['topics']:
             content.append(f"- {topic}: {count} articles\n")
         
-        # Write summary
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            f.writelines(content)
-        
-        print(f"Summary saved to {summary_path}")
+        return ''.join(content)
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Scrape options, shared with the `scrape` command of cli.py"""
+    parser.add_argument("--workers", type=int, default=8, help="concurrent fetch workers (1 = sequential)")
+    parser.add_argument("--extract-workers", type=int, default=None,
+                        help="text extraction processes (default: one per CPU)")
+    parser.add_argument("--domain-rate", type=float, default=1.0, help="requests per second per domain")
+    parser.add_argument("--domain-burst", type=int, default=1, help="burst size per domain")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the HTTP response cache")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600, help="seconds before cached pages are revalidated")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="HTTP cache size limit in MB")
+    parser.add_argument("--max-bytes", action="append", default=[], metavar="TYPE=BYTES",
+                        help="download size cap for a content type, e.g. application/pdf=104857600")
+    parser.add_argument("--max-attempts", type=int, default=5,
+                        help="fetch attempts per URL and crawl before giving up until the next crawl")
+    parser.add_argument("--retry-wait", type=float, default=60.0,
+                        help="wait up to this many seconds for scheduled retries before finishing")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile the run with cProfile (stats saved under data/runs/)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="trace allocations with tracemalloc and report the top sites")
+    parser.add_argument("--report", default=None, help="run report path (default: data/runs/run-<time>.json)")
+    parser.add_argument("--pack-raw", action="store_true",
+                        help="append raw bodies to pack files instead of one compressed file per body")
+    parser.add_argument("--raw-codec", choices=["gzip", "zstd"], default=None,
+                        help="raw body compression (zstd needs the zstandard module; default gzip)")
+    parser.add_argument("--discover", action="store_true",
+                        help="queue new articles from the sitemaps and feeds in --sources first")
+    parser.add_argument("--sources", default=None,
+                        help="discovery sources file (sitemaps, feeds, keywords; default: data/discovery_sources.json)")
+    parser.add_argument("--since", default=None, help="discover only entries dated on or after YYYY-MM-DD")
+    parser.add_argument("--local-docs", action="append", default=[], metavar="DIR",
+                        help="also ingest a local Markdown documentation tree (repeatable)")
+    parser.add_argument("--no-dedup", action="store_true", help="disable near-duplicate detection")
+    parser.add_argument("--skip-duplicates", action="store_true",
+                        help="do not write files for near-duplicates of earlier articles")
+    parser.add_argument("--duplicate-threshold", type=float, default=0.7,
+                        help="estimated Jaccard similarity at which articles count as duplicates")
+
+
+def run(args: argparse.Namespace, base_dir: str = "..", session=None):
+    from discovery import discover
+    from local_docs import ingest
+    max_bytes = {}
+    for spec in args.max_bytes:
+        content_type, _, limit = spec.partition('=')
+        max_bytes[content_type.strip().lower()] = int(limit)
+    
+    scraper = EquityPerpsResearchScraper(base_dir=base_dir,
+                                         max_workers=args.workers,
+                                         extract_workers=args.extract_workers,
+                                         domain_rate=args.domain_rate,
+                                         domain_burst=args.domain_burst,
+                                         use_cache=not args.no_cache,
+                                         cache_ttl=args.cache_ttl,
+                                         cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                                         max_bytes=max_bytes,
+                                         dedup=not args.no_dedup,
+                                         skip_duplicates=args.skip_duplicates,
+                                         duplicate_threshold=args.duplicate_threshold,
+                                         max_attempts=args.max_attempts,
+                                         retry_wait=args.retry_wait,
+                                         profile=args.profile,
+                                         trace_memory=args.trace_memory,
+                                         pack_raw=args.pack_raw,
+                                         raw_codec=args.raw_codec,
+                                         session=session)
+    if args.discover:
+        discover(scraper, Path(args.sources) if args.sources else None, args.since)
+    for root in args.local_docs:
+        stats = ingest(scraper, Path(root))
+        print(f"Local docs {stats['name']}: {stats['changed']} of {stats['pages']} pages ingested")
+    scraper.scrape_all(report_path=args.report)
+    return scraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch equity perps research articles")
+    add_arguments(parser)
+    run(parser.parse_args())
+
 
 if __name__ == "__main__":
-    scraper = EquityPerpsResearchScraper()
-    scraper.scrape_all()
\ No newline at end of file
+    main()
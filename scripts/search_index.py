@@ -0,0 +1,903 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the research corpus
+On-disk inverted index with positional postings, BM25 ranking and metadata filters
+"""
+
+import argparse
+import fcntl
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from metadata_store import load_store
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.][0-9]+)?")
+URL_RE = re.compile(r"^\*{0,2}URL\*{0,2}:\*{0,2}\s*(\S+)", re.MULTILINE)
+
+# Filterable metadata fields, stored as prefixed terms ("platform:hyperliquid")
+FILTER_FIELDS = ('platform', 'category', 'topic')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Fixed-width records: lexicon entry and per-document entry
+LEXICON_RECORD = struct.Struct('<IHIQI')   # term offset, term length, df, postings offset, postings length
+DOC_RECORD = struct.Struct('<IIQI')        # token count, date (YYYYMMDD), stored offset, stored length
+
+
+def normalize_token(token: str) -> str:
+    """Light plural folding so 'rates' matches 'rate'"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize_token(token) for token in TOKEN_RE.findall(text.lower())]
+
+
+def date_key(value: Optional[str]) -> int:
+    """Turn '2025', '2025-06' or '2025-06-15' into a sortable YYYYMMDD integer (missing parts = 01)"""
+    if not value:
+        return 0
+    parts = [int(p) for p in re.findall(r"\d+", value)[:3]]
+    if not parts:
+        return 0
+    year, month, day = (parts + [1, 1])[:3]
+    return year * 10000 + month * 100 + day
+
+
+def encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def filter_terms(doc: Dict) -> List[str]:
+    """Prefixed filter terms for a document's metadata"""
+    terms = []
+    if doc.get('platform'):
+        terms.append(f"platform:{doc['platform'].lower()}")
+    if doc.get('category'):
+        terms.append(f"category:{doc['category'].lower()}")
+    for topic in doc.get('topics') or []:
+        terms.append(f"topic:{topic.lower()}")
+    return terms
+
+
+def write_segment(docs: Iterable[Dict], seg_dir: Path) -> Dict:
+    """Write one immutable segment from documents carrying 'text' and stored fields"""
+    tmp_dir = seg_dir.with_name(seg_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    postings: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+    total_length = 0
+    doc_count = 0
+    with open(tmp_dir / "docs.jsonl", 'wb') as stored, open(tmp_dir / "docs.bin", 'wb') as records:
+        for local_id, doc in enumerate(docs):
+            tokens = tokenize(doc.pop('text', ''))
+            for position, token in enumerate(tokens):
+                postings[token].setdefault(local_id, []).append(position)
+            for term in filter_terms(doc):
+                postings[term].setdefault(local_id, []).append(0)
+
+            line = (json.dumps(doc, ensure_ascii=False) + "\n").encode('utf-8')
+            records.write(DOC_RECORD.pack(len(tokens), date_key(doc.get('date')), stored.tell(), len(line)))
+            stored.write(line)
+            total_length += len(tokens)
+            doc_count += 1
+
+    # Lexicon sorted by term bytes so lookups can binary-search the mmap
+    with open(tmp_dir / "terms.dat", 'wb') as terms_file, \
+            open(tmp_dir / "lexicon.bin", 'wb') as lexicon, \
+            open(tmp_dir / "postings.bin", 'wb') as postings_file:
+        for term in sorted(postings, key=lambda t: t.encode('utf-8')):
+            term_bytes = term.encode('utf-8')
+            block = bytearray()
+            previous = 0
+            for local_id, positions in sorted(postings[term].items()):
+                encode_varint(local_id - previous, block)
+                encode_varint(len(positions), block)
+                last = 0
+                for position in positions:
+                    encode_varint(position - last, block)
+                    last = position
+                previous = local_id
+            lexicon.write(LEXICON_RECORD.pack(terms_file.tell(), len(term_bytes), len(postings[term]),
+                                              postings_file.tell(), len(block)))
+            terms_file.write(term_bytes)
+            postings_file.write(block)
+
+    meta = {'doc_count': doc_count, 'total_length': total_length, 'term_count': len(postings)}
+    with open(tmp_dir / "meta.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    if seg_dir.exists():
+        shutil.rmtree(seg_dir)
+    tmp_dir.rename(seg_dir)
+    return meta
+
+
+class Segment:
+    """Read-only view of a segment; files are memory-mapped, nothing is loaded up front"""
+
+    def __init__(self, seg_dir: Path):
+        self.seg_dir = seg_dir
+        with open(seg_dir / "meta.json", 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.doc_count = self.meta['doc_count']
+        self.total_length = self.meta['total_length']
+        self.files = []
+        self.terms = self.map("terms.dat")
+        self.lexicon = self.map("lexicon.bin")
+        self.postings = self.map("postings.bin")
+        self.records = self.map("docs.bin")
+        self.stored = open(seg_dir / "docs.jsonl", 'rb')
+        self.term_count = len(self.lexicon) // LEXICON_RECORD.size
+        self.deleted: Set[int] = set()
+
+    @property
+    def live_count(self) -> int:
+        return self.doc_count - len(self.deleted)
+
+    @property
+    def live_length(self) -> int:
+        return self.total_length - sum(self.doc_length(local_id) for local_id in self.deleted)
+
+    def iter_terms(self) -> Iterator[bytes]:
+        """Terms in lexicon (byte) order"""
+        for index in range(self.term_count):
+            term_off, term_len = LEXICON_RECORD.unpack_from(self.lexicon, index * LEXICON_RECORD.size)[:2]
+            yield bytes(self.terms[term_off:term_off + term_len])
+
+    def map(self, name: str):
+        path = self.seg_dir / name
+        if path.stat().st_size == 0:
+            return b''
+        f = open(path, 'rb')
+        self.files.append(f)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        for mapped in (self.terms, self.lexicon, self.postings, self.records):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        for f in self.files:
+            f.close()
+        self.stored.close()
+
+    def lookup(self, term: str) -> Optional[Tuple[int, int, int]]:
+        """Binary-search the lexicon; returns (df, postings offset, postings length)"""
+        target = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            mid = (low + high) // 2
+            term_off, term_len, df, post_off, post_len = LEXICON_RECORD.unpack_from(
+                self.lexicon, mid * LEXICON_RECORD.size)
+            candidate = self.terms[term_off:term_off + term_len]
+            if candidate < target:
+                low = mid + 1
+            elif candidate > target:
+                high = mid
+            else:
+                return df, post_off, post_len
+        return None
+
+    def document_frequency(self, term: str) -> int:
+        entry = self.lookup(term)
+        return entry[0] if entry else 0
+
+    def postings_for(self, term: str, with_positions: bool = True) -> Dict[int, List[int]]:
+        """Decode a term's postings into {local doc id: positions}"""
+        entry = self.lookup(term)
+        if not entry:
+            return {}
+        _, offset, length = entry
+        data = self.postings
+        pos, end = offset, offset + length
+        result = {}
+        local_id = 0
+        while pos < end:
+            delta, pos = decode_varint(data, pos)
+            local_id += delta
+            tf, pos = decode_varint(data, pos)
+            positions = []
+            last = 0
+            for _ in range(tf):
+                gap, pos = decode_varint(data, pos)
+                last += gap
+                positions.append(last)
+            result[local_id] = positions if with_positions else [0] * tf
+        return result
+
+    def doc_length(self, local_id: int) -> int:
+        return DOC_RECORD.unpack_from(self.records, local_id * DOC_RECORD.size)[0]
+
+    def doc_date(self, local_id: int) -> int:
+        return DOC_RECORD.unpack_from(self.records, local_id * DOC_RECORD.size)[1]
+
+    def stored_fields(self, local_id: int) -> Dict:
+        _, _, offset, length = DOC_RECORD.unpack_from(self.records, local_id * DOC_RECORD.size)
+        self.stored.seek(offset)
+        return json.loads(self.stored.read(length))
+
+
+def parse_query(query: str) -> Dict:
+    """Split a query into free terms, phrases, field filters and date bounds
+
+    Example: "funding rate" platform:Hyperliquid after:2025-06
+    after: is inclusive, before: is exclusive (before:2025 means up to 2024-12-31).
+    """
+    parsed = {'terms': [], 'phrases': [], 'filters': [], 'after': 0, 'before': 0}
+    for match in re.finditer(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)', query):
+        field = match.group(1) or match.group(3)
+        value = match.group(2) if match.group(1) else match.group(4)
+        if field:
+            field = field.lower()
+            if field in ('after', 'since'):
+                parsed['after'] = date_key(value)
+                continue
+            if field in ('before', 'until'):
+                parsed['before'] = date_key(value)
+                continue
+            if field == 'topics':
+                field = 'topic'
+            if field in FILTER_FIELDS:
+                parsed['filters'].append(f"{field}:{value.lower()}")
+                continue
+            # Unknown field: treat the whole thing as text
+            parsed['terms'].extend(tokenize(f"{field} {value}"))
+        elif match.group(5) is not None:
+            tokens = tokenize(match.group(5))
+            if len(tokens) > 1:
+                parsed['phrases'].append(tokens)
+            else:
+                parsed['terms'].extend(tokens)
+        else:
+            parsed['terms'].extend(tokenize(match.group(6)))
+    return parsed
+
+
+def phrase_positions(postings: List[Dict[int, List[int]]], local_id: int) -> int:
+    """Count occurrences of consecutive positions across the phrase's terms"""
+    starts = set(postings[0][local_id])
+    for offset, term_postings in enumerate(postings[1:], 1):
+        starts &= {position - offset for position in term_postings[local_id]}
+        if not starts:
+            return 0
+    return len(starts)
+
+
+@contextmanager
+def index_lock(index_dir: Path, shared: bool = False):
+    """flock on the index's write.lock: exclusive for writers, shared for readers opening segments
+
+    Writers only publish a manifest or delete segment files while holding it exclusively,
+    so a reader holding it shared can open every listed segment.
+    """
+    try:
+        lock_file = open(Path(index_dir) / "write.lock", 'a')
+    except OSError:
+        # Read-only or missing index directory: nothing can be writing to it
+        yield
+        return
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SearchIndex:
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.segments: List[Segment] = []
+        self.version = None
+        self.reload()
+
+    def manifest_version(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = (self.index_dir / "manifest.json").stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def reload(self):
+        """Open the segments listed in the manifest, with their tombstones"""
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+        manifest_path = self.index_dir / "manifest.json"
+        # Held until every segment is open: a merge can't delete one in between
+        with index_lock(self.index_dir, shared=True):
+            self.version = self.manifest_version()
+            if not manifest_path.exists():
+                return
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            for entry in manifest['segments']:
+                entry = normalize_segment_entry(entry)
+                segment = Segment(self.index_dir / entry['name'])
+                segment.deleted = set(entry['deleted'])
+                self.segments.append(segment)
+
+    def refresh(self) -> bool:
+        """Reload if the index was updated since it was opened (for long-lived readers)"""
+        if self.manifest_version() == self.version:
+            return False
+        self.reload()
+        return True
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    @property
+    def doc_count(self) -> int:
+        return sum(segment.live_count for segment in self.segments)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Run a query and return the top matches with their stored fields and score"""
+        parsed = parse_query(query)
+        scoring_terms = list(parsed['terms'])
+        for phrase in parsed['phrases']:
+            scoring_terms.extend(phrase)
+        unique_terms = list(dict.fromkeys(scoring_terms))
+
+        total_docs = self.doc_count
+        if not total_docs:
+            return []
+        avg_length = sum(s.live_length for s in self.segments) / total_docs
+        idf = {}
+        for term in unique_terms:
+            # Tombstoned copies still count towards df until merged away
+            df = min(total_docs, sum(segment.document_frequency(term) for segment in self.segments))
+            idf[term] = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+
+        hits = []
+        for segment in self.segments:
+            hits.extend(self.search_segment(segment, parsed, unique_terms, idf, avg_length))
+
+        # Rank by score (or by date for filter-only queries); only the top hits are materialized
+        sort_key = (lambda hit: hit[0]) if unique_terms else (lambda hit: hit[1])
+        results = []
+        for score, _, segment, local_id in heapq.nlargest(limit, hits, key=sort_key):
+            result = segment.stored_fields(local_id)
+            result['score'] = round(score, 4)
+            results.append(result)
+        return results
+
+    def search_segment(self, segment: Segment, parsed: Dict, terms: List[str],
+                       idf: Dict[str, float], avg_length: float) -> List[Tuple[float, int, Segment, int]]:
+        # Filters first: they are usually the most selective and need no positions
+        candidates: Optional[Set[int]] = None
+        for filter_term in parsed['filters']:
+            docs = set(segment.postings_for(filter_term, with_positions=False))
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return []
+
+        term_postings = {term: segment.postings_for(term) for term in terms}
+
+        # Every free term and phrase must match (AND semantics)
+        for term in parsed['terms']:
+            docs = set(term_postings[term])
+            candidates = docs if candidates is None else candidates & docs
+        for phrase in parsed['phrases']:
+            docs = set.intersection(*(set(term_postings[term]) for term in phrase))
+            candidates = docs if candidates is None else candidates & docs
+        if candidates is None:
+            candidates = set(range(segment.doc_count))
+        candidates -= segment.deleted
+
+        hits = []
+        for local_id in candidates:
+            date = segment.doc_date(local_id)
+            if (parsed['after'] or parsed['before']) and not date:
+                continue
+            if parsed['after'] and date < parsed['after']:
+                continue
+            if parsed['before'] and date >= parsed['before']:
+                continue
+            phrase_hits = [phrase_positions([term_postings[t] for t in phrase], local_id)
+                           for phrase in parsed['phrases']]
+            if not all(phrase_hits):
+                continue
+
+            length = segment.doc_length(local_id) or 1
+            score = 0.0
+            for term in terms:
+                tf = len(term_postings[term].get(local_id, ()))
+                if tf:
+                    score += idf[term] * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+            # Exact phrase matches rank above scattered terms
+            score += sum(phrase_hits)
+            hits.append((score, date, segment, local_id))
+        return hits
+
+
+def load_metadata_by_url(base_dir: Path) -> Dict[str, Dict]:
+    if not (base_dir / "data" / "articles_metadata.json").exists():
+        return {}
+    store = load_store(base_dir / "data")
+    return {article['url']: article
+            for article in store.articles(columns=('id', 'url', 'platform', 'date', 'topics'))}
+
+
+def collect_sources(base_dir: Path) -> Iterator[Dict]:
+    """Yield a cheap descriptor (key, fingerprint, path) for every indexable article
+
+    Keys are the indexed file's stem: '<article id>_<url hash>' for scraped
+    articles, the file name for curated Markdown notes. Nothing is read here
+    beyond index.json and a stat per Markdown file.
+    """
+    base_dir = Path(base_dir)
+
+    # Scraped articles, with metadata from the scraper index
+    index_path = base_dir / "data" / "index.json"
+    if index_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            path = entry.get('local_path')
+            if entry.get('status') != 'success' or not path:
+                continue
+            fields = {
+                'id': entry['id'], 'url': entry.get('url'), 'title': entry.get('title'),
+                'platform': entry.get('platform'), 'category': entry.get('category'),
+                'date': entry.get('date'), 'topics': entry.get('key_topics') or [],
+            }
+            fingerprint = hashlib.sha256(json.dumps([entry.get('content_digest'), fields],
+                                                    sort_keys=True).encode()).hexdigest()[:16]
+            yield {'key': Path(path).stem, 'fingerprint': fingerprint, 'path': base_dir / path, 'fields': fields}
+
+    # Curated Markdown articles; metadata comes from articles_metadata.json at load time
+    metadata_path = base_dir / "data" / "articles_metadata.json"
+    metadata_version = metadata_path.stat().st_mtime_ns if metadata_path.exists() else 0
+    for path in sorted((base_dir / "articles").glob("*/*.md")):
+        if path.parent.name == 'raw':
+            continue
+        stat = path.stat()
+        yield {'key': path.stem, 'fingerprint': f"{stat.st_mtime_ns}-{stat.st_size}-{metadata_version}",
+               'path': path, 'fields': None}
+
+
+def load_document(source: Dict, base_dir: Path, metadata: Dict[str, Dict]) -> Dict:
+    """Read a source's text and stored fields"""
+    path = source['path']
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    if source['fields'] is not None:
+        doc = dict(source['fields'])
+    else:
+        # Markdown notes: header lines give the title and URL, matched to metadata by URL
+        head = text[:2048]
+        url_match = URL_RE.search(head)
+        title_match = re.search(r"^#\s+(.+)$", head, re.MULTILINE)
+        doc = {'id': path.stem, 'category': path.parent.name,
+               'url': url_match.group(1) if url_match else None,
+               'title': title_match.group(1).strip() if title_match else path.stem}
+        known = metadata.get(doc['url'])
+        if known:
+            doc.update({'id': known['id'], 'platform': known.get('platform'), 'date': known.get('date'),
+                        'topics': known.get('topics') or known.get('key_topics') or []})
+    doc['key'] = source['key']
+    doc['path'] = str(path.relative_to(base_dir))
+    doc['text'] = text
+    return doc
+
+
+class IndexWriter:
+    """Incremental writer: new documents go to fresh segments, deletes become tombstones
+
+    The manifest is the only mutable file and is replaced atomically on every
+    commit, so readers always see a consistent set of segments. Commits take an
+    flock on write.lock, so writers in other processes (the scraper, `update`,
+    `merge`) can interleave without losing each other's segments.
+    """
+
+    def __init__(self, index_dir: Path, max_segments: int = 8, merge_factor: int = 4):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segments = max_segments
+        self.merge_factor = merge_factor
+        self.lock = threading.Lock()
+        self.merge_thread: Optional[threading.Thread] = None
+        self.pending: Dict[str, Dict] = {}
+        self.pending_deletes: Set[str] = set()
+        self.manifest = self.load_manifest()
+        # key -> [segment name, local id, fingerprint]; only writers read this file
+        self.locations: Dict[str, List] = self.load_json("docs.json", {})
+
+    def load_json(self, name: str, default):
+        path = self.index_dir / name
+        if not path.exists():
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_json(self, name: str, value):
+        path = self.index_dir / name
+        tmp_path = path.with_name(name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def load_manifest(self) -> Dict:
+        manifest = self.load_json("manifest.json", {'segments': [], 'next_segment': 1})
+        manifest['segments'] = [normalize_segment_entry(entry) for entry in manifest['segments']]
+        manifest.setdefault('next_segment', len(manifest['segments']) + 1)
+        return manifest
+
+    @contextmanager
+    def locked(self):
+        """Hold the writer lock across threads and processes, starting from the manifest on disk"""
+        with self.lock, index_lock(self.index_dir):
+            # Another process may have committed or merged since this writer last looked
+            self.manifest = self.load_manifest()
+            self.locations = self.load_json("docs.json", {})
+            yield
+
+    def new_segment_name(self) -> str:
+        """Next unused segment name (lock held); a merge in progress holds its name as a .tmp directory"""
+        while True:
+            name = f"seg-{self.manifest['next_segment']:06d}"
+            self.manifest['next_segment'] += 1
+            if not (self.index_dir / name).exists() and not (self.index_dir / f"{name}.tmp").exists():
+                return name
+
+    def fingerprint(self, key: str) -> Optional[str]:
+        location = self.locations.get(key)
+        return location[2] if location else None
+
+    def keys(self) -> Set[str]:
+        return set(self.locations)
+
+    def add(self, doc: Dict, fingerprint: str):
+        """Add or replace a document (keyed by doc['key'])"""
+        doc['fingerprint'] = fingerprint
+        self.pending[doc['key']] = doc
+
+    def delete(self, key: str):
+        self.pending.pop(key, None)
+        self.pending_deletes.add(key)
+
+    def commit(self, merge: bool = True, background: bool = True) -> Dict:
+        """Flush pending changes as one new segment plus tombstones"""
+        with self.locked():
+            added = len(self.pending)
+            deleted = 0
+            for key in set(self.pending) | self.pending_deletes:
+                if self.tombstone(key):
+                    deleted += 1
+            if self.pending:
+                name = self.new_segment_name()
+                docs = list(self.pending.values())
+                fingerprints = [(doc['key'], doc.pop('fingerprint')) for doc in docs]
+                write_segment(docs, self.index_dir / name)
+                self.manifest['segments'].append({'name': name, 'deleted': []})
+                for local_id, (key, fingerprint) in enumerate(fingerprints):
+                    self.locations[key] = [name, local_id, fingerprint]
+            self.pending = {}
+            self.pending_deletes = set()
+            self.drop_empty_segments()
+            self.publish()
+
+        if merge and self.needs_merge():
+            self.merge(background=background)
+        return {'added': added, 'deleted': deleted, 'segments': len(self.manifest['segments'])}
+
+    def tombstone(self, key: str) -> bool:
+        """Mark a document's current copy deleted (lock held)"""
+        location = self.locations.pop(key, None)
+        if not location:
+            return False
+        for entry in self.manifest['segments']:
+            if entry['name'] == location[0]:
+                entry['deleted'].append(location[1])
+                return True
+        return False
+
+    def drop_empty_segments(self):
+        """Forget segments whose documents are all deleted (lock held)"""
+        live = []
+        for entry in self.manifest['segments']:
+            doc_count = self.segment_doc_count(entry['name'])
+            if doc_count and len(entry['deleted']) >= doc_count:
+                self.remove_segment_files(entry['name'])
+            else:
+                live.append(entry)
+        self.manifest['segments'] = live
+
+    def segment_doc_count(self, name: str) -> int:
+        with open(self.index_dir / name / "meta.json", 'r', encoding='utf-8') as f:
+            return json.load(f)['doc_count']
+
+    def remove_segment_files(self, name: str):
+        shutil.rmtree(self.index_dir / name, ignore_errors=True)
+
+    def publish(self):
+        """Atomically expose the current segment set (lock held)"""
+        self.write_json("docs.json", self.locations)
+        self.write_json("manifest.json", self.manifest)
+
+    def needs_merge(self) -> bool:
+        return len(self.manifest['segments']) > self.max_segments
+
+    def merge(self, background: bool = True):
+        """Merge the smallest segments into one, dropping tombstoned documents"""
+        if self.merge_thread and self.merge_thread.is_alive():
+            return
+        if background:
+            self.merge_thread = threading.Thread(target=self.run_merge, daemon=True)
+            self.merge_thread.start()
+        else:
+            self.run_merge()
+
+    def run_merge(self, names: Optional[List[str]] = None):
+        with self.locked():
+            entries = self.manifest['segments']
+            if names is None:
+                by_size = sorted(entries, key=lambda e: self.segment_doc_count(e['name']) - len(e['deleted']))
+                # Merge enough of the smallest segments to get back under the limit
+                count = max(self.merge_factor, len(entries) - self.max_segments + 1)
+                names = [entry['name'] for entry in by_size[:count]]
+            if len(names) < 2:
+                return
+            sources = [entry for entry in entries if entry['name'] in names]
+            snapshot = {entry['name']: set(entry['deleted']) for entry in sources}
+            target = self.new_segment_name()
+            (self.index_dir / f"{target}.tmp").mkdir()
+            # Opened under the lock; the maps stay readable if a commit drops a source meanwhile
+            segments = [Segment(self.index_dir / entry['name']) for entry in sources]
+
+        # The expensive part runs without the lock; sources are immutable
+        try:
+            remap = merge_segments(segments, [snapshot[s.seg_dir.name] for s in segments], self.index_dir / target)
+        finally:
+            for segment in segments:
+                segment.close()
+
+        with self.locked():
+            merged = {'name': target, 'deleted': []}
+            current = {entry['name']: entry for entry in self.manifest['segments']}
+            for name, id_map in remap.items():
+                # Deletes that arrived while merging are carried over to the new segment
+                # (a source dropped as fully deleted means every one of its docs is gone)
+                source = current.get(name, {'deleted': list(id_map)})
+                for local_id in set(source['deleted']) - snapshot[name]:
+                    if local_id in id_map:
+                        merged['deleted'].append(id_map[local_id])
+            for key, location in self.locations.items():
+                if location[0] in remap:
+                    location[0], location[1] = target, remap[location[0]][location[1]]
+            positions = [i for i, e in enumerate(self.manifest['segments']) if e['name'] in remap]
+            position = min(positions) if positions else len(self.manifest['segments'])
+            remaining = [e for e in self.manifest['segments'] if e['name'] not in remap]
+            remaining.insert(position, merged)
+            self.manifest['segments'] = remaining
+            self.drop_empty_segments()
+            self.publish()
+            # Deleted under the lock, so readers never find a listed segment missing
+            for name in remap:
+                self.remove_segment_files(name)
+
+    def force_merge(self):
+        """Merge every segment into one"""
+        self.wait()
+        with self.locked():
+            names = [entry['name'] for entry in self.manifest['segments']]
+            deletes = any(entry['deleted'] for entry in self.manifest['segments'])
+        if len(names) > 1 or deletes:
+            self.run_merge(names if len(names) > 1 else None)
+
+    def wait(self):
+        """Block until a background merge has finished"""
+        if self.merge_thread:
+            self.merge_thread.join()
+            self.merge_thread = None
+
+    def close(self):
+        self.wait()
+
+
+def merge_segments(segments: List[Segment], deleted: List[Set[int]], seg_dir: Path) -> Dict[str, Dict[int, int]]:
+    """Write one segment holding the live documents of several; returns old->new id maps"""
+    # The .tmp directory may already exist as the writer's claim on the name: empty it, keep it
+    tmp_dir = seg_dir.with_name(seg_dir.name + '.tmp')
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    for leftover in tmp_dir.iterdir():
+        leftover.unlink()
+
+    remap: Dict[str, Dict[int, int]] = {}
+    total_length = 0
+    new_id = 0
+    with open(tmp_dir / "docs.jsonl", 'wb') as stored, open(tmp_dir / "docs.bin", 'wb') as records:
+        for segment, dead in zip(segments, deleted):
+            id_map = remap[segment.seg_dir.name] = {}
+            for local_id in range(segment.doc_count):
+                if local_id in dead:
+                    continue
+                length, date, offset, size = DOC_RECORD.unpack_from(segment.records, local_id * DOC_RECORD.size)
+                segment.stored.seek(offset)
+                records.write(DOC_RECORD.pack(length, date, stored.tell(), size))
+                stored.write(segment.stored.read(size))
+                total_length += length
+                id_map[local_id] = new_id
+                new_id += 1
+
+    # Walk all lexicons in sorted order, re-encoding postings with the new ids
+    term_count = 0
+    with open(tmp_dir / "terms.dat", 'wb') as terms_file, \
+            open(tmp_dir / "lexicon.bin", 'wb') as lexicon, \
+            open(tmp_dir / "postings.bin", 'wb') as postings_file:
+        streams = [zip(segment.iter_terms(), itertools.repeat(index)) for index, segment in enumerate(segments)]
+        for term_bytes, group in itertools.groupby(heapq.merge(*streams), key=lambda item: item[0]):
+            block = bytearray()
+            previous = 0
+            df = 0
+            for _, index in group:
+                segment = segments[index]
+                id_map = remap[segment.seg_dir.name]
+                for local_id, positions in sorted(segment.postings_for(term_bytes.decode('utf-8')).items()):
+                    if local_id not in id_map:
+                        continue
+                    doc_id = id_map[local_id]
+                    encode_varint(doc_id - previous, block)
+                    encode_varint(len(positions), block)
+                    last = 0
+                    for position in positions:
+                        encode_varint(position - last, block)
+                        last = position
+                    previous = doc_id
+                    df += 1
+            if not df:
+                continue
+            lexicon.write(LEXICON_RECORD.pack(terms_file.tell(), len(term_bytes), df,
+                                              postings_file.tell(), len(block)))
+            terms_file.write(term_bytes)
+            postings_file.write(block)
+            term_count += 1
+
+    with open(tmp_dir / "meta.json", 'w', encoding='utf-8') as f:
+        json.dump({'doc_count': new_id, 'total_length': total_length, 'term_count': term_count}, f)
+    if seg_dir.exists():
+        shutil.rmtree(seg_dir)
+    tmp_dir.rename(seg_dir)
+    return remap
+
+
+def normalize_segment_entry(entry) -> Dict:
+    """Manifest entries are {'name', 'deleted'}; bare names come from full rebuilds"""
+    if isinstance(entry, str):
+        return {'name': entry, 'deleted': []}
+    return entry
+
+
+def sync_index(base_dir: Path, index_dir: Optional[Path] = None, background_merge: bool = False,
+               writer: Optional[IndexWriter] = None) -> Dict:
+    """Bring the index up to date with the corpus, touching only changed documents
+
+    With a caller's writer and background_merge, a merge the commit triggers keeps
+    running after this returns; the caller closes the writer once its other work is done.
+    """
+    base_dir = Path(base_dir)
+    index_dir = Path(index_dir or base_dir / "data" / "search")
+    own_writer = writer is None
+    if own_writer:
+        writer = IndexWriter(index_dir)
+    metadata = None
+    stale = writer.keys()
+    for source in collect_sources(base_dir):
+        stale.discard(source['key'])
+        if writer.fingerprint(source['key']) == source['fingerprint']:
+            continue
+        if not source['path'].exists():
+            writer.delete(source['key'])
+            continue
+        if metadata is None:
+            metadata = load_metadata_by_url(base_dir)
+        writer.add(load_document(source, base_dir, metadata), source['fingerprint'])
+    for key in stale:
+        writer.delete(key)
+    stats = writer.commit(background=background_merge)
+    stats['doc_count'] = len(writer.locations)
+    if own_writer:
+        writer.close()
+    return stats
+
+
+def build_index(base_dir: Path, index_dir: Optional[Path] = None) -> Dict:
+    """Rebuild the search index from scratch as a single segment"""
+    base_dir = Path(base_dir)
+    index_dir = Path(index_dir or base_dir / "data" / "search")
+    if index_dir.exists():
+        shutil.rmtree(index_dir)
+    writer = IndexWriter(index_dir)
+    metadata = load_metadata_by_url(base_dir)
+    for source in collect_sources(base_dir):
+        if source['path'].exists():
+            writer.add(load_document(source, base_dir, metadata), source['fingerprint'])
+    stats = writer.commit(merge=False)
+    stats['doc_count'] = len(writer.locations)
+    return stats
+
+
+def print_results(results: List[Dict], elapsed: float, as_json: bool = False):
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    for rank, result in enumerate(results, 1):
+        print(f"{rank:>2}. [{result['score']:.2f}] {result.get('title')} "
+              f"({result.get('platform') or '-'}, {result.get('date') or '-'})")
+        print(f"    {result.get('path')}")
+    print(f"{len(results)} results in {elapsed:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the equity perps research corpus")
+    parser.add_argument("--base-dir", default="..")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="rebuild the index from all articles")
+    sub.add_parser("update", help="index new and changed articles, drop removed ones")
+    sub.add_parser("merge", help="merge all segments into one")
+    query_parser = sub.add_parser("query", help='e.g. \'"funding rate" platform:Hyperliquid after:2025-06\'')
+    query_parser.add_argument("query")
+    query_parser.add_argument("-k", "--limit", type=int, default=10)
+    query_parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    index_dir = base_dir / "data" / "search"
+    if args.command in ("build", "update"):
+        start = time.perf_counter()
+        stats = build_index(base_dir, index_dir) if args.command == "build" else sync_index(base_dir, index_dir)
+        print(f"Indexed {stats['added']} documents, removed {stats['deleted']} "
+              f"({stats['doc_count']} total, {stats['segments']} segments) "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+    if args.command == "merge":
+        writer = IndexWriter(index_dir)
+        writer.force_merge()
+        print(f"Merged into {len(writer.manifest['segments'])} segment(s)")
+        return
+
+    start = time.perf_counter()
+    index = SearchIndex(index_dir)
+    results = index.search(args.query, limit=args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    print_results(results, elapsed, as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
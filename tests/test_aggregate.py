@@ -0,0 +1,46 @@
+import random
+
+from aggregate import Aggregator
+
+
+def aggregator():
+    return Aggregator(group_by=('category', 'platform'), count_by=('status',), multi=('key_topics',))
+
+
+def state(stats):
+    groups = {field: {value: sorted(record['id'] for record in records)
+                      for value, records in stats.group(field).items()} for field in stats.group_by}
+    return stats.total, {field: dict(counts) for field, counts in stats.counts.items()}, groups
+
+
+def record(article_id, rng):
+    return {'id': article_id,
+            'category': rng.choice(['news', 'research', 'documentation']),
+            'platform': rng.choice(['Hyperliquid', 'Aster', None]),
+            'status': rng.choice(['success', 'failed', 'duplicate']),
+            'key_topics': rng.sample(['leverage', 'oracle', 'funding', 'fees'], rng.randint(0, 3))}
+
+
+def test_incremental_changes_match_a_fresh_aggregation():
+    rng = random.Random(7)
+    stats = aggregator()
+    final = {}
+    for _ in range(500):
+        article_id = f"a{rng.randint(0, 30)}"
+        if article_id in final and rng.random() < 0.3:
+            stats.remove(final.pop(article_id))
+        else:
+            # New records and replacements (same id, some fields changed)
+            final[article_id] = record(article_id, rng)
+            stats.add(final[article_id])
+    assert state(stats) == state(aggregator().consume(final.values()))
+
+
+def test_replacing_a_record_moves_it_between_groups():
+    stats = aggregator()
+    stats.add({'id': 'a', 'category': 'news', 'platform': 'Aster', 'status': 'failed', 'key_topics': ['oracle']})
+    stats.add({'id': 'a', 'category': 'news', 'platform': 'Aster', 'status': 'success', 'key_topics': ['fees']})
+    assert (stats.total, stats.count('status', 'failed'), stats.count('status', 'success')) == (1, 0, 1)
+    assert stats.top('key_topics', 5) == [('fees', 1)]
+    stats.remove({'id': 'a'})
+    assert state(stats) == state(aggregator())
@@ -0,0 +1,64 @@
+import hashlib
+
+import pytest
+
+import blobstore
+from blobstore import BlobError, BlobStore
+
+CODECS = ['gzip', pytest.param('zstd', marks=pytest.mark.skipif(
+    blobstore.zstandard is None, reason="zstandard module not installed"))]
+
+
+def body(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize("codec", CODECS)
+def test_put_file_round_trips_and_stores_a_body_once(tmp_path, codec, packed):
+    store = BlobStore(tmp_path / "store", codec=codec, packed=packed)
+    data = b"<html>stock perpetuals</html>\n" * 1000
+    digest = hashlib.sha256(data).hexdigest()
+    assert not store.exists(digest)
+
+    assert store.put_file(body(tmp_path, "first.html", data)) == digest
+    assert not (tmp_path / "first.html").exists()
+    assert store.exists(digest)
+    with store.open(digest) as f:
+        assert f.read() == data
+
+    # The same body fetched again is not written a second time
+    stored = store.stats()
+    second = body(tmp_path, "second.html", data)
+    assert store.put_file(second, digest, move=False) == digest
+    assert second.exists()
+    assert store.stats() == stored
+    assert stored['packed_blobs' if packed else 'loose_blobs'] == 1
+    store.close()
+
+    reopened = BlobStore(tmp_path / "store", codec=codec, packed=packed)
+    assert reopened.exists(digest) and reopened.read(digest) == data
+    reopened.close()
+
+
+def test_missing_blobs(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    missing = hashlib.sha256(b"never stored").hexdigest()
+    assert not store.exists(missing)
+    assert not store.exists(None)
+    with pytest.raises(BlobError):
+        store.open(missing)
+
+
+def test_packing_keeps_loose_blobs_readable(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    digests = [store.put_bytes(f"article {i}".encode() * 50) for i in range(3)]
+    assert store.pack() == 3
+    assert store.stats()['loose_blobs'] == 0
+    assert [store.read(digest) for digest in digests] == [f"article {i}".encode() * 50 for i in range(3)]
+    store.gc({digests[0]})
+    assert store.exists(digests[0]) and not store.exists(digests[1])
+    assert store.read(digests[0]) == b"article 0" * 50
+    store.close()
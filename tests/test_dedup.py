@@ -0,0 +1,38 @@
+from dedup import DuplicateDetector
+
+ORIGINAL = ("Aster launched stock perpetuals with up to fifty times leverage on US equities, "
+            "trading around the clock with prices from the Pyth oracle network and fees "
+            "shared with liquidity providers across its BNB Chain and Arbitrum deployments.")
+# The same story syndicated with a different dateline and closing sentence
+SYNDICATED = ("By a staff writer. " + ORIGINAL[:-1] + ", according to the announcement published on Tuesday.")
+DISTINCT = ("Hyperliquid runs its own layer one chain, and its order book handles perpetual "
+            "futures for crypto assets with funding paid every hour between long and short traders.")
+
+
+def test_near_duplicates_link_to_the_first_copy_and_survive_a_reload(tmp_path):
+    detector = DuplicateDetector(tmp_path)
+    assert detector.check('original', ORIGINAL) is None
+    canonical, similarity = detector.check('syndicated', SYNDICATED)
+    assert canonical == 'original' and similarity >= detector.threshold
+    assert detector.check('distinct', DISTINCT) is None
+    detector.save()
+
+    reloaded = DuplicateDetector(tmp_path)
+    assert reloaded.signatures == detector.signatures
+    assert reloaded.canonical == {'original': None, 'syndicated': 'original', 'distinct': None}
+    # A further copy of the syndicated version still links to the root of the cluster
+    assert reloaded.check('mirror', SYNDICATED)[0] == 'original'
+
+
+def test_removed_documents_are_no_longer_matched(tmp_path):
+    detector = DuplicateDetector(tmp_path)
+    detector.check('original', ORIGINAL)
+    detector.remove('original')
+    assert detector.check('syndicated', SYNDICATED) is None
+
+
+def test_signatures_from_other_parameters_are_not_loaded(tmp_path):
+    detector = DuplicateDetector(tmp_path)
+    detector.check('original', ORIGINAL)
+    detector.save()
+    assert DuplicateDetector(tmp_path, num_perm=64).signatures == {}
@@ -0,0 +1,32 @@
+import pytest
+
+from discovery import normalize_url
+
+
+@pytest.mark.parametrize("url, normalized", [
+    ("https://WWW.Example.com:443/a/b/../c/#frag", "https://example.com/a/c"),
+    ("http://example.com:8080/./a//b/", "http://example.com:8080/a/b"),
+    ("https://example.com/p?utm_source=x&b=2&fbclid=y&a=1", "https://example.com/p?a=1&b=2"),
+    # Generic parameter names can select content, so they are kept
+    ("https://example.com/p?source=rss&ref=home", "https://example.com/p?ref=home&source=rss"),
+    ("https://example.com/%7Euser/%41bc", "https://example.com/~user/Abc"),
+    ("https://example.com/café x", "https://example.com/caf%C3%A9%20x"),
+    ("https://example.com/50%off", "https://example.com/50%25off"),
+])
+def test_normalize_url(url, normalized):
+    assert normalize_url(url) == normalized
+
+
+def test_escaped_slashes_stay_inside_their_segment():
+    assert normalize_url("https://example.com/a%2fb/../c") == "https://example.com/c"
+    assert normalize_url("https://example.com/a%2Fb") != normalize_url("https://example.com/a/b")
+
+
+def test_escaped_percent_is_not_decoded_twice():
+    assert normalize_url("https://example.com/a%252F") == "https://example.com/a%252F"
+    assert normalize_url("https://example.com/a%252F") != normalize_url("https://example.com/a%2F")
+
+
+def test_non_http_urls_are_rejected():
+    assert normalize_url("mailto:news@example.com") is None
+    assert normalize_url("ftp://example.com/file") is None
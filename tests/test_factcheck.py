@@ -0,0 +1,55 @@
+import pytest
+
+from factcheck import ClaimSet, parse_quantities, verify
+
+CLAIMS = [
+    {'id': 'share', 'claim': "Hyperliquid ~80% market share",
+     'require': [["hyperliquid"], ["market share", "dominance"]], 'value': "80%"},
+    {'id': 'daily', 'claim': "Hyperliquid daily volume $8-30B",
+     'require': [["hyperliquid"], ["daily", "per day"], ["volume"]], 'value': "$8-30B"},
+    {'id': 'oracle', 'claim': "Aster uses Pyth",
+     'require': [["aster"], ["pyth"]]},
+]
+
+
+def verdicts(text):
+    return [(CLAIMS[claim]['id'], verdict, line, figures) for claim, verdict, line, figures
+            in ClaimSet(CLAIMS).scan_text(text)]
+
+
+def test_quantities_carry_kind_and_scale():
+    assert [figure[1:] for figure in parse_quantities("$2.6 trillion, 50x, 24 hours and 5%")] == [
+        ('usd', 2.6e12, 2.6e12), ('leverage', 50.0, 50.0), ('hours', 24.0, 24.0), ('percent', 5.0, 5.0)]
+
+
+def test_supporting_and_conflicting_figures():
+    text = ("Hyperliquid holds 79% market share.\n"
+            "Hyperliquid dominance fell to 60%.\n"
+            "Hyperliquid daily volume reached $12B.\n")
+    assert verdicts(text) == [('share', 'supports', 1, ['79%']), ('share', 'conflicts', 2, ['60%']),
+                              ('daily', 'supports', 3, ['$12B'])]
+
+
+def test_title_terms_apply_to_every_line_and_other_kinds_are_ignored():
+    text = "# Hyperliquid review\n\nIts market share is 81% today.\nMarket share was 40x larger.\n"
+    assert verdicts(text) == [('share', 'supports', 3, ['81%'])]
+
+
+def test_claims_without_a_value_are_mentions():
+    assert verdicts("Aster prices come from Pyth feeds.") == [('oracle', 'mentions', 1, [])]
+
+
+@pytest.mark.parametrize("stated, agrees", [("$30.5B", True), ("$5-10B", False), ("$10-20B", True), ("$31B", False)])
+def test_ranges_agree_when_one_lies_within_the_other(stated, agrees):
+    verdict = 'supports' if agrees else 'conflicts'
+    assert verdicts(f"Hyperliquid daily volume: {stated}")[0][1] == verdict
+
+
+def test_verify_statuses(tmp_path):
+    (tmp_path / "a.md").write_text("Hyperliquid holds 80% market share.\nHyperliquid daily volume is $2B.\n")
+    (tmp_path / "b.md").write_text("Hyperliquid market share is 50%.\n")
+    paths = [str(tmp_path / "a.md"), str(tmp_path / "b.md")]
+    results = verify(CLAIMS, paths, tmp_path, workers=1)
+    assert [result['status'] for result in results] == ['disputed', 'conflicting', 'not found']
+    assert results[0]['conflicts'] == [{'location': "b.md:1", 'passage': "Hyperliquid market share is 50%.",
+                                        'figures': ['50%']}]
@@ -0,0 +1,49 @@
+from facts import FactExtractor
+
+PLATFORMS = ('Hyperliquid', 'Aster', 'PancakeSwap', 'Bitget', 'Ostium')
+
+
+def facts(text, platform=None):
+    return {(fact[0], fact[1], fact[3]) for fact in FactExtractor(PLATFORMS).text_facts(text, platform)}
+
+
+def test_sentence_attributed_to_named_platform():
+    assert facts("Aster offers 50x leverage on US stocks.", 'Bitget') == {('Aster', 'leverage', '50×')}
+
+
+def test_comparison_table_columns_of_other_platforms_are_skipped():
+    text = ("| Feature | Bitget (CeFi) | Aster (DeFi) | PancakeSwap (DeFi) |\n"
+            "|---------|---------------|--------------|--------------------|\n"
+            "| Leverage | 10× | 50× | 25× |\n"
+            "| Hours | 24/5 | 24/7 | US Market Hours |\n")
+    assert facts(text, 'Bitget') == {('Bitget', 'leverage', '10×'), ('Bitget', 'trading_hours', '24/5')}
+
+
+def test_table_rows_attributed_by_row_header():
+    text = ("| Platform | Max Leverage | Trading Hours |\n"
+            "|----------|--------------|---------------|\n"
+            "| Aster | 50× | 24/7 |\n"
+            "| Ostium (see Aster docs) | 100-200× | 24/7 |\n")
+    assert facts(text, 'Bitget') == {('Aster', 'leverage', '50×'), ('Aster', 'trading_hours', '24/7'),
+                                     ('Ostium', 'leverage', '100-200×'), ('Ostium', 'trading_hours', '24/7')}
+
+
+def test_table_without_platform_headers_uses_section_platform():
+    text = ("## Hyperliquid\n"
+            "| Metric | Value |\n"
+            "|--------|-------|\n"
+            "| Max leverage | 40× |\n"
+            "| Oracle feed | Pyth Network (as on Aster) |\n")
+    assert facts(text, 'Bitget') == {('Hyperliquid', 'leverage', '40×'), ('Hyperliquid', 'oracle', 'Pyth Network')}
+
+
+def test_market_volume_qualified_by_year():
+    extracted = list(FactExtractor(PLATFORMS).text_facts("DeFi perps volume reached $2.6 trillion in 2025.", None))
+    assert [(fact[0], fact[1], fact[2], fact[3], fact[4]) for fact in extracted] == \
+        [(None, 'volume', '2025', '$2.6T', 2.6e12)]
+
+
+def test_curated_facts_keep_unpatterned_metrics():
+    extracted = {(fact[1], fact[3], fact[6]) for fact in
+                 FactExtractor(PLATFORMS).curated_facts('Ostium', {'leverage': '100-200×', 'chain': 'Arbitrum'})}
+    assert extracted == {('leverage', '100-200×', 'curated'), ('chain', 'Arbitrum', 'curated')}
@@ -0,0 +1,63 @@
+import time
+
+from frontier import CrawlFrontier
+
+
+def articles(*ids):
+    return [{'id': article_id, 'url': f"https://example.com/{article_id}"} for article_id in ids]
+
+
+def frontier(tmp_path, **options):
+    return CrawlFrontier(tmp_path / "frontier.db", **options)
+
+
+def test_transient_failure_is_claimed_again_after_its_backoff(tmp_path):
+    crawl = frontier(tmp_path, base_delay=0.05)
+    crawl.sync(articles('a', 'b'))
+    assert crawl.claim() == ['a', 'b']
+    assert crawl.fail('a', "timeout") == 'retry'
+    crawl.complete_many(['b'])
+    assert crawl.claim() == []
+    wait = crawl.next_due()
+    assert 0 < wait <= 0.075
+    time.sleep(wait)
+    assert crawl.claim() == ['a']
+    crawl.complete_many(['a'])
+    assert crawl.next_due() is None
+    assert crawl.counts() == {'done': 2}
+
+
+def test_permanent_and_exhausted_failures_are_not_claimed_again(tmp_path):
+    crawl = frontier(tmp_path, max_attempts=2, base_delay=0)
+    crawl.sync(articles('big', 'flaky'))
+    crawl.claim()
+    assert crawl.fail('big', "body over cap", permanent=True) == 'dead'
+    assert crawl.fail('flaky', "timeout") == 'retry'
+    assert crawl.claim() == ['flaky']
+    assert crawl.fail('flaky', "timeout") == 'dead'
+    assert crawl.claim() == []
+    assert crawl.next_due() is None
+    assert [(item['id'], item['attempts']) for item in crawl.failures()] == [('big', 1), ('flaky', 2)]
+
+
+def test_claimed_but_unfinished_urls_come_back_after_a_crash(tmp_path):
+    crawl = frontier(tmp_path)
+    crawl.sync(articles('a', 'b', 'c'))
+    assert crawl.claim(limit=2) == ['a', 'b']
+    crawl.complete_many(['a'])
+    crawl.close()  # the run dies with 'b' in progress and 'c' never claimed
+
+    reopened = frontier(tmp_path)
+    stats = reopened.sync(articles('a', 'b', 'c'))
+    assert stats == {'resumed': True, 'interrupted': 1, 'generation': 1}
+    assert reopened.claim() == ['b', 'c']
+
+
+def test_finished_crawl_starts_a_new_generation(tmp_path):
+    crawl = frontier(tmp_path, base_delay=0)
+    crawl.sync(articles('a', 'b'))
+    crawl.claim()
+    crawl.complete_many(['a'])
+    crawl.fail('b', "gone", permanent=True)
+    assert crawl.sync(articles('a', 'b'))['resumed'] is False
+    assert crawl.claim() == ['a', 'b']
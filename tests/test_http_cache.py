@@ -0,0 +1,19 @@
+from http_cache import ResponseCache
+
+
+def store(cache, tmp_path, url, body):
+    source = tmp_path / f"{body[:1].decode()}.part"
+    source.write_bytes(body)
+    return cache.store_file(url, source, {'ETag': '"v1"'}, "digest", 'text/html')
+
+
+def test_body_opened_before_eviction_stays_readable(tmp_path):
+    cache = ResponseCache(tmp_path / "cache", max_bytes=8)
+    entry = store(cache, tmp_path, "https://a.example/", b"aaaaaaaa")
+    body = cache.open_body(cache.lookup("https://a.example/"))
+    store(cache, tmp_path, "https://b.example/", b"bbbbbbbb")
+    assert cache.lookup("https://a.example/") is None
+    with body:
+        assert body.read() == b"aaaaaaaa"
+    # Looked up earlier but opened only after the eviction: a miss, not an error
+    assert cache.open_body(entry) is None
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from local_docs import DocTree, ingest
+from scraper import EquityPerpsResearchScraper
+
+
+def write_tree(root: Path):
+    (root / "guides").mkdir(parents=True)
+    (root / "README.md").write_text("# Notes\n\nSee [intro](guides/intro.md).\n", encoding='utf-8')
+    (root / "guides" / "intro.md").write_text("---\ntitle: Intro\ndate: 2025-06-01\n---\n# Intro\n\n## Setup\n",
+                                              encoding='utf-8')
+    return root
+
+
+def articles(root: Path, state_dir: Path):
+    tree = DocTree(root, state_dir, name='notes')
+    changed, _ = tree.refresh(lambda article_id: True)
+    return [tree.article(relpath) for relpath in changed]
+
+
+def test_articles_do_not_depend_on_checkout_location(tmp_path):
+    first = articles(write_tree(tmp_path / "a" / "notes"), tmp_path / "state-a")
+    second = articles(write_tree(tmp_path / "b" / "elsewhere" / "notes"), tmp_path / "state-b")
+    assert first == second
+    assert [article['url'] for article in first] == ["local:notes/README.md", "local:notes/guides/intro.md"]
+
+
+def test_state_file_holds_no_page_bodies(tmp_path):
+    root = write_tree(tmp_path / "notes")
+    tree = DocTree(root, tmp_path / "state", name='notes')
+    tree.refresh(lambda article_id: True)
+    tree.save_state()
+    assert "## Setup" not in tree.state_path.read_text(encoding='utf-8')
+
+    reloaded = DocTree(root, tmp_path / "state", name='notes')
+    assert reloaded.refresh(lambda article_id: True) == ([], [])
+    assert reloaded.body("guides/intro.md") == "# Intro\n\n## Setup\n"
+
+
+def test_pages_without_front_matter_date_have_no_date(tmp_path):
+    dated, undated = sorted(articles(write_tree(tmp_path / "notes"), tmp_path / "state"), key=lambda a: a['title'])
+    assert (dated['title'], dated['date']) == ("Intro", "2025-06-01")
+    assert (undated['title'], undated['date']) == ("Notes", None)
+
+
+def test_undated_pages_get_a_placeholder_date_header(tmp_path):
+    root = write_tree(tmp_path / "notes")
+    scraper = EquityPerpsResearchScraper(tmp_path / "base", dedup=False, use_cache=False)
+    ingest(scraper, root, name='notes')
+    headers = {}
+    for entry in scraper.index_entries.values():
+        text = (scraper.base_dir / entry['local_path']).read_text(encoding='utf-8')
+        headers[entry['title']] = next(line for line in text.splitlines() if line.startswith("Date:"))
+    assert headers == {"Notes": "Date: -", "Intro": "Date: 2025-06-01"}
@@ -0,0 +1,128 @@
+import zlib
+from pathlib import Path
+
+import pdf_extract
+from pdf_extract import PdfDocument, extract_pdf, open_document
+
+RAW_DIR = Path(__file__).resolve().parent.parent / "articles" / "raw"
+
+CATALOG = b"<< /Type /Catalog /Pages 2 0 R >>"
+PAGES = b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>"
+PAGE = b"<< /Type /Page /Parent 2 0 R /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>"
+HELVETICA = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+CONTENT = b"BT /F1 12 Tf 72 720 Td (Funding rates) Tj 0 -14 Td (settle hourly) Tj ET"
+
+
+def stream(data, attrs=b""):
+    return b"<< /Length %d %s >>\nstream\n%s\nendstream" % (len(data), attrs, data)
+
+
+def flate(data, attrs=b""):
+    return stream(zlib.compress(data), b"/Filter /FlateDecode " + attrs)
+
+
+def objects_pdf(objects):
+    """Serialize numbered objects (1..n); returns the file body and each object's offset"""
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    return out, offsets
+
+
+def table_pdf(objects):
+    out, offsets = objects_pdf(objects)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def write(tmp_path, data):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(data)
+    return path
+
+
+def page_text(path):
+    with PdfDocument(path) as doc:
+        return [doc.page_text(index) for index in range(doc.page_count)]
+
+
+def test_xref_table_and_flate_content(tmp_path):
+    path = write(tmp_path, table_pdf([CATALOG, PAGES, PAGE, HELVETICA, flate(CONTENT)]))
+    assert page_text(path) == ["Funding rates\nsettle hourly"]
+
+
+def test_xref_stream_with_predictor_and_object_stream(tmp_path):
+    # Objects 1-4 live in object stream 6; the xref stream (7) is PNG-Up predicted
+    packed = [CATALOG, PAGES, PAGE, HELVETICA]
+    header, body = b"", b""
+    for number, obj in enumerate(packed, 1):
+        header += b"%d %d " % (number, len(body))
+        body += obj + b" "
+    objstm = flate(header + body, b"/Type /ObjStm /N 4 /First %d" % len(header))
+    out, offsets = objects_pdf([b"null"] * 4 + [flate(CONTENT), objstm])
+    xref_offset = len(out)
+    rows = [bytes([0, 0, 0, 0, 0, 0xff, 0xff])]
+    rows += [bytes([2]) + (6).to_bytes(4, 'big') + index.to_bytes(2, 'big') for index in range(4)]
+    rows += [bytes([1]) + offset.to_bytes(4, 'big') + bytes(2) for offset in offsets[4:] + [xref_offset]]
+    predicted, previous = b"", bytes(7)
+    for row in rows:
+        predicted += bytes([2]) + bytes((a - b) & 0xff for a, b in zip(row, previous))
+        previous = row
+    xref = flate(predicted, b"/Type /XRef /Size 8 /W [1 4 2] /Root 1 0 R "
+                            b"/DecodeParms << /Predictor 12 /Columns 7 >>")
+    out += b"7 0 obj\n%s\nendobj\nstartxref\n%d\n%%%%EOF\n" % (xref, xref_offset)
+    assert page_text(write(tmp_path, bytes(out))) == ["Funding rates\nsettle hourly"]
+
+
+def test_broken_startxref_is_recovered_by_scanning(tmp_path):
+    data = table_pdf([CATALOG, PAGES, PAGE, HELVETICA, stream(CONTENT)])
+    data = data[:data.rindex(b"startxref")] + b"startxref\n999999\n%%EOF\n"
+    assert page_text(write(tmp_path, data)) == ["Funding rates\nsettle hourly"]
+
+
+def test_tounicode_cmap_and_hex_stream(tmp_path):
+    cmap = (b"begincmap\n1 begincodespacerange <00> <ff> endcodespacerange\n"
+            b"2 beginbfchar <01> <0048> <02> <0069> endbfchar\n"
+            b"1 beginbfrange <03> <04> <0031> endbfrange\nendcmap")
+    font = b"<< /Type /Font /Subtype /TrueType /BaseFont /Custom /ToUnicode 6 0 R >>"
+    content = b"BT /F1 10 Tf 0 0 Td <01020304> Tj ET"
+    hex_content = stream(content.hex().encode() + b">", b"/Filter /ASCIIHexDecode")
+    path = write(tmp_path, table_pdf([CATALOG, PAGES, PAGE, font, hex_content, flate(cmap)]))
+    assert page_text(path) == ["Hi12"]
+
+
+def test_arxiv_paper_pages():
+    info, pages = extract_pdf(RAW_DIR / "2209.03307v1.pdf", workers=1)
+    assert len(pages) > 10
+    assert "perpetual" in pages[0].lower()
+
+
+def test_in_process_extraction_keeps_no_document_open(tmp_path):
+    path = write(tmp_path, table_pdf([CATALOG, PAGES, PAGE, HELVETICA, flate(CONTENT)]))
+    assert extract_pdf(path, workers=1)[1] == ["Funding rates\nsettle hourly"]
+    assert pdf_extract.WORKER_DOCUMENTS == {}
+
+
+def test_worker_cache_closes_replaced_and_evicted_documents(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_extract, 'WORKER_DOCUMENTS', {})
+    monkeypatch.setattr(pdf_extract, 'WORKER_DOCUMENTS_MAX', 2)
+    data = table_pdf([CATALOG, PAGES, PAGE, HELVETICA, flate(CONTENT)])
+    paths = []
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        paths.append(str(tmp_path / name))
+        (tmp_path / name).write_bytes(data)
+    first = open_document(paths[0], (1, 1))
+    assert open_document(paths[0], (1, 1)) is first
+    replaced = open_document(paths[0], (2, 1))
+    assert first.file.closed and replaced is not first
+    open_document(paths[1], (1, 1))
+    open_document(paths[2], (1, 1))
+    assert replaced.file.closed
+    assert list(pdf_extract.WORKER_DOCUMENTS) == paths[1:]
+    for _, doc in pdf_extract.WORKER_DOCUMENTS.values():
+        doc.close()
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from metrics import RunMetrics
+from pipeline import ScrapePipeline
+
+
+class FakeScraper:
+    """Just enough of EquityPerpsResearchScraper for the pipeline: fetches fail, saves record"""
+
+    extractable_types = {'text/html'}
+    index_entries = {}
+
+    def __init__(self, fail_on=None):
+        self.metrics = RunMetrics()
+        self.fail_on = fail_on
+        self.finished = []
+
+    def fetch_article(self, article, extract=True):
+        return None
+
+    def is_unchanged(self, article, previous, digest):
+        return False
+
+    def save_article(self, article, download):
+        article['status'] = 'failed'
+
+    def finish_article(self, article):
+        if article['id'] == self.fail_on:
+            raise OSError("disk full")
+        self.finished.append(article['id'])
+
+    def discard_download(self, download):
+        pass
+
+
+def articles(count):
+    return [{'id': f"a{i}", 'url': f"https://example.com/{i}"} for i in range(count)]
+
+
+def run_in_thread(pipeline, items):
+    outcome = {}
+
+    def target():
+        try:
+            pipeline.run(items)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "pipeline hung"
+    return outcome
+
+
+def test_every_article_is_written():
+    scraper = FakeScraper()
+    assert run_in_thread(ScrapePipeline(scraper, fetch_workers=2, extract_workers=1), articles(10)) == {}
+    assert sorted(scraper.finished) == sorted(f"a{i}" for i in range(10))
+
+
+def test_writer_failure_is_raised_instead_of_hanging():
+    scraper = FakeScraper(fail_on='a0')
+    # Far more articles than the bounded queues hold: upstream must not block on the dead writer
+    pipeline = ScrapePipeline(scraper, fetch_workers=1, extract_workers=1, queue_size=1)
+    outcome = run_in_thread(pipeline, articles(20))
+    with pytest.raises(OSError, match="disk full"):
+        raise outcome['error']
+    assert scraper.finished == []
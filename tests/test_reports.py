@@ -0,0 +1,67 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from organize import ResearchOrganizer
+
+REPO = Path(__file__).resolve().parent.parent
+GOLDEN = json.loads((Path(__file__).parent / "golden" / "report_facts.json").read_text(encoding='utf-8'))
+
+
+def table_rows(text):
+    for line in text.splitlines():
+        if line.startswith('|'):
+            yield [cell.strip().lower() for cell in line.strip().strip('|').split('|')]
+
+
+def has_fact(text, expected):
+    if 'row' in expected:
+        label, *values = [value.lower() for value in expected['row']]
+        return any(cells[0] == label and all(any(value in cell for cell in cells[1:]) for value in values)
+                   for cells in table_rows(text))
+    values = [value.lower() for value in expected['line']]
+    return any(all(value in line.lower() for value in values) for line in text.splitlines())
+
+
+@pytest.fixture(scope="module")
+def regenerated(tmp_path_factory):
+    """Reports rebuilt by organize.py from a copy of the repo's articles and metadata"""
+    base = tmp_path_factory.mktemp("repo")
+    shutil.copytree(REPO / "articles", base / "articles")
+    shutil.copytree(REPO / "docs", base / "docs")
+    (base / "data").mkdir()
+    for name in ("articles_metadata.json", "curated_facts.json"):
+        shutil.copy(REPO / "data" / name, base / "data" / name)
+    ResearchOrganizer(str(base)).run()
+    return base
+
+
+@pytest.mark.parametrize("report", sorted(key for key in GOLDEN if not key.startswith('_')))
+def test_regenerated_reports_keep_baseline_facts(regenerated, report):
+    text = (regenerated / report).read_text(encoding='utf-8')
+    missing = [expected for expected in GOLDEN[report] if not has_fact(text, expected)]
+    assert not missing, f"{report} lost {missing}"
+
+
+@pytest.mark.parametrize("date, month", [("2025-06-14", "June"), ("2025-06", "June"), ("2025", None), ("25/06", None)])
+def test_month_name_accepts_partial_dates(date, month):
+    assert ResearchOrganizer.month_name(date) == month
+
+
+def test_summary_renders_articles_with_partial_dates(tmp_path):
+    shutil.copytree(REPO / "articles", tmp_path / "articles")
+    (tmp_path / "data").mkdir()
+    metadata = json.loads((REPO / "data" / "articles_metadata.json").read_text(encoding='utf-8'))
+    metadata['articles'] += [
+        {'id': 'ostium-notes', 'title': 'Ostium notes', 'url': 'local:notes/ostium.md', 'category': 'defi-dex',
+         'date': '2025-06', 'source': 'Notes', 'platform': 'Ostium'},
+        {'id': 'lighter-notes', 'title': 'Lighter notes', 'url': 'local:notes/lighter.md', 'category': 'defi-dex',
+         'date': '2025', 'source': 'Notes', 'platform': 'Lighter'},
+    ]
+    (tmp_path / "data" / "articles_metadata.json").write_text(json.dumps(metadata), encoding='utf-8')
+    ResearchOrganizer(str(tmp_path)).run()
+    summary = (tmp_path / "docs" / "SUMMARY.md").read_text(encoding='utf-8')
+    assert "**Ostium (June)**: Ostium notes" in summary
+    assert "**Lighter**: Lighter notes" in summary
@@ -0,0 +1,111 @@
+import threading
+
+import search_index
+from search_index import IndexWriter, SearchIndex, parse_query
+
+
+def doc(key, text, platform='Hyperliquid', date='2025-06-01'):
+    return {'key': key, 'title': key, 'text': text, 'platform': platform, 'date': date}
+
+
+def keys(index_dir, query):
+    return sorted(result['key'] for result in SearchIndex(index_dir).search(query))
+
+
+def test_writers_opened_before_another_commit_keep_its_segments(tmp_path):
+    first, second = IndexWriter(tmp_path), IndexWriter(tmp_path)
+    first.add(doc('a', "funding rate"), 'fa')
+    first.commit()
+    second.add(doc('b', "funding rate"), 'fb')
+    second.commit()
+    assert keys(tmp_path, "funding") == ['a', 'b']
+    assert sorted(IndexWriter(tmp_path).keys()) == ['a', 'b']
+
+
+def test_background_merge_keeps_later_replacements(tmp_path):
+    writer = IndexWriter(tmp_path, max_segments=2, merge_factor=2)
+    for key in 'abc':
+        writer.add(doc(key, "oracle price"), key)
+        writer.commit(merge=False)
+    writer.commit(background=True)
+    # Another process replaces a document while the merge may still be running
+    other = IndexWriter(tmp_path)
+    other.add(doc('a', "oracle funding"), 'a2')
+    other.commit(merge=False)
+    writer.close()
+    assert keys(tmp_path, "oracle") == ['a', 'b', 'c']
+    assert keys(tmp_path, "funding") == ['a']
+
+
+
+def segmented(index_dir, keys_and_texts):
+    writer = IndexWriter(index_dir)
+    for key, text in keys_and_texts:
+        writer.add(doc(key, text), key)
+        writer.commit(merge=False)
+    return writer
+
+
+def test_merge_survives_a_commit_that_drops_one_of_its_sources(tmp_path, monkeypatch):
+    writer = segmented(tmp_path, [('a', "oracle"), ('b', "oracle"), ('c', "oracle")])
+    merge = search_index.merge_segments
+
+    def interleaved(segments, deleted, seg_dir):
+        # Another writer deletes every document of seg-000001, which drops it from disk
+        other = IndexWriter(tmp_path)
+        other.delete('a')
+        other.commit(merge=False)
+        assert not (tmp_path / "seg-000001").exists()
+        return merge(segments, deleted, seg_dir)
+
+    monkeypatch.setattr(search_index, 'merge_segments', interleaved)
+    writer.force_merge()
+    assert keys(tmp_path, "oracle") == ['b', 'c']
+    assert len(SearchIndex(tmp_path).segments) == 1
+
+
+def test_reader_opens_every_listed_segment_while_a_merge_waits(tmp_path, monkeypatch):
+    segmented(tmp_path, [('a', "oracle"), ('b', "oracle"), ('c', "oracle")])
+    open_segment = search_index.Segment.__init__
+    mergers = []
+
+    def racing_open(self, seg_dir):
+        if not mergers:
+            # A merge that would delete the listed segments before the reader gets to them
+            mergers.append(threading.Thread(target=IndexWriter(tmp_path).force_merge))
+            mergers[0].start()
+            mergers[0].join(timeout=0.5)
+        open_segment(self, seg_dir)
+
+    monkeypatch.setattr(search_index.Segment, '__init__', racing_open)
+    index = SearchIndex(tmp_path)
+    assert sorted(result['key'] for result in index.search("oracle")) == ['a', 'b', 'c']
+    index.close()
+    mergers[0].join()
+    assert len(SearchIndex(tmp_path).segments) == 1
+
+def test_query_with_phrase_filter_and_date_bound():
+    assert parse_query('"funding rate" platform:Hyperliquid after:2025-06') == {
+        'terms': [], 'phrases': [['funding', 'rate']], 'filters': ['platform:hyperliquid'],
+        'after': 20250601, 'before': 0}
+
+
+def test_query_field_aliases_quoted_values_and_unknown_fields():
+    parsed = parse_query('Topics:"Funding Rates" until:2025 leverage "oracle" foo:bar')
+    assert parsed['filters'] == ['topic:funding rates']
+    assert parsed['before'] == 20250101
+    # A one-word phrase is a plain term; an unknown field is searched as text
+    assert parsed['terms'] == ['leverage', 'oracle', 'foo', 'bar']
+    assert parsed['phrases'] == []
+
+
+def test_search_applies_phrases_filters_and_date_bounds(tmp_path):
+    writer = IndexWriter(tmp_path)
+    writer.add(doc('june', "the funding rate moved", date='2025-06-15'), '1')
+    writer.add(doc('july', "rate of funding", date='2025-07-01'), '2')
+    writer.add(doc('aster', "the funding rate moved", platform='Aster', date='2025-06-20'), '3')
+    writer.commit()
+    assert keys(tmp_path, '"funding rate"') == ['aster', 'june']
+    assert keys(tmp_path, 'funding platform:hyperliquid') == ['july', 'june']
+    # after: is inclusive, before: exclusive
+    assert keys(tmp_path, 'funding after:2025-06-20 before:2025-07') == ['aster']